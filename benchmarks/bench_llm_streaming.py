@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""LLM latency benchmark against the local SSE stand-in: blocking vs. streamed completion.
+
+Reports time to the full response for both paths, and for the streamed path
+the time until the first script section is available and until a malformed
+response is aborted. Nothing leaves the machine.
+
+Run from the repository root:
+    python benchmarks/bench_llm_streaming.py [chunk_delay_ms...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.generation import ContentGenerator, LLMCache, LLMClient
+from src.generation.json_repair import partial_string_field
+from src.generation.script_sections import ScriptSectionParser
+from tests.llm_stub import LLMStub, split_chunks
+
+SCRIPT = "\n".join(f"[{s // 60}:{s % 60:02d}] Section {n}: the numbers behind this move. [VISUAL CHANGE]" for n, s in enumerate(range(0, 50, 8)))
+PACKAGE = json.dumps({
+    "hooks": ["The data shows something unexpected", "Three patterns most investors miss", "The numbers tell a different story"],
+    "titles": ["What the data shows", "The pattern nobody mentions"],
+    "description": "A look at the numbers.",
+    "tags": ["finance", "investing"],
+    "script": SCRIPT,
+})
+MALFORMED = "I'm sorry, but I can't help with producing that package right now. " * 6
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+def make_client(url: str, cache_dir: str) -> LLMClient:
+    client = LLMClient(cache=LLMCache(path=os.path.join(cache_dir, f"llm_{time.time_ns()}.json"), enabled=False))
+    client.base_url = url
+    return client
+
+def main(delays_ms, chunk_size: int = 12):
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    print(f"package={len(PACKAGE)} chars in {chunk_size}-char chunks")
+    print(f"{'delay ms':>9} {'blocking ms':>12} {'stream ms':>10} {'1st section ms':>15} {'abort ms':>9}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for delay in delays_ms:
+            with LLMStub(split_chunks(PACKAGE, chunk_size), delay=delay / 1000) as stub:
+                _, blocking_ms = timed(lambda: make_client(stub.url, cache_dir).generate("p", reserved=True))
+
+                start = time.perf_counter()
+                first = []
+                parser = ScriptSectionParser(on_section=lambda s: first or first.append((time.perf_counter() - start) * 1000))
+                watcher = ContentGenerator._stream_watcher("{", parser, lambda t: partial_string_field(t, "script"))
+                make_client(stub.url, cache_dir).generate_stream("p", reserved=True, on_text=watcher)
+                stream_ms = (time.perf_counter() - start) * 1000
+
+            with LLMStub(split_chunks(MALFORMED, chunk_size), delay=delay / 1000) as stub:
+                watcher = ContentGenerator._stream_watcher("{")
+                _, abort_ms = timed(lambda: make_client(stub.url, cache_dir).generate_stream("p", reserved=True, on_text=watcher))
+
+            print(f"{delay:>9} {blocking_ms:>12.1f} {stream_ms:>10.1f} {first[0] if first else float('nan'):>15.1f} {abort_ms:>9.1f}")
+
+if __name__ == "__main__":
+    main([float(a) for a in sys.argv[1:]] or [0, 2, 5])
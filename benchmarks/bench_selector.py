@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Selection benchmark over pool size: exact branch and bound vs. greedy lane heaps.
+
+Run from the repository root:
+    python benchmarks/bench_selector.py [sizes...]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.decision import NarrativeSelector
+
+WORDS = [
+    "bitcoin", "crypto", "ethereum", "stocks", "market", "dividend", "fed", "economy", "inflation",
+    "psychology", "mind", "rates", "why", "hidden", "tesla", "earnings", "recession", "wallet",
+]
+EXACT_LIMIT = 40 # beyond this the exact search mostly measures its node budget
+
+def make_pool(n: int, seed: int = 5):
+    rng = random.Random(seed)
+    pool = [
+        {"id": str(i), "title": " ".join(rng.sample(WORDS, rng.randint(3, 6))), "final_score": round(rng.uniform(50, 150), 2)}
+        for i in range(n)
+    ]
+    pool.sort(key=lambda c: c["final_score"], reverse=True)
+    return pool
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+def main(sizes, count: int = 8):
+    selector = NarrativeSelector()
+    min_quota, max_quota = selector.lane_quotas(count)
+    print(f"count={count} lane minimums={min_quota}")
+    print(f"{'pool':>6} {'greedy ms':>10} {'greedy score':>13} {'exact ms':>10} {'exact score':>12}")
+    for n in sizes:
+        pool = make_pool(n)
+        scores = [c["final_score"] for c in pool]
+        lanes = [selector._assign_lane(c) for c in pool]
+        tokens = [selector._tokens(c["title"]) for c in pool]
+        args = (scores, lanes, tokens, count, min_quota, max_quota)
+        
+        greedy, greedy_ms = timed(lambda: selector._solve_greedy(*args))
+        line = f"{n:>6} {greedy_ms:>10.2f} {sum(scores[i] for i in greedy):>13.2f}"
+        if n <= EXACT_LIMIT:
+            exact, exact_ms = timed(lambda: selector._solve_exact(*args))
+            line += f" {exact_ms:>10.2f} {sum(scores[i] for i in exact):>12.2f}"
+        print(line)
+        
+        _, full_ms = timed(lambda: selector.select_daily_content(pool, count=count))
+        print(f"{'':>6} select_daily_content end to end: {full_ms:.2f} ms")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10, 24, 40, 200, 1000, 5000])
@@ -1,3 +1,4 @@
 from .selector import NarrativeSelector
+from .calendar_planner import CalendarPlanner
 
-__all__ = ["NarrativeSelector"]
+__all__ = ["NarrativeSelector", "CalendarPlanner"]
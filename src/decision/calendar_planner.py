@@ -0,0 +1,246 @@
+import json
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+from ..shared import get_logger, CandidateBatch
+from .selector import NarrativeSelector
+
+logger = get_logger(__name__)
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+class CalendarPlanner:
+    """Rolling slot calendar over the next horizon_days, fed from a persisted backlog.
+
+    Scored candidates that don't make today's slots stay in the backlog (their
+    score decaying with age) and are planned into later slots of the week.
+    Weekly lane quotas come from the selector's percentages over all slots in
+    the horizon. Each run only re-plans the affected slots: empty ones, ones
+    whose candidate expired, and ones a new candidate clearly outscores.
+    """
+
+    def __init__(self, selector: NarrativeSelector, schedule: Dict, path: str = "memory/content_calendar.json"):
+        self.selector = selector
+        self.schedule = schedule
+        self.path = Path(path)
+
+        config = schedule.get("calendar", {})
+        self.horizon_days = config.get("horizon_days", 7)
+        self.backlog_ttl_hours = config.get("backlog_ttl_hours", 72)
+        self.score_half_life_hours = config.get("score_half_life_hours", 48)
+        self.replan_margin = config.get("replan_margin", 0.1)
+
+        self.state = self._load()
+
+    def _load(self) -> Dict:
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning("Content calendar unreadable, starting fresh", error=str(e))
+        return {"backlog": {}, "slots": {}, "taken": []}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        tmp.replace(self.path)
+
+    @staticmethod
+    def _key(record: Dict) -> str:
+        # Candidate ids carry the run timestamp, so the backlog is keyed by title
+        return " ".join((record.get("title") or "").lower().split())
+
+    def _slot_grid(self, now: datetime) -> List[Dict]:
+        """Slots for the horizon, in publishing order (long-form first within a day)."""
+        slots = []
+        for offset in range(self.horizon_days):
+            day = (now + timedelta(days=offset)).date()
+            weekday = WEEKDAYS[day.weekday()]
+            for fmt, section in (("long", "longform"), ("short", "shorts")):
+                config = self.schedule.get(section, {})
+                if weekday not in config.get("days_active", WEEKDAYS):
+                    continue
+                times = config.get("publish_times_utc") or [{"hour": 10, "minute": 0}]
+                for n in range(config.get("daily_count", 1 if fmt == "long" else 2)):
+                    t = times[min(n, len(times) - 1)]
+                    slots.append({
+                        "slot_id": f"{day.isoformat()}:{fmt}:{n}",
+                        "date": day.isoformat(),
+                        "time": f"{t.get('hour', 0):02d}:{t.get('minute', 0):02d}",
+                        "format": fmt,
+                    })
+        return slots
+
+    def _effective_score(self, entry: Dict, now: datetime) -> float:
+        age_hours = max((now - datetime.fromisoformat(entry["scored_at"])).total_seconds() / 3600, 0)
+        return entry["record"].get("final_score", 0) * 0.5 ** (age_hours / self.score_half_life_hours)
+
+    def update(self, scored_candidates: Union[List[Dict], CandidateBatch], now: Optional[datetime] = None) -> Dict:
+        """Merge a run's scored candidates into the backlog and re-plan the affected slots."""
+        now = now or datetime.utcnow()
+        records = scored_candidates.to_records() if isinstance(scored_candidates, CandidateBatch) else scored_candidates
+
+        backlog = self.state["backlog"]
+        added = 0
+        for record in records:
+            if record.get("final_score", 0) < 50: # Minimum viability, as in the selector
+                continue
+            key = self._key(record)
+            entry = backlog.get(key)
+            if entry is None:
+                added += 1
+            elif entry.get("consumed"):
+                continue
+            # A re-scored candidate replaces the stale copy (fresh timeliness, fresh decay clock)
+            backlog[key] = {
+                "record": dict(record, narrative_lane=self.selector._assign_lane(record)),
+                "scored_at": now.isoformat(),
+            }
+
+        # Candidates planned into a slot still ahead wait for it, however far out in the horizon it is
+        today = now.date().isoformat()
+        planned = {key for slot_id, key in self.state.get("slots", {}).items() if slot_id[:10] >= today}
+        cutoff = now - timedelta(hours=self.backlog_ttl_hours)
+        expired = [
+            k for k, e in backlog.items()
+            if datetime.fromisoformat(e["scored_at"]) < cutoff and (e.get("consumed") or k not in planned)
+        ]
+        for key in expired:
+            del backlog[key]
+
+        stats = self._replan(now)
+        stats.update(added=added, expired=len(expired), backlog=sum(1 for e in backlog.values() if not e.get("consumed")))
+        self._save()
+        logger.info("Content calendar updated", **stats)
+        return stats
+
+    def _open_slots(self, now: datetime) -> List[Dict]:
+        """The grid minus slots already taken (so a second run on the same day doesn't refill them)."""
+        today = now.date().isoformat()
+        self.state["taken"] = [slot_id for slot_id in self.state.get("taken", []) if slot_id[:10] >= today]
+        taken = set(self.state["taken"])
+        return [slot for slot in self._slot_grid(now) if slot["slot_id"] not in taken]
+
+    def _replan(self, now: datetime) -> Dict:
+        backlog = self.state["backlog"]
+        grid = self._open_slots(now)
+        previous = self.state.get("slots", {})
+
+        # Keep assignments whose candidate is still waiting in the backlog
+        kept: Dict[str, str] = {}
+        for slot in grid:
+            key = previous.get(slot["slot_id"])
+            if key in backlog and not backlog[key].get("consumed") and key not in kept.values():
+                kept[slot["slot_id"]] = key
+
+        assigned = set(kept.values())
+        pool = sorted(
+            (k for k, e in backlog.items() if not e.get("consumed") and k not in assigned),
+            key=lambda k: self._effective_score(backlog[k], now), reverse=True,
+        )
+
+        # Free the weakest kept slots while an unplanned candidate clearly beats them
+        weakest = sorted(kept, key=lambda slot_id: self._effective_score(backlog[kept[slot_id]], now))
+        freed = 0
+        for key, slot_id in zip(list(pool), weakest):
+            if self._effective_score(backlog[key], now) <= self._effective_score(backlog[kept[slot_id]], now) * (1 + self.replan_margin):
+                break
+            pool.append(kept.pop(slot_id))
+            freed += 1
+        pool.sort(key=lambda k: self._effective_score(backlog[k], now), reverse=True)
+
+        affected = [slot for slot in grid if slot["slot_id"] not in kept]
+        picks = self._pick(pool, kept, len(grid), len(affected), now)
+
+        # Best picks go to the earliest affected slots
+        slots = dict(kept)
+        for slot, key in zip(affected, picks):
+            slots[slot["slot_id"]] = key
+        self.state["slots"] = {slot["slot_id"]: slots[slot["slot_id"]] for slot in grid if slot["slot_id"] in slots}
+
+        return {"slots": len(grid), "planned": len(self.state["slots"]), "replanned": len(affected), "displaced": freed}
+
+    def _pick(self, pool: List[str], kept: Dict[str, str], total_slots: int, count: int, now: datetime) -> List[str]:
+        """Choose count candidates for the open slots under the week's residual lane quotas."""
+        if not count or not pool:
+            return []
+        backlog = self.state["backlog"]
+        kept_tokens = [self.selector._tokens(backlog[k]["record"].get("title", "")) for k in kept.values()]
+        pool = [
+            k for k in pool
+            if not any(self.selector._similar_tokens(self.selector._tokens(backlog[k]["record"].get("title", "")), t) for t in kept_tokens)
+        ]
+
+        min_quota, max_quota = self.selector.lane_quotas(total_slots)
+        for key in kept.values():
+            lane = backlog[key]["record"]["narrative_lane"]
+            if lane in min_quota:
+                min_quota[lane] = max(min_quota[lane] - 1, 0)
+                max_quota[lane] = max(max_quota[lane] - 1, 0)
+
+        scores = [self._effective_score(backlog[k], now) for k in pool]
+        lanes = [backlog[k]["record"]["narrative_lane"] for k in pool]
+        tokens = [self.selector._tokens(backlog[k]["record"].get("title", "")) for k in pool]
+        selected, _ = self.selector.solve(scores, lanes, tokens, count, min_quota, max_quota)
+        return [pool[i] for i in sorted(selected)]
+
+    def take_today(self, now: Optional[datetime] = None) -> Dict:
+        """Today's planned slots as a selection plan.
+
+        Nothing is consumed here: a run that fails before commit() gets the
+        same slots back when the day is re-run.
+        """
+        now = now or datetime.utcnow()
+        today = now.date().isoformat()
+        backlog = self.state["backlog"]
+
+        shorts, longs = [], []
+        lane_usage = {lane: 0 for lane in self.selector.lanes}
+        for slot in self._open_slots(now):
+            key = self.state["slots"].get(slot["slot_id"])
+            if slot["date"] != today or key not in backlog:
+                continue
+            record = dict(backlog[key]["record"], format=slot["format"], slot_id=slot["slot_id"], publish_time_utc=slot["time"])
+            (longs if slot["format"] == "long" else shorts).append(record)
+            lane_usage[record["narrative_lane"]] = lane_usage.get(record["narrative_lane"], 0) + 1
+
+        logger.info("Today's calendar slots selected", shorts=len(shorts), longs=len(longs), lanes=lane_usage)
+        return {
+            "shorts": shorts,
+            "long": longs,
+            "total_selected": len(shorts) + len(longs),
+            "lane_distribution": lane_usage,
+        }
+
+    def commit(self, slot_ids: List[str]):
+        """Mark slots as done once their videos went out; their candidates leave the backlog."""
+        backlog = self.state["backlog"]
+        committed = 0
+        for slot_id in slot_ids:
+            key = self.state["slots"].pop(slot_id, None)
+            if key in backlog:
+                backlog[key]["consumed"] = True
+            if slot_id not in self.state["taken"]:
+                self.state["taken"].append(slot_id)
+                committed += 1
+        self._save()
+        logger.info("Calendar slots committed", slots=committed)
+
+    def get_calendar(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Planned slots with their candidate's title, lane and current score."""
+        now = now or datetime.utcnow()
+        backlog = self.state["backlog"]
+        calendar = []
+        for slot in self._open_slots(now):
+            key = self.state["slots"].get(slot["slot_id"])
+            entry = backlog.get(key) if key else None
+            calendar.append(dict(slot, **({
+                "title": entry["record"].get("title"),
+                "narrative_lane": entry["record"].get("narrative_lane"),
+                "score": round(self._effective_score(entry, now), 2),
+            } if entry else {"title": None})))
+        return calendar
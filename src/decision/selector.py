@@ -1,148 +1,301 @@
 import json
+import math
+import heapq
 from pathlib import Path
-from typing import List, Dict, Optional
-from ..shared import get_logger
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
+from ..shared import get_logger, text_features, CandidateBatch
 
 logger = get_logger(__name__)
 
 class NarrativeSelector:
-    def __init__(self):
+    # Pools up to this size are solved exactly; overridable via allocation_rules
+    exact_solver_max_pool = 24
+    exact_solver_node_budget = 200000
+    
+    def __init__(self, config_path: str = "config/narrative_lanes.json"):
+        self.config_path = Path(config_path)
         self.narrative_config = self._load_narrative_config()
         self.lanes = self.narrative_config.get("lanes", {})
         self.allocation_rules = self.narrative_config.get("allocation_rules", {})
+        
+        # Lane keywords differ per channel config, so each config gets its own group
+        self.lane_group = f"selector.lanes:{self.config_path}"
+        text_features.register_group(self.lane_group, {
+            lane_id: lane_data.get("keywords", []) for lane_id, lane_data in self.lanes.items()
+        })
+        # Default fallback based on basic keywords if config keywords fail
+        text_features.register_group("selector.fallback_lanes", {
+            "crypto_blockchain": ["crypto", "bitcoin"],
+            "stock_market": ["stock", "market"],
+            "macro_economics": ["fed", "economy"],
+            "investing_psychology": ["psychology", "mind"],
+        })
         logger.info("NarrativeSelector initialized", lanes=list(self.lanes.keys()))
     
     def _load_narrative_config(self) -> Dict:
-        config_path = Path("config/narrative_lanes.json")
-        if config_path.exists():
-            with open(config_path) as f:
+        if self.config_path.exists():
+            with open(self.config_path) as f:
                 return json.load(f)
         return {"lanes": {}, "allocation_rules": {}}
     
-    def select_daily_content(self, scored_candidates: List[Dict], count: int = 3) -> Dict:
-        if not scored_candidates:
+    def select_daily_content(self, scored_candidates: Union[List[Dict], CandidateBatch], count: int = 3, long_count: int = 1) -> Dict:
+        """Pick today's content from scored candidates.
+        
+        Maximizes total score subject to lane quotas (largest-remainder minimums,
+        percentage maximums unless a candidate clears soft_quota_override_vps) and
+        title-similarity exclusions. Minimum quotas are soft but dominate score.
+        Small pools are solved exactly by branch and bound, large ones greedily
+        with a lazy heap per lane. The best long_count picks fill the long-form
+        slots. Works on a CandidateBatch (lists are converted) without mutating it;
+        the selection plan holds plain dicts.
+        """
+        if not len(scored_candidates):
             logger.warning("No candidates to select from")
             return {"shorts": [], "long": []}
         
+        batch = scored_candidates if isinstance(scored_candidates, CandidateBatch) else CandidateBatch.from_records(scored_candidates)
+        
         # 1. Assign Lanes and Filter
-        candidates_with_lanes = []
-        for c in scored_candidates:
-            if c.get("final_score", 0) < 50: # Minimum viability
-                continue
-            c["narrative_lane"] = self._assign_lane(c)
-            candidates_with_lanes.append(c)
-            
-        # Sort by score
-        candidates_with_lanes.sort(key=lambda x: x["final_score"], reverse=True)
+        scores = np.asarray(batch.column("final_score", 0), dtype=float)
+        viable = batch.filter(scores >= 50) # Minimum viability
+        if len(viable):
+            viable = viable.with_columns(narrative_lane=[self._assign_lane(row) for row in viable.rows()])
+            # Sort by score; ranks below are positions in this order
+            viable = viable.sort_by("final_score")
+        
+        lanes = viable["narrative_lane"].tolist() if len(viable) else []
+        final_scores = viable["final_score"].tolist() if len(viable) else []
+        tokens = [self._tokens(title) for title in (viable.column("title", "").tolist() if len(viable) else [])]
         
         # 2. Select with Quotas and Dedup
-        selected = []
-        selected_titles = set()
+        min_quota, max_quota = self.lane_quotas(count)
+        selected, solver = self.solve(final_scores, lanes, tokens, count, min_quota, max_quota)
+        
         lane_usage = {lane: 0 for lane in self.lanes}
-        total_quota = count
-        
-        # Calculate target counts per lane
-        lane_targets = {}
-        for lane, data in self.lanes.items():
-            min_pct = data.get("percentage_min", 0)
-            target = max(1, int(total_quota * (min_pct / 100.0)))
-            lane_targets[lane] = target
-
-        # Selection Loop
-        for candidate in candidates_with_lanes:
-            if len(selected) >= count:
-                break
-                
-            title = candidate.get("title", "")
-            lane = candidate.get("narrative_lane")
-            score = candidate.get("final_score", 0)
-            
-            # Semantic Dedup (Simple title check for now)
-            if any(self._is_semantically_similar(title, t) for t in selected_titles):
-                continue
-            
-            # Quota Check
-            current_lane_count = lane_usage.get(lane, 0)
-            is_lane_full = current_lane_count >= lane_targets.get(lane, 99)
-            
-            # Override if High Score
-            soft_quota_override = self.allocation_rules.get("soft_quota_override_vps", 85)
-            if is_lane_full and score < soft_quota_override:
-                # Try to find another candidate unless we are desperate
-                # But we iterate in score order, so skipping might mean lower score later.
-                # If we skip, we might find a candidate for an under-filled lane.
-                # Check if other lanes are under-filled
-                under_filled_lanes = [l for l, t in lane_targets.items() if lane_usage.get(l, 0) < t]
-                if under_filled_lanes:
-                    continue # Skip this high score to fill quota elsewhere
-            
-            # Add to selection
-            selected.append(candidate)
-            selected_titles.add(title)
-            lane_usage[lane] = lane_usage.get(lane, 0) + 1
-            
-        # 3. Format Assignment (1 Long, rest Shorts)
-        # Best candidate gets Long form if suitable, or random?
-        # Usually highest score = Long form candidate
-        if selected:
-            # Sort selected by score again just to be sure
-            selected.sort(key=lambda x: x["final_score"], reverse=True)
-            selected[0]["format"] = "long"
-            for item in selected[1:]:
-                item["format"] = "short"
+        for i in selected:
+            lane_usage[lanes[i]] = lane_usage.get(lanes[i], 0) + 1
         
-        shorts = [c for c in selected if c["format"] == "short"]
-        longs = [c for c in selected if c["format"] == "long"]
+        # 3. Format Assignment: highest scores take the long-form slots
+        shorts, longs = [], []
+        if selected:
+            chosen = viable.take(sorted(selected))
+            chosen = chosen.with_columns(format=["long" if i < long_count else "short" for i in range(len(chosen))])
+            records = chosen.to_records()
+            longs, shorts = records[:long_count], records[long_count:]
         
         selection_plan = {
             "shorts": shorts,
             "long": longs,
             "total_selected": len(shorts) + len(longs),
             "lane_distribution": lane_usage,
+            "lane_targets": min_quota,
+            "solver": solver,
         }
         
         logger.info(
             "Content selection complete",
             shorts=len(shorts),
             longs=len(longs),
-            lanes=selection_plan["lane_distribution"]
+            lanes=selection_plan["lane_distribution"],
+            solver=selection_plan["solver"],
+            pool=len(viable),
         )
         
         return selection_plan
     
-    def _assign_lane(self, candidate: Dict) -> str:
-        title_lower = candidate.get("title", "").lower()
+    def solve(self, scores: List[float], lanes: List[str], tokens: List[frozenset], count: int,
+              min_quota: Dict[str, int], max_quota: Dict[str, int]) -> Tuple[List[int], str]:
+        """Ranks (positions in the score-sorted pool) to pick, and which solver picked them."""
+        exact = len(scores) <= self.allocation_rules.get("exact_solver_max_pool", self.exact_solver_max_pool)
+        solve = self._solve_exact if exact else self._solve_greedy
+        selected = solve(scores, lanes, tokens, count, min_quota, max_quota)
+        return self._top_up(selected, tokens, count), "exact" if exact else "greedy"
+    
+    def lane_quotas(self, count: int) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Minimum and maximum picks per lane for a day with count slots.
+        
+        Minimums split the slots by percentage_min with the largest-remainder method,
+        so they always sum to at most count; maximums round percentage_max (plus the
+        allowed flexibility) up.
+        """
+        if not self.lanes or not self.allocation_rules.get("enforce_quotas", True):
+            return {}, {}
+        
+        shares = {lane: count * data.get("percentage_min", 0) / 100.0 for lane, data in self.lanes.items()}
+        min_quota = {lane: math.floor(share) for lane, share in shares.items()}
+        spare = min(count, round(sum(shares.values()))) - sum(min_quota.values())
+        by_remainder = sorted(shares, key=lambda lane: shares[lane] - min_quota[lane], reverse=True)
+        for lane in by_remainder[:max(spare, 0)]:
+            min_quota[lane] += 1
+        
+        flexibility = self.allocation_rules.get("allow_flexibility", 0)
+        max_quota = {
+            lane: max(min_quota[lane], math.ceil(count * (data.get("percentage_max", 100) / 100.0 + flexibility) - 1e-9))
+            for lane, data in self.lanes.items()
+        }
+        return min_quota, max_quota
+    
+    def _allowed(self, score: float, lane_count: int, lane: str, max_quota: Dict[str, int]) -> bool:
+        # A high enough score may break a lane cap
+        return lane_count < max_quota.get(lane, float("inf")) or score >= self.allocation_rules.get("soft_quota_override_vps", 85)
+    
+    def _solve_greedy(self, scores: List[float], lanes: List[str], tokens: List[frozenset], count: int,
+                      min_quota: Dict[str, int], max_quota: Dict[str, int]) -> List[int]:
+        """Fill lane minimums best-first from per-lane heaps, then the best of the rest."""
+        heaps: Dict[str, List[int]] = {}
+        for rank, lane in enumerate(lanes):
+            heaps.setdefault(lane, []).append(rank) # ranks are already in heap order
+        
+        selected: List[int] = []
+        taken = set()
+        lane_usage: Dict[str, int] = {}
         
-        lane_scores = {}
-        for lane_id, lane_data in self.lanes.items():
-            score = 0
-            keywords = lane_data.get("keywords", [])
+        def conflicts(rank: int) -> bool:
+            return any(self._similar_tokens(tokens[rank], tokens[j]) for j in selected)
+        
+        def take(rank: int):
+            selected.append(rank)
+            taken.add(rank)
+            lane_usage[lanes[rank]] = lane_usage.get(lanes[rank], 0) + 1
+        
+        # Phase 1: minimums. Conflicts only grow, so invalid heap tops are dropped for good
+        while len(selected) < count:
+            best = None
+            for lane, heap in heaps.items():
+                if lane_usage.get(lane, 0) >= min_quota.get(lane, 0):
+                    continue
+                while heap and (heap[0] in taken or conflicts(heap[0])):
+                    heapq.heappop(heap)
+                if heap and (best is None or heap[0] < best):
+                    best = heap[0]
+            if best is None:
+                break
+            take(best)
+        
+        # Phase 2: remaining slots in score order
+        for rank in range(len(scores)):
+            if len(selected) >= count:
+                break
+            if rank in taken or conflicts(rank):
+                continue
+            if self._allowed(scores[rank], lane_usage.get(lanes[rank], 0), lanes[rank], max_quota):
+                take(rank)
+        return selected
+    
+    def _solve_exact(self, scores: List[float], lanes: List[str], tokens: List[frozenset], count: int,
+                     min_quota: Dict[str, int], max_quota: Dict[str, int]) -> List[int]:
+        """Branch and bound over include/exclude decisions in score order.
+        
+        Objective: total score minus a penalty per missing minimum-quota pick, with the
+        penalty larger than any achievable score gain. Seeded with the greedy solution,
+        and stops at node_budget with the best solution found so far.
+        """
+        n = len(scores)
+        incumbent = self._solve_greedy(scores, lanes, tokens, count, min_quota, max_quota)
+        if not n:
+            return incumbent
+        
+        penalty = count * max(scores) + 1
+        conflict = [
+            {j for j in range(n) if j != i and self._similar_tokens(tokens[i], tokens[j])}
+            for i in range(n)
+        ]
+        # suffix_in_lane[pos][lane]: candidates of the lane at ranks >= pos
+        suffix_in_lane: List[Dict[str, int]] = [{} for _ in range(n + 1)]
+        for pos in range(n - 1, -1, -1):
+            suffix_in_lane[pos] = dict(suffix_in_lane[pos + 1])
+            suffix_in_lane[pos][lanes[pos]] = suffix_in_lane[pos].get(lanes[pos], 0) + 1
+        prefix = [0.0]
+        for score in scores:
+            prefix.append(prefix[-1] + score)
+        
+        def value(chosen: List[int], usage: Dict[str, int]) -> float:
+            shortfall = sum(max(q - usage.get(lane, 0), 0) for lane, q in min_quota.items())
+            return sum(scores[i] for i in chosen) - penalty * shortfall
+        
+        def usage_of(chosen: List[int]) -> Dict[str, int]:
+            usage: Dict[str, int] = {}
+            for i in chosen:
+                usage[lanes[i]] = usage.get(lanes[i], 0) + 1
+            return usage
+        
+        best = {"value": value(incumbent, usage_of(incumbent)), "chosen": list(incumbent)}
+        budget = {"nodes": self.allocation_rules.get("exact_solver_node_budget", self.exact_solver_node_budget)}
+        chosen: List[int] = []
+        usage: Dict[str, int] = {}
+        
+        def search(pos: int, score_sum: float):
+            budget["nodes"] -= 1
+            deficits = {lane: q - usage.get(lane, 0) for lane, q in min_quota.items() if q > usage.get(lane, 0)}
+            current = score_sum - penalty * sum(deficits.values())
+            if current > best["value"]:
+                best["value"], best["chosen"] = current, list(chosen)
             
-            for keyword in keywords:
-                if keyword in title_lower:
-                    score += 1
+            slots = count - len(chosen)
+            if not slots or pos >= n or budget["nodes"] <= 0:
+                return
             
-            lane_scores[lane_id] = score
-        
-        if max(lane_scores.values()) == 0:
-            # Default fallback based on basic keywords if config keywords fail
-            if "crypto" in title_lower or "bitcoin" in title_lower:
-                return "crypto_blockchain"
-            elif "stock" in title_lower or "market" in title_lower:
-                return "stock_market"
-            elif "fed" in title_lower or "economy" in title_lower:
-                return "macro_economics"
-            elif "psychology" in title_lower or "mind" in title_lower:
-                return "investing_psychology"
-            else:
-                return "stock_market" # Default to biggest lane
+            # Bound: the best remaining scores fill every slot and every fillable deficit is met
+            fillable = min(slots, sum(min(d, suffix_in_lane[pos].get(lane, 0)) for lane, d in deficits.items()))
+            bound = score_sum + prefix[min(pos + slots, n)] - prefix[pos] - penalty * (sum(deficits.values()) - fillable)
+            if bound <= best["value"]:
+                return
+            
+            lane = lanes[pos]
+            if not (conflict[pos] & set(chosen)) and self._allowed(scores[pos], usage.get(lane, 0), lane, max_quota):
+                chosen.append(pos)
+                usage[lane] = usage.get(lane, 0) + 1
+                search(pos + 1, score_sum + scores[pos])
+                usage[lane] -= 1
+                chosen.pop()
+            search(pos + 1, score_sum)
+        
+        search(0, 0.0)
+        if budget["nodes"] <= 0:
+            logger.warning("Exact selection hit its node budget, using best solution found", pool=n)
+        return best["chosen"]
+    
+    def _top_up(self, selected: List[int], tokens: List[frozenset], count: int) -> List[int]:
+        """Fill slots left empty by lane caps rather than publish fewer items."""
+        if len(selected) >= count:
+            return selected
+        selected = list(selected)
+        taken = set(selected)
+        before = len(selected)
+        for rank in range(len(tokens)):
+            if len(selected) >= count:
+                break
+            if rank in taken or any(self._similar_tokens(tokens[rank], tokens[j]) for j in selected):
+                continue
+            selected.append(rank)
+        if len(selected) > before:
+            logger.info("Lane caps relaxed to fill open slots", added=len(selected) - before)
+        return selected
+    
+    def _assign_lane(self, candidate: Dict) -> str:
+        # Lanes only look at the title; reuse the record from validation/scoring when there is one
+        features = text_features.extract(candidate.get("title", ""))
+        
+        lane_scores = features.counts(self.lane_group, title_only=True)
+        
+        if not lane_scores or max(lane_scores.values()) == 0:
+            for lane, hits in features.counts("selector.fallback_lanes", title_only=True).items():
+                if hits:
+                    return lane
+            return "stock_market" # Default to biggest lane
         
         return max(lane_scores, key=lane_scores.get)
     
-    def _is_semantically_similar(self, title1: str, title2: str) -> bool:
+    @staticmethod
+    def _tokens(title: str) -> frozenset:
+        return frozenset((title or "").lower().split())
+    
+    @staticmethod
+    def _similar_tokens(words1: frozenset, words2: frozenset) -> bool:
         # Simple Jaccard similarity on words
-        words1 = set(title1.lower().split())
-        words2 = set(title2.lower().split())
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        return (intersection / union) > 0.5 if union > 0 else False
+        union = len(words1 | words2)
+        return (len(words1 & words2) / union) > 0.5 if union > 0 else False
+    
+    def _is_semantically_similar(self, title1: str, title2: str) -> bool:
+        return self._similar_tokens(self._tokens(title1), self._tokens(title2))
@@ -1,5 +1,10 @@
 from .content_generator import ContentGenerator
 from .llm_client import LLMClient
+from .llm_cache import LLMCache
+from .cost_ledger import CostLedger, estimate_tokens
+from .budget_planner import BudgetPlanner
+from .model_router import ModelRouter, ModelSpec, LatencyHistogram
+from .edg_compiler import EDGCompiler
 from .template_engine import TemplateEngine
 
-__all__ = ["ContentGenerator", "LLMClient", "TemplateEngine"]
+__all__ = ["ContentGenerator", "LLMClient", "LLMCache", "CostLedger", "BudgetPlanner", "estimate_tokens", "ModelRouter", "ModelSpec", "LatencyHistogram", "EDGCompiler", "TemplateEngine"]
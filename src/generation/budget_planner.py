@@ -0,0 +1,93 @@
+from typing import Dict, List, Optional
+
+from ..shared import get_logger
+from .cost_ledger import CostLedger
+from .model_router import ModelSpec
+
+logger = get_logger(__name__)
+
+class BudgetPlanner:
+    """Pre-flight check that a generation batch fits in what the spend ledger still allows.
+
+    Each topic's LLM calls are priced at their worst case: the estimated prompt
+    plus max_tokens of completion per call. When the batch doesn't fit, the
+    planner first caps max_tokens (never below the format's floor), then moves
+    to cheaper models from the chain, and finally leaves the last topics to
+    templates, keeping the input order. extra_request_ratio keeps headroom for
+    hedges and failovers: each call is priced as 1 + ratio requests.
+    """
+
+    def __init__(
+        self,
+        ledger: CostLedger,
+        models: List[ModelSpec],
+        max_tokens: int,
+        min_max_tokens: Optional[Dict[str, int]] = None,
+        extra_request_ratio: float = 0.0,
+    ):
+        self.ledger = ledger
+        self.models = models
+        self.max_tokens = max_tokens
+        self.min_max_tokens = min_max_tokens or {"short": 1000, "long": 2500}
+        self.extra_request_ratio = max(extra_request_ratio, 0.0)
+        self.last_plan: Dict = {}
+
+    @staticmethod
+    def _unit_price(model: ModelSpec) -> float:
+        return model.usd_per_1k_input + model.usd_per_1k_output
+
+    def _chain_from(self, model: ModelSpec) -> List[ModelSpec]:
+        # Failover only to models that are no more expensive than the one planned for
+        return [model] + [m for m in self.models if m is not model and self._unit_price(m) <= self._unit_price(model)]
+
+    def _affordable_cap(self, requests: List[Dict], model: ModelSpec, budget: float) -> float:
+        scale = 1 + self.extra_request_ratio
+        prompt_usd = sum(r["prompt_tokens"] for r in requests) / 1000 * model.usd_per_1k_input * scale
+        calls = sum(r["calls"] for r in requests) * scale
+        if model.usd_per_1k_output <= 0 or calls == 0:
+            return float(self.max_tokens) if prompt_usd <= budget else -1.0
+        return (budget - prompt_usd) / (calls * model.usd_per_1k_output / 1000)
+
+    def _worst_usd(self, requests: List[Dict], model: ModelSpec, max_tokens: int) -> float:
+        return (1 + self.extra_request_ratio) * sum(
+            r["prompt_tokens"] / 1000 * model.usd_per_1k_input + r["calls"] * max_tokens / 1000 * model.usd_per_1k_output
+            for r in requests
+        )
+
+    def plan(self, requests: List[Dict]) -> List[Optional[Dict]]:
+        """requests: per topic {"prompt_tokens", "calls", "format"}.
+
+        Returns per topic {"models": [...], "max_tokens": n}, or None for templates.
+        """
+        budget = self.ledger.remaining_usd()
+        candidates = sorted(self.models, key=self._unit_price)
+        primary = self.models[0]
+        candidates = [primary] + [m for m in candidates if m is not primary and self._unit_price(m) < self._unit_price(primary)]
+
+        for count in range(len(requests), 0, -1):
+            batch = requests[:count]
+            floor = max(self.min_max_tokens.get(r["format"], self.max_tokens) for r in batch)
+            for model in candidates:
+                cap = min(self._affordable_cap(batch, model, budget), self.max_tokens)
+                if cap < min(floor, self.max_tokens):
+                    continue
+                max_tokens = int(cap)
+                chain = [m.id for m in self._chain_from(model)]
+                self.last_plan = {
+                    "budget_usd": round(budget, 4),
+                    "planned_usd": round(self._worst_usd(batch, model, max_tokens), 4),
+                    "llm_topics": count,
+                    "template_topics": len(requests) - count,
+                    "model": model.id,
+                    "max_tokens": max_tokens,
+                    "capped": max_tokens < self.max_tokens,
+                    "downgraded": model is not primary,
+                }
+                if count < len(requests) or self.last_plan["capped"] or self.last_plan["downgraded"]:
+                    logger.warning("Generation plan adjusted to fit the LLM budget", **self.last_plan)
+                return [{"models": chain, "max_tokens": max_tokens}] * count + [None] * (len(requests) - count)
+
+        self.last_plan = {"budget_usd": round(budget, 4), "planned_usd": 0.0, "llm_topics": 0, "template_topics": len(requests)}
+        if requests:
+            logger.warning("LLM budget exhausted, generating from templates", **self.last_plan)
+        return [None] * len(requests)
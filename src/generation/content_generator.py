@@ -1,20 +1,114 @@
 import json
+import time
 import hashlib
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
 from .llm_client import LLMClient
+from .budget_planner import BudgetPlanner
+from .cost_ledger import estimate_tokens
 from .template_engine import TemplateEngine
+from .json_repair import repair_json, partial_string_field
+from .script_sections import ScriptSectionParser
+from .edg_compiler import EDGCompiler
 from ..shared import get_logger
 
 logger = get_logger(__name__)
 
 class ContentGenerator:
-    def __init__(self):
+    # "combined": one JSON-schema call per topic; "sequential": hooks, then script
+    LLM_CALLS_PER_TOPIC = {"combined": 1, "sequential": 2}
+
+    def __init__(self, config_path: str = "config/github_actions_limits.json", schemas_path: str = "config/schemas.json"):
         self.llm_client = LLMClient()
         self.template_engine = TemplateEngine()
-        logger.info("ContentGenerator initialized")
-    
-    def generate_content(self, topic: Dict) -> Dict:
+
+        config = self._load_config(config_path)
+        parallelism = config.get("parallelism", {})
+        enabled = parallelism.get("enabled", True)
+        self.max_workers = parallelism.get("generation_parallel", 4) if enabled else 1
+        self.mode = config.get("llm", {}).get("generation_mode", "combined")
+        if self.mode not in self.LLM_CALLS_PER_TOPIC:
+            logger.warning("Unknown generation mode, using combined", mode=self.mode)
+            self.mode = "combined"
+        self.content_schema = self._load_config(schemas_path).get("generated_content")
+        edg_config = config.get("edg", {})
+        self.edg_compiler = EDGCompiler(
+            words_per_second=edg_config.get("words_per_second", 2.5),
+            min_scene_seconds=edg_config.get("min_scene_seconds", 2.0),
+        )
+        self.budget_planner = BudgetPlanner(
+            self.llm_client.ledger,
+            self.llm_client.router.models,
+            self.llm_client.max_tokens,
+            min_max_tokens=config.get("llm", {}).get("budget", {}).get("min_max_tokens"),
+            extra_request_ratio=config.get("llm", {}).get("budget", {}).get("extra_request_ratio", 0.25),
+        )
+        self.last_batch_stats: Dict = {}
+
+        logger.info("ContentGenerator initialized", max_workers=self.max_workers, mode=self.mode)
+
+    def _load_config(self, config_path: str) -> Dict:
+        path = Path(config_path)
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return {}
+
+    def generate_batch(self, topics: List[Dict], max_workers: Optional[int] = None) -> List[Dict]:
+        """Generate content for all topics concurrently; results come back in input order.
+
+        The OpenRouter budget is reserved per topic in input order before anything
+        runs, so which topics fall back to templates under the rate limit doesn't
+        depend on thread timing. Before that the budget planner prices the batch
+        against the spend ledger and caps max_tokens, downgrades the model or
+        leaves the tail to templates if it wouldn't fit. Within a topic only the
+        sequential mode's hooks -> script calls depend on each other.
+        """
+        if not topics:
+            return []
+
+        start = time.time()
+        calls = self.LLM_CALLS_PER_TOPIC[self.mode]
+        plans = self.budget_planner.plan([
+            {"prompt_tokens": self._prompt_tokens(topic), "calls": calls, "format": topic.get("format", "short")}
+            for topic in topics
+        ])
+        reserved = [plan is not None and self.llm_client.reserve(calls) for plan in plans]
+
+        workers = min(self.max_workers, max_workers or self.max_workers, len(topics))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.generate_content, topic, reserved=r, plan=plan)
+                for topic, r, plan in zip(topics, reserved, plans)
+            ]
+            results = []
+            failed = 0
+            for topic, future in zip(topics, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    failed += 1
+                    logger.error("Content generation failed, using templates", title=topic.get("title", "")[:50], error=str(e))
+                    results.append(self.generate_content(topic, reserved=False))
+
+        self.llm_client.save()
+        self.last_batch_stats = {
+            "topics": len(topics),
+            "workers": workers,
+            "llm_budgeted": sum(reserved),
+            "template_only": len(topics) - sum(reserved),
+            "failed": failed,
+            "elapsed_seconds": round(time.time() - start, 2),
+            "budget": self.budget_planner.last_plan,
+        }
+        logger.info("Content batch generated", **self.last_batch_stats)
+        return results
+
+    def generate_content(self, topic: Dict, reserved: Optional[bool] = None, plan: Optional[Dict] = None) -> Dict:
+        # reserved: None consumes the OpenRouter budget per call, True means the
+        # calls were reserved up front (generate_batch), False skips the LLM entirely.
+        # plan: the budget planner's {"models", "max_tokens"} for this topic
         title = topic.get("title", "")
         niche = topic.get("niche", "general")
         lane = topic.get("narrative_lane", "hidden_data")
@@ -28,17 +122,26 @@ class ContentGenerator:
             format=format_type
         )
         
-        # 1. Generate Hooks
-        hooks = self._generate_hooks(topic)
+        # Script sections are split into scenes as soon as they complete, while the stream is still arriving
+        compiled: List[List[Dict]] = []
+        sections = ScriptSectionParser(on_section=lambda section: self._add_section(compiled, section))
         
-        # 2. Generate Script
-        script = self._generate_script(topic, hooks)
+        if self.mode == "combined":
+            # 1-2, 4. Hooks, script and metadata in one call
+            hooks, script, metadata = self._generate_combined(topic, reserved, sections, plan)
+        else:
+            # 1. Generate Hooks
+            hooks = self._generate_hooks(topic, reserved, plan)
+            
+            # 2. Generate Script
+            script = self._generate_script(topic, hooks, reserved, sections, plan)
+            
+            # 4. Generate Metadata
+            metadata = self._generate_metadata(topic, hooks)
+        sections.finish(script)
         
         # 3. Generate EDG (Scene breakdown)
-        edg = self._generate_edg(topic, hooks, script)
-        
-        # 4. Generate Metadata
-        metadata = self._generate_metadata(topic, hooks)
+        edg = self._generate_edg(topic, hooks, script, compiled)
         
         result = {
             "video_id": self._generate_video_id(topic),
@@ -53,7 +156,166 @@ class ContentGenerator:
         logger.info("Content generation complete", video_id=result["video_id"])
         return result
     
-    def _generate_hooks(self, topic: Dict) -> List[str]:
+    def _llm_generate(
+        self,
+        prompt: str,
+        system_prompt: str,
+        reserved: Optional[bool],
+        response_format: Optional[Dict] = None,
+        on_text: Optional[Callable[[str], bool]] = None,
+        plan: Optional[Dict] = None,
+    ) -> Optional[str]:
+        if reserved is False:
+            return None
+        limits = {"max_tokens": plan["max_tokens"], "models": plan["models"]} if plan else {}
+        if self.llm_client.stream:
+            return self.llm_client.generate_stream(
+                prompt, system_prompt, reserved=bool(reserved), response_format=response_format, on_text=on_text, **limits,
+            )
+        return self.llm_client.generate(prompt, system_prompt, reserved=bool(reserved), response_format=response_format, **limits)
+
+    def _prompt_tokens(self, topic: Dict) -> int:
+        """Estimated prompt tokens of all LLM calls for a topic, for the budget planner."""
+        if self.mode == "combined":
+            prompts = [self._combined_prompts(topic)]
+            schema = self._content_response_format()
+            extra = estimate_tokens(json.dumps(schema)) if schema else 0
+        else:
+            # The script prompt quotes the first hook; the title stands in for it
+            prompts = [self._hooks_prompts(topic), self._script_prompts(topic, [topic.get("title", "")])]
+            extra = 0
+        return extra + sum(estimate_tokens(prompt) + estimate_tokens(system_prompt) for prompt, system_prompt in prompts)
+
+    @staticmethod
+    def _stream_watcher(
+        opening: Optional[str] = None,
+        sections: Optional[ScriptSectionParser] = None,
+        script_of: Callable[[str], Optional[str]] = lambda text: text,
+    ) -> Callable[[str], bool]:
+        """on_text callback: abort output that doesn't open as expected, feed the script to sections."""
+        def on_text(text: str) -> bool:
+            if opening:
+                body = text.lstrip()
+                if body.startswith("```"):
+                    body = body[3:]
+                    body = (body[4:] if body[:4].lower() == "json" else body).lstrip()
+                if body and not "```".startswith(body[:3]) and body[0] != opening:
+                    return False
+            if sections is not None:
+                script = script_of(text)
+                if script:
+                    sections.feed(script)
+            return True
+        return on_text
+
+    def _add_section(self, compiled: List[List[Dict]], section: Dict):
+        # Sections arrive in order; a re-parse restarts at index 0 and replaces what was compiled
+        del compiled[section["index"]:]
+        compiled.append(self.edg_compiler.section_scenes(section))
+
+    @staticmethod
+    def _tone(lane: str) -> str:
+        if lane in ["investing_psychology", "crypto_blockchain"]:
+            return "Casual educator"
+        elif lane in ["hidden_data", "contrarian"]:
+            return "Data nerd"
+        return "Serious analyst"
+
+    @staticmethod
+    def _string_list(value, min_items: int) -> Optional[List[str]]:
+        if not isinstance(value, list):
+            return None
+        items = [v.strip() for v in value if isinstance(v, str) and v.strip()]
+        return items if len(items) >= min_items else None
+
+    def _combined_prompts(self, topic: Dict):
+        title = topic.get("title", "")
+        niche = topic.get("niche", "finance")
+        format_type = topic.get("format", "short")
+        tone = self._tone(topic.get("narrative_lane", "general"))
+
+        prompt = f"""Create a YouTube {format_type} video package about: "{title}" (niche: {niche})
+
+Return one JSON object with:
+- "hooks": 3 hooks of 8-12 words each; analytical and data-driven, not sensational. Adapt templates like
+  "You probably don't know...", "This is counterintuitive...", "The data shows something unexpected..."
+- "titles": 2 title variants
+- "description": a description opening with a 150-character hook, then timestamps and resources
+- "tags": up to 20 search tags
+- "script": the full script opening with the first hook
+  - Tone: {tone}
+  - Structure: Problem -> Data -> Solution -> CTA
+  - Pattern interrupts every 5-10 seconds (mark with [VISUAL CHANGE])
+  - Total duration: {'30-50 seconds' if format_type == 'short' else '6-8 minutes'}
+  - Scene timing markers like [0:00], [0:15]
+  - Ending CTA: "Subscribe for more insights"
+  - No sensationalism without attribution; focus on facts, data, and clear analysis"""
+
+        system_prompt = f"You are a top-tier finance content strategist and scriptwriter. Optimized for CTR and retention. Tone: {tone}. Respond with JSON only."
+        return prompt, system_prompt
+
+    def _content_response_format(self) -> Optional[Dict]:
+        if not self.content_schema:
+            return None
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "generated_content", "strict": True, "schema": self.content_schema},
+        }
+
+    def _generate_combined(
+        self,
+        topic: Dict,
+        reserved: Optional[bool] = None,
+        sections: Optional[ScriptSectionParser] = None,
+        plan: Optional[Dict] = None,
+    ):
+        """Hooks, script and metadata from one schema-constrained response.
+
+        Each field that is missing or malformed (including one lost to a
+        truncated response) falls back to its template on its own.
+        """
+        format_type = topic.get("format", "short")
+        prompt, system_prompt = self._combined_prompts(topic)
+        on_text = self._stream_watcher("{", sections, lambda text: partial_string_field(text, "script"))
+        parsed = repair_json(self._llm_generate(prompt, system_prompt, reserved, self._content_response_format(), on_text, plan))
+        fields = parsed if isinstance(parsed, dict) else {}
+
+        fallbacks = []
+        hooks = self._string_list(fields.get("hooks"), 3)
+        if hooks is None:
+            fallbacks.append("hooks")
+            hooks = self.template_engine.generate_hooks(topic)
+        hooks = hooks[:3]
+
+        script = fields.get("script")
+        if not isinstance(script, str) or not script.strip():
+            fallbacks.append("script")
+            script = self.template_engine.generate_script(topic, format_type)
+
+        metadata = self._generate_metadata(topic, hooks)
+        titles = self._string_list(fields.get("titles"), 2)
+        if titles is None:
+            fallbacks.append("titles")
+        else:
+            metadata["titles"] = titles[:2]
+        description = fields.get("description")
+        if not isinstance(description, str) or not description.strip():
+            fallbacks.append("description")
+        else:
+            metadata["description"] = description
+        tags = self._string_list(fields.get("tags"), 1)
+        if tags is None:
+            fallbacks.append("tags")
+        else:
+            metadata["tags"] = tags[:20]
+
+        if fields and fallbacks:
+            logger.warning("Combined generation incomplete, template fallback per field", fields=fallbacks)
+        elif fields:
+            logger.info("LLM content package generated", hooks=len(hooks), script_length=len(script))
+        return hooks, script, metadata
+
+    def _hooks_prompts(self, topic: Dict):
         title = topic.get("title", "")
         niche = topic.get("niche", "finance")
         
@@ -75,8 +337,11 @@ Templates to consider adapting:
 Example: ["Here's what the data actually shows about inflation", "Three patterns most investors are missing today", "The numbers tell a different story about the recession"]"""
         
         system_prompt = "You are a top-tier finance content strategist. Optimized for CTR and retention."
-        
-        llm_result = self.llm_client.generate(llm_prompt, system_prompt)
+        return llm_prompt, system_prompt
+
+    def _generate_hooks(self, topic: Dict, reserved: Optional[bool] = None, plan: Optional[Dict] = None) -> List[str]:
+        llm_prompt, system_prompt = self._hooks_prompts(topic)
+        llm_result = self._llm_generate(llm_prompt, system_prompt, reserved, on_text=self._stream_watcher("["), plan=plan)
         
         if llm_result:
             try:
@@ -91,18 +356,14 @@ Example: ["Here's what the data actually shows about inflation", "Three patterns
         
         return self.template_engine.generate_hooks(topic)
     
-    def _generate_script(self, topic: Dict, hooks: List[str]) -> str:
+    def _script_prompts(self, topic: Dict, hooks: List[str]):
         title = topic.get("title", "")
         format_type = topic.get("format", "short")
         hook = hooks[0] if hooks else title
         lane = topic.get("narrative_lane", "general")
         
         # Determine Tone
-        tone = "Serious analyst" # Default
-        if lane in ["investing_psychology", "crypto_blockchain"]:
-            tone = "Casual educator"
-        elif lane in ["hidden_data", "contrarian"]:
-            tone = "Data nerd"
+        tone = self._tone(lane)
             
         prompt = f"""Write a full script for a YouTube {format_type} video about: "{title}"
 
@@ -121,113 +382,47 @@ Requirements:
 Output the script directly."""
 
         system_prompt = f"You are an expert scriptwriter for a finance channel. Tone: {tone}."
-        
-        script = self.llm_client.generate(prompt, system_prompt)
+        return prompt, system_prompt
+
+    def _generate_script(
+        self,
+        topic: Dict,
+        hooks: List[str],
+        reserved: Optional[bool] = None,
+        sections: Optional[ScriptSectionParser] = None,
+        plan: Optional[Dict] = None,
+    ) -> str:
+        prompt, system_prompt = self._script_prompts(topic, hooks)
+        script = self._llm_generate(prompt, system_prompt, reserved, on_text=self._stream_watcher(sections=sections), plan=plan)
         
         if script:
             return script
         else:
-            return self.template_engine.generate_script(topic, format_type)
+            return self.template_engine.generate_script(topic, topic.get("format", "short"))
             
-    def _generate_edg(self, topic: Dict, hooks: List[str], script: str) -> Dict:
+    def _generate_edg(self, topic: Dict, hooks: List[str], script: str, compiled: Optional[List[List[Dict]]] = None) -> Dict:
         format_type = topic.get("format", "short")
         
-        # In a real system, we might parse the script to build the EDG scenes.
-        # For now, we'll stick to a structured template but inject the script/hooks.
+        # Both formats are compiled from the script: scenes are cut at its timing
+        # markers and [VISUAL CHANGE] cues, each with its own narration and hash.
         
         if format_type == "short":
-            return self._generate_short_edg(topic, hooks, script)
+            return self._generate_short_edg(topic, hooks, script, compiled)
         else:
-            return self._generate_long_edg(topic, hooks, script)
+            return self._generate_long_edg(topic, hooks, script, compiled)
     
-    def _generate_short_edg(self, topic: Dict, hooks: List[str], script: str) -> Dict:
-        title = topic.get("title", "Unknown Topic")
-        hook = hooks[0] if hooks else "Here's what you need to know"
-        
-        edg = {
-            "video_id": self._generate_video_id(topic),
-            "format": "short",
-            "duration_seconds": 45, # Est
-            "aspect_ratio": "9:16",
-            "scenes": [
-                {
-                    "id": "scene_1",
-                    "type": "intro",
-                    "start": 0.0,
-                    "end": 3.0,
-                    "visual": "abstract_motion",
-                    "source_hint": "pexels:money finance",
-                    "text_overlay": hook,
-                    "tts_text": hook,
-                    "cut_type": "hard",
-                },
-                {
-                    "id": "scene_2",
-                    "type": "main",
-                    "start": 3.0,
-                    "end": 15.0,
-                    "visual": "data_visualization",
-                    "source_hint": "pexels:stock chart",
-                    "text_overlay": title,
-                    "tts_text": script[:100] + "...", # Placeholder, normally full segment
-                    "cut_type": "fade",
-                },
-                {
-                    "id": "scene_3",
-                    "type": "data",
-                    "start": 15.0,
-                    "end": 35.0,
-                    "visual": "supporting_footage",
-                    "source_hint": "pexels:business office",
-                    "text_overlay": "Key Insight",
-                    "tts_text": "...", # Placeholder
-                    "cut_type": "fade",
-                },
-                {
-                    "id": "scene_4",
-                    "type": "conclusion",
-                    "start": 35.0,
-                    "end": 45.0,
-                    "visual": "call_to_action",
-                    "source_hint": "abstract:gradient",
-                    "text_overlay": "Subscribe",
-                    "tts_text": "Subscribe for more insights.",
-                    "cut_type": "hard",
-                },
-            ],
-            "thumbnail_frame_hint": 3.5,
-            "metadata": {
-                "tone": "analytical",
-                "script_full": script
-            }
-        }
-        
+    def _generate_short_edg(self, topic: Dict, hooks: List[str], script: str = "", compiled: Optional[List[List[Dict]]] = None) -> Dict:
+        edg = self.edg_compiler.compile(
+            self._generate_video_id(topic), "short", script, hooks, topic.get("title", "Unknown Topic"), compiled,
+        )
+        edg["metadata"]["tone"] = "analytical"
         return edg
     
-    def _generate_long_edg(self, topic: Dict, hooks: List[str], script: str) -> Dict:
-        edg = {
-            "video_id": self._generate_video_id(topic),
-            "format": "long",
-            "duration_seconds": 440,
-            "aspect_ratio": "16:9",
-            "scenes": [
-                {
-                    "id": "scene_intro",
-                    "type": "intro",
-                    "start": 0.0,
-                    "end": 15.0,
-                    "visual": "intro_sequence",
-                    "text_overlay": hooks[0] if hooks else "Deep dive analysis",
-                    "tts_text": hooks[0] if hooks else "Let's analyze this in detail",
-                },
-                # Detailed scenes would be generated by parsing the script
-            ],
-            "thumbnail_frame_hint": 5.0,
-            "metadata": {
-                "script_full": script
-            }
-        }
-        
+    def _generate_long_edg(self, topic: Dict, hooks: List[str], script: str = "", compiled: Optional[List[List[Dict]]] = None) -> Dict:
+        edg = self.edg_compiler.compile(
+            self._generate_video_id(topic), "long", script, hooks, topic.get("title", "Deep dive analysis"), compiled,
+        )
+        edg["scenes"][0]["visual"] = "intro_sequence"
         return edg
     
     def _generate_metadata(self, topic: Dict, hooks: List[str]) -> Dict:
@@ -275,6 +470,8 @@ RESOURCES:
         return metadata
     
     def _generate_video_id(self, topic: Dict) -> str:
-        content = f"{topic.get('title', '')}_{topic.get('id', '')}"
+        # Channels picking the same trend must not share an ID: it names the rendered file and the queue/upload records
+        candidate_id = topic.get("candidate_id", topic.get("id", ""))
+        content = f"{topic.get('channel_id', '')}_{candidate_id}_{topic.get('title', '')}"
         hash_digest = hashlib.md5(content.encode()).hexdigest()[:12]
         return f"vid_{hash_digest}"
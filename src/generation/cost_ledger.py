@@ -0,0 +1,127 @@
+import json
+import math
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough BPE token count: ~4 characters per token for English, never fewer than ~1.3 per word."""
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / 4), math.ceil(len(text.split()) * 1.3))
+
+class CostLedger:
+    """Persisted LLM spend per UTC day: calls, prompt/completion tokens and dollars, per model.
+
+    Checked against the daily and monthly caps from cost_targets before a run
+    (by the budget planner) and before every request.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/cache/llm_spend.json",
+        max_daily_usd: float = 2.0,
+        max_monthly_usd: float = 50.0,
+        alert_threshold_usd: Optional[float] = None,
+        retention_days: int = 62,
+    ):
+        self.path = Path(path)
+        self.max_daily_usd = max_daily_usd
+        self.max_monthly_usd = max_monthly_usd
+        self.alert_threshold_usd = alert_threshold_usd
+        self.retention_days = retention_days
+        self.run_usd = 0.0
+        self.run_calls = 0
+        self._alerted = False
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.days: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get("days", {})
+        except Exception as e:
+            logger.warning("Spend ledger unreadable, starting fresh", error=str(e))
+            return {}
+
+    @staticmethod
+    def _today(now: Optional[datetime] = None) -> str:
+        return (now or datetime.utcnow()).date().isoformat()
+
+    def record(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        usd: float,
+        estimated: bool = False,
+        now: Optional[datetime] = None,
+    ):
+        with self._lock:
+            day = self.days.setdefault(self._today(now), {
+                "usd": 0.0, "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_calls": 0, "models": {},
+            })
+            day["usd"] += usd
+            day["calls"] += 1
+            day["prompt_tokens"] += prompt_tokens
+            day["completion_tokens"] += completion_tokens
+            day["estimated_calls"] += int(estimated)
+            day["models"][model] = day["models"].get(model, 0.0) + usd
+            self.run_usd += usd
+            self.run_calls += 1
+            self._dirty = True
+            month = self._month_usd(now)
+
+        if self.alert_threshold_usd is not None and month >= self.alert_threshold_usd and not self._alerted:
+            self._alerted = True
+            logger.warning("LLM spend past alert threshold", month_usd=round(month, 4), threshold_usd=self.alert_threshold_usd)
+
+    def _month_usd(self, now: Optional[datetime] = None) -> float:
+        month = self._today(now)[:7]
+        return sum((day["usd"] for date, day in self.days.items() if date.startswith(month)), 0.0)
+
+    def spent_today(self, now: Optional[datetime] = None) -> float:
+        with self._lock:
+            return self.days.get(self._today(now), {}).get("usd", 0.0)
+
+    def spent_month(self, now: Optional[datetime] = None) -> float:
+        with self._lock:
+            return self._month_usd(now)
+
+    def remaining_usd(self, now: Optional[datetime] = None) -> float:
+        """What can still be spent today under both the daily and the monthly cap."""
+        return max(min(
+            self.max_daily_usd - self.spent_today(now),
+            self.max_monthly_usd - self.spent_month(now),
+        ), 0.0)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).date().isoformat()
+            self.days = {date: day for date, day in self.days.items() if date >= cutoff}
+            data = {"days": self.days}
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+        tmp.replace(self.path)
+
+    def get_stats(self) -> Dict:
+        return {
+            "run_usd": round(self.run_usd, 4),
+            "run_calls": self.run_calls,
+            "today_usd": round(self.spent_today(), 4),
+            "month_usd": round(self.spent_month(), 4),
+            "remaining_usd": round(self.remaining_usd(), 4),
+        }
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from .script_sections import ScriptSectionParser
+
+VISUAL_CHANGE = re.compile(r"\[\s*VISUAL CHANGE\s*\]", re.IGNORECASE)
+STAGE_DIRECTION = re.compile(r"\[[^\]]*\]") # [B-roll: ...] and the like; not spoken
+SPEAKER_LABEL = re.compile(r"^\s*[A-Z][A-Z ]{1,20}:\s*") # "HOOK:", "KEY POINT:" in template scripts
+NUMBER = re.compile(r"\d[\d,.]*\s*(%|percent|x\b|bps\b|billion|million|trillion)?", re.IGNORECASE)
+STOPWORDS = {
+    "the", "and", "for", "that", "this", "with", "what", "your", "you", "are", "but", "not", "from", "have",
+    "has", "was", "were", "will", "they", "their", "there", "here", "about", "into", "more", "most", "than",
+    "when", "which", "while", "just", "like", "it's", "its", "our", "out", "all", "can", "how", "why", "who",
+    "let's", "actually", "really", "every", "some", "these", "those", "been", "being", "over", "only",
+}
+
+class EDGCompiler:
+    """Compiles a script into an edit decision graph: timed scenes ready to render on their own.
+
+    Scenes are cut at the script's [m:ss] timing markers and, inside a
+    section, at its [VISUAL CHANGE] cues. A section's span (up to the next
+    marker) is shared among its scenes by word count; the last section and
+    scripts without markers are timed at the speaking rate. A script without
+    markers or cues is cut at its paragraphs.
+
+    Each scene carries a content_hash over everything that affects its
+    rendering, and a tts_hash over its narration, so assembly can synthesize
+    and render scenes independently and reuse unchanged ones across renders.
+    """
+
+    FORMATS = {
+        "short": {"aspect_ratio": "9:16", "thumbnail_frame_hint": 3.5},
+        "long": {"aspect_ratio": "16:9", "thumbnail_frame_hint": 5.0},
+    }
+
+    def __init__(self, words_per_second: float = 2.5, min_scene_seconds: float = 2.0):
+        self.words_per_second = words_per_second
+        self.min_scene_seconds = min_scene_seconds
+
+    def section_scenes(self, section: Dict) -> List[Dict]:
+        """Untimed scenes of one script section, split at its visual-change cues."""
+        scenes = []
+        for part in VISUAL_CHANGE.split(section["text"]):
+            text = self._spoken(part)
+            if text:
+                scenes.append({"section": section["index"], "section_start": section["start"], "tts_text": text})
+        return scenes
+
+    def compile(
+        self,
+        video_id: str,
+        format_type: str,
+        script: str,
+        hooks: Optional[List[str]] = None,
+        title: str = "",
+        compiled: Optional[List[List[Dict]]] = None,
+    ) -> Dict:
+        """compiled: section_scenes() per section, when the sections were already split while streaming."""
+        hooks = hooks or []
+        # A single section (no timing markers) is re-split at its paragraphs below
+        parts = compiled if compiled and len(compiled) > 1 else None
+        if parts is None:
+            sections = ScriptSectionParser().finish(script or "")
+            if len(sections) == 1 and not VISUAL_CHANGE.search(script):
+                # No markers and no cues: the paragraphs are the scenes
+                paragraphs = [p for p in re.split(r"\n\s*\n", script.strip()) if self._spoken(p)]
+                sections = [{"index": i, "start": None, "text": p} for i, p in enumerate(paragraphs)]
+            parts = [self.section_scenes(section) for section in sections]
+        parts = [part for part in parts if part]
+        if not parts:
+            hook = hooks[0] if hooks else (title or "Here's what you need to know")
+            parts = [[{"section": 0, "section_start": 0.0, "tts_text": hook}]]
+
+        scenes = self._time(parts)
+        settings = self.FORMATS.get(format_type, self.FORMATS["short"])
+        for i, scene in enumerate(scenes):
+            self._describe(scene, i, len(scenes), hooks, title)
+            scene["content_hash"] = self.content_hash(scene, settings["aspect_ratio"])
+            scene["tts_hash"] = hashlib.sha256(scene["tts_text"].encode()).hexdigest()[:16]
+
+        return {
+            "video_id": video_id,
+            "format": format_type,
+            "duration_seconds": int(round(scenes[-1]["end"])),
+            "aspect_ratio": settings["aspect_ratio"],
+            "scenes": scenes,
+            "thumbnail_frame_hint": min(settings["thumbnail_frame_hint"], scenes[0]["end"]),
+            "metadata": {
+                "script_full": script,
+            },
+        }
+
+    def _spoken(self, text: str) -> str:
+        lines = [SPEAKER_LABEL.sub("", line) for line in STAGE_DIRECTION.sub(" ", text).splitlines()]
+        return " ".join(" ".join(lines).split())
+
+    def _speech_seconds(self, text: str) -> float:
+        return max(len(text.split()) / self.words_per_second, self.min_scene_seconds)
+
+    def _time(self, parts: List[List[Dict]]) -> List[Dict]:
+        scenes = []
+        clock = 0.0
+        for i, part in enumerate(parts):
+            start = part[0]["section_start"]
+            start = clock if start is None or start < clock else float(start)
+            spoken = [self._speech_seconds(scene["tts_text"]) for scene in part]
+            next_start = parts[i + 1][0]["section_start"] if i + 1 < len(parts) else None
+            span = sum(spoken)
+            if next_start is not None and next_start > start:
+                span = float(next_start) - start # the script's own timing wins
+            scale = span / sum(spoken)
+            for scene, seconds in zip(part, spoken):
+                end = start + seconds * scale
+                scenes.append({
+                    "id": f"scene_{len(scenes) + 1}",
+                    "type": "main",
+                    "start": round(start, 2),
+                    "end": round(end, 2),
+                    "duration": round(end - start, 2),
+                    "tts_text": scene["tts_text"],
+                    "cut_type": "hard" if scene is not part[0] else "fade", # cues are pattern interrupts
+                })
+                start = end
+            clock = start
+        scenes[0]["cut_type"] = "hard"
+        return scenes
+
+    def _describe(self, scene: Dict, index: int, count: int, hooks: List[str], title: str):
+        text = scene["tts_text"]
+        number = next((m.group(0).strip() for m in NUMBER.finditer(text) if not re.fullmatch(r"\d{1,2}", m.group(0).strip())), None)
+        if index == 0:
+            scene.update(type="intro", visual="abstract_motion", text_overlay=hooks[0] if hooks else title)
+        elif index == count - 1 and count > 1:
+            scene.update(type="conclusion", visual="call_to_action", text_overlay="Subscribe", cut_type="hard")
+        elif number:
+            scene.update(type="data", visual="data_visualization", text_overlay=number)
+        else:
+            scene.update(type="main", visual="supporting_footage", text_overlay=self._headline(text))
+
+        keywords = self._keywords(text) or self._keywords(title)
+        if scene["type"] == "conclusion":
+            scene["source_hint"] = "abstract:gradient"
+        elif scene["type"] == "data":
+            scene["source_hint"] = "chart:" + " ".join(keywords[:2] or ["stock chart"])
+        else:
+            scene["source_hint"] = "pexels:" + " ".join(keywords[:2] or ["money finance"])
+
+    @staticmethod
+    def _headline(text: str, max_words: int = 6) -> str:
+        sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+        words = sentence.rstrip(".!?").split()
+        return " ".join(words[:max_words]) + ("..." if len(words) > max_words else "")
+
+    @staticmethod
+    def _keywords(text: str) -> List[str]:
+        words = [w.strip(".,!?:;\"'()").lower() for w in text.split()]
+        counts = Counter(w for w in words if len(w) > 3 and w.isalpha() and w not in STOPWORDS)
+        return [w for w, _ in counts.most_common(2)]
+
+    @staticmethod
+    def content_hash(scene: Dict, aspect_ratio: str) -> str:
+        # Position in the timeline (id, start, end) doesn't change how a scene renders
+        fields = {k: scene.get(k) for k in ("type", "duration", "visual", "source_hint", "text_overlay", "tts_text")}
+        fields["aspect_ratio"] = aspect_ratio
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()[:16]
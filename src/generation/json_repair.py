@@ -0,0 +1,144 @@
+import re
+import json
+from typing import Any, List, Optional, Tuple
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+_decoder = json.JSONDecoder(strict=False) # LLMs put raw newlines inside strings
+
+def _strip_fences(text: str) -> str:
+    return text.replace("```json", "").replace("```", "").strip()
+
+def repair_json(text: Optional[str]) -> Optional[Any]:
+    """Parse JSON out of an LLM response, repairing what commonly goes wrong.
+
+    Handles markdown fences, prose around the value, raw control characters in
+    strings, trailing commas and truncation. A truncated response yields its
+    longest valid prefix: open containers are closed and the incomplete last
+    value (say, a script cut off mid-sentence) is dropped rather than kept half
+    written, so callers can fall back for that field. Returns None when nothing
+    usable is found.
+    """
+    if not text:
+        return None
+    text = _strip_fences(text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None
+    text = text[min(starts):]
+
+    try:
+        value, _ = _decoder.raw_decode(text)
+        return value
+    except ValueError:
+        pass
+
+    out, cuts = _scan(text)
+    for length, closers in reversed(cuts):
+        try:
+            value = _decoder.decode("".join(out[:length]) + closers)
+        except ValueError:
+            continue
+        logger.info("Repaired LLM JSON", kept_chars=length, input_chars=len(text))
+        return value
+    return None
+
+def partial_string_field(text: str, name: str) -> Optional[str]:
+    """Decoded value of a string field in possibly incomplete JSON (first match by name).
+
+    While the value is still arriving this is everything decoded so far (a
+    trailing partial escape is held back); None until the value has started.
+    """
+    match = re.search(r'"%s"\s*:\s*"' % re.escape(name), text)
+    if not match:
+        return None
+    raw = text[match.end():]
+    end = len(raw)
+    i = 0
+    while i < len(raw):
+        if raw[i] == '"':
+            end = i
+            break
+        if raw[i] == "\\":
+            width = 6 if raw[i + 1:i + 2] == "u" else 2
+            if i + width > len(raw):
+                end = i # Hold back an escape that hasn't fully arrived
+                break
+            i += width
+        else:
+            i += 1
+    try:
+        return _decoder.decode('"' + raw[:end] + '"')
+    except ValueError:
+        return None
+
+def _scan(text: str) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """Copy text up to the end of its first top-level value, dropping trailing commas.
+
+    Returns the copied characters and the cut points: (length, closers) pairs
+    where out[:length] + closers is complete JSON, one per finished value.
+    """
+    out: List[str] = []
+    cuts: List[Tuple[int, str]] = []
+    stack: List[str] = [] # open containers
+    expecting_key: List[bool] = [] # per container: is the next string an object key
+    in_string = False
+    escape = False
+
+    def closers() -> str:
+        return "".join("}" if c == "{" else "]" for c in reversed(stack))
+
+    def value_done():
+        if stack:
+            cuts.append((len(out), closers()))
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if not (stack and stack[-1] == "{" and expecting_key[-1]):
+                    value_done()
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            out.append(ch)
+            stack.append(ch)
+            expecting_key.append(ch == "{")
+            cuts.append((len(out), closers())) # empty container
+        elif ch in "}]":
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            out.append(ch)
+            if not stack:
+                break
+            stack.pop()
+            expecting_key.pop()
+            if not stack:
+                cuts.append((len(out), ""))
+                break
+            value_done()
+        elif ch == ",":
+            if stack and out and out[-1] not in ",{[":
+                # A number or literal ends here; strings and containers were recorded already
+                if cuts and cuts[-1][0] != len(out):
+                    cuts.append((len(out), closers()))
+            out.append(ch)
+            if stack and stack[-1] == "{":
+                expecting_key[-1] = True
+        elif ch == ":":
+            out.append(ch)
+            if expecting_key:
+                expecting_key[-1] = False
+        else:
+            out.append(ch)
+    return out, cuts
@@ -0,0 +1,152 @@
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+class LLMCache:
+    """Persistent LLM response cache keyed by (model, system prompt, prompt, temperature, max_tokens).
+
+    Each key can hold up to samples_per_key responses: until it's full a lookup
+    misses (so the API is called and the sample appended), afterwards lookups
+    rotate through the stored samples. In replay-only mode the first stored
+    sample is served, even from a partly filled or expired entry, and a miss
+    never reaches the API. Each sample records the model that served it, so
+    a lookup for one model never returns a fallback model's answer.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/cache/llm_cache.json",
+        ttl_days: float = 30.0,
+        max_entries: int = 2000,
+        samples_per_key: int = 1,
+        replay_only: bool = False,
+        enabled: bool = True,
+    ):
+        self.path = Path(path)
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.samples_per_key = max(1, samples_per_key)
+        self.replay_only = replay_only
+        self.enabled = enabled or replay_only
+        self.hits = 0
+        self.misses = 0
+        self.usd_saved = 0.0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = self._load() if self.enabled else {}
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get("entries", {})
+        except Exception as e:
+            logger.warning("LLM cache unreadable, starting fresh", error=str(e))
+            return {}
+
+    @staticmethod
+    def key(
+        model: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[Dict] = None,
+    ) -> str:
+        parts = [model, system_prompt or "", prompt, temperature, max_tokens]
+        if response_format:
+            parts.append(response_format) # Only when set, so plain-text keys stay stable
+        payload = json.dumps(parts, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, entry: Dict, now: float) -> bool:
+        return now - entry.get("created", 0) > self.ttl_days * 86400
+
+    @staticmethod
+    def _samples(entry: Optional[Dict], model: Optional[str]):
+        if not entry:
+            return []
+        if model is None:
+            return entry["samples"]
+        # Samples stored before models were recorded have no model and never match
+        return [s for s, m in zip(entry["samples"], entry.get("models", [])) if m == model]
+
+    def lookup(self, key: str, model: Optional[str] = None) -> Optional[str]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and self._expired(entry, now) and not self.replay_only:
+                del self.entries[key]
+                self._dirty = True
+                entry = None
+            samples = self._samples(entry, model)
+            if not samples or (len(samples) < self.samples_per_key and not self.replay_only):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.usd_saved += entry.get("cost_usd", 0.0)
+            if self.replay_only:
+                # Offline replays must be reproducible: always the first sample, no state changes
+                return samples[0]
+            response = samples[entry.get("served", 0) % len(samples)]
+            entry["served"] = entry.get("served", 0) + 1
+            entry["last_used"] = now
+            self._dirty = True
+            return response
+
+    def store(self, key: str, response: str, cost_usd: float = 0.0, model: Optional[str] = None):
+        if not self.enabled or self.replay_only:
+            return
+        now = time.time()
+        with self._lock:
+            entry = self.entries.setdefault(key, {"samples": [], "models": [], "created": now, "served": 0})
+            models = entry.setdefault("models", [None] * len(entry["samples"]))
+            if (response, model) not in zip(entry["samples"], models):
+                entry["samples"].append(response)
+                models.append(model)
+                entry["samples"] = entry["samples"][-self.samples_per_key:]
+                entry["models"] = models[-self.samples_per_key:]
+            entry["cost_usd"] = cost_usd
+            entry["last_used"] = now
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            entries = {k: v for k, v in self.entries.items() if not self._expired(v, now)}
+            if len(entries) > self.max_entries:
+                # Least recently used go first
+                keep = sorted(entries, key=lambda k: entries[k].get("last_used", 0), reverse=True)[:self.max_entries]
+                entries = {k: entries[k] for k in keep}
+            self.entries = entries
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, 'w') as f:
+                json.dump({"entries": self.entries}, f)
+            tmp.replace(self.path)
+            self._dirty = False
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self.entries),
+            "usd_saved": round(self.usd_saved, 4),
+            "replay_only": self.replay_only,
+        }
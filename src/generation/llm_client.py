@@ -1,72 +1,353 @@
 import os
-import requests
-import time
-from typing import Dict, Optional
-from ..shared import get_logger, retry_with_backoff, rate_limiter
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from ..shared import get_logger, retry_with_backoff, rate_limiter, http_client
+from .llm_cache import LLMCache
+from .cost_ledger import CostLedger, estimate_tokens
+from .model_router import ModelRouter, ModelSpec
 
 logger = get_logger(__name__)
 
 class LLMClient:
-    def __init__(self):
+    # OpenRouter request budget, shared process-wide through the rate limiter
+    RATE_LIMIT = {"capacity": 100, "refill_rate": 100, "refill_period": 3600}
+
+    def __init__(
+        self,
+        config_path: str = "config/github_actions_limits.json",
+        cache: Optional[LLMCache] = None,
+        router: Optional[ModelRouter] = None,
+        models_path: str = "config/llm_models.json",
+        ledger: Optional[CostLedger] = None,
+    ):
         self.api_key = os.getenv("OPENROUTER_API_KEY", "")
-        # Ticket specifies GLM-4.5 Air. Using zhipu/glm-4-air as best guess for slug.
-        self.model = os.getenv("OPENROUTER_MODEL", "zhipu/glm-4-air")
+        # Model chain, per-model timeouts and prices come from llm_models.json; OPENROUTER_MODEL leads it when set
+        self.router = router or ModelRouter.from_config(models_path, primary_model=os.getenv("OPENROUTER_MODEL"))
+        self.model = self.router.models[0].id
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.timeout_primary = 10
-        self.timeout_fallback = 5
+        self.max_tokens = 4000
+        self.temperature = 0.7
+
+        limits = self._load_config(config_path)
+        config = limits.get("llm", {})
+        self.stream = config.get("stream", True)
+        self.stream_max_chars = config.get("stream_max_chars", 16000)
+        self.replay_only = os.getenv("LLM_REPLAY_ONLY", "").lower() in ("1", "true", "yes")
+        cache_config = config.get("cache", {})
+        self.cache = cache or LLMCache(
+            path=cache_config.get("path", "data/cache/llm_cache.json"),
+            ttl_days=cache_config.get("ttl_days", 30),
+            max_entries=cache_config.get("max_entries", 2000),
+            samples_per_key=cache_config.get("samples_per_key", 1),
+            replay_only=self.replay_only,
+            enabled=cache_config.get("enabled", True),
+        )
+        cost_targets = limits.get("cost_targets", {})
+        self.ledger = ledger or CostLedger(
+            path=config.get("budget", {}).get("ledger_path", "data/cache/llm_spend.json"),
+            max_daily_usd=cost_targets.get("max_daily_usd", 2.0),
+            max_monthly_usd=cost_targets.get("max_monthly_usd", 50.0),
+            alert_threshold_usd=cost_targets.get("alert_threshold_usd"),
+        )
         
-        logger.info("LLMClient initialized", model=self.model, has_key=bool(self.api_key))
+        logger.info("LLMClient initialized", model=self.model, has_key=bool(self.api_key), replay_only=self.replay_only)
+
+    def _load_config(self, config_path: str) -> Dict:
+        path = Path(config_path)
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return {}
     
-    @retry_with_backoff(max_retries=3, base_delay=1.0)
-    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> Optional[str]:
+    def reserve(self, calls: int) -> bool:
+        """Take calls requests from the OpenRouter budget up front (all or nothing)."""
+        if self.replay_only:
+            return True # Served from the cache, never reaches the API
         if not self.api_key:
-            logger.warning("No API key configured, using fallback")
-            return None
-        
-        if not rate_limiter.consume("openrouter", tokens=1, capacity=100, refill_rate=100, refill_period=3600):
-            logger.warning("Rate limit exceeded for OpenRouter")
+            return False
+        return rate_limiter.consume("openrouter", tokens=calls, **self.RATE_LIMIT)
+
+    def _admit_extra(self, model: ModelSpec, messages: List[Dict], max_tokens: int) -> bool:
+        # Hedges and failovers are requests beyond the reserved (and budgeted) one;
+        # only send one whose worst case (full max_tokens completion) still fits
+        worst_usd = model.cost({"prompt_tokens": self._prompt_tokens(messages), "completion_tokens": max_tokens})
+        remaining = self.ledger.remaining_usd()
+        if remaining <= 0 or worst_usd > remaining:
+            logger.info("Extra LLM request skipped, not within budget", model=model.id, worst_usd=round(worst_usd, 4))
+            return False
+        return rate_limiter.consume("openrouter", tokens=1, **self.RATE_LIMIT)
+
+    @staticmethod
+    def _prompt_tokens(messages: List[Dict]) -> int:
+        # ~4 tokens of chat framing per message
+        return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+    def save(self):
+        self.cache.save()
+        self.router.save()
+        self.ledger.save()
+
+    def _account(self, model: ModelSpec, messages: List[Dict], content: str, usage: Dict) -> float:
+        """Record a call in the spend ledger, from the response usage or a local estimate."""
+        estimated = "prompt_tokens" not in usage or "completion_tokens" not in usage
+        prompt_tokens = usage.get("prompt_tokens", self._prompt_tokens(messages))
+        completion_tokens = usage.get("completion_tokens", estimate_tokens(content))
+        usd = model.cost(dict(usage, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens))
+        self.ledger.record(model.id, prompt_tokens, completion_tokens, usd, estimated=estimated)
+        return usd
+
+    @retry_with_backoff(max_retries=3, base_delay=1.0)
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        reserved: bool = False,
+        response_format: Optional[Dict] = None,
+        max_tokens: Optional[int] = None,
+        models: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        max_tokens = max_tokens or self.max_tokens
+        # Keyed by the head of the route actually requested; samples a fallback model served don't count
+        route_model = models[0] if models else self.model
+        cache_key = LLMCache.key(route_model, system_prompt, prompt, self.temperature, max_tokens, response_format)
+        cached = self.cache.lookup(cache_key, model=route_model)
+        if cached is not None:
+            logger.info("LLM response served from cache", length=len(cached))
+            return cached
+        if not self._may_call(reserved):
             return None
-        
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
-        
+
+        def attempt(model: ModelSpec, first_output) -> Optional[str]:
+            return self._request(model, prompt, system_prompt, response_format, cache_key, max_tokens)
+
+        messages = self._messages(prompt, system_prompt)
+        admit_extra = lambda model: self._admit_extra(model, messages, max_tokens)
+        content, model_id = self.router.run(attempt, stream=False, admit_extra=admit_extra, models=models)
+        if content is not None:
+            logger.info("LLM generation successful", model=model_id, length=len(content))
+        return content
+
+    def _request(
+        self,
+        model: ModelSpec,
+        prompt: str,
+        system_prompt: Optional[str],
+        response_format: Optional[Dict],
+        cache_key: str,
+        max_tokens: int,
+    ) -> Optional[str]:
+        payload = self._payload(model, prompt, system_prompt, response_format, max_tokens)
         try:
-            response = requests.post(
+            response = http_client.post(
                 self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://viralos.prime",
-                    "X-Title": "ViralOS Prime",
-                },
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "max_tokens": 4000,
-                    "temperature": 0.7,
-                },
-                timeout=self.timeout_primary,
+                headers=self._headers(),
+                json=payload,
+                timeout=model.timeout,
+                retries=self._http_retries(),
             )
             
             if response.status_code == 200:
                 result = response.json()
-                content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                
-                logger.info("LLM generation successful", length=len(content))
+                content = result.get("choices", [{}])[0].get("message", {}).get("content", "") or ""
+                usd = self._account(model, payload["messages"], content, result.get("usage") or {})
+                if not content:
+                    return None
+                self.cache.store(cache_key, content, cost_usd=usd, model=model.id)
                 return content
             else:
                 logger.error(
                     "LLM API error",
+                    model=model.id,
                     status_code=response.status_code,
                     response=response.text[:200]
                 )
                 return None
         
-        except requests.Timeout:
-            logger.warning("LLM request timeout")
+        except httpx.TimeoutException:
+            logger.warning("LLM request timeout", model=model.id, timeout=model.timeout)
+            return None
+        except Exception as e:
+            logger.error("LLM generation error", model=model.id, error=str(e))
+            return None
+
+    @retry_with_backoff(max_retries=3, base_delay=1.0)
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        reserved: bool = False,
+        response_format: Optional[Dict] = None,
+        on_text: Optional[Callable[[str], bool]] = None,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        models: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """Like generate(), but reads the completion as server-sent events.
+
+        on_text gets the text received so far after every chunk; returning
+        False aborts the request (output clearly malformed), as does exceeding
+        max_chars. Aborted output is neither returned nor cached. A cached
+        response is handed to on_text once, in full. When hedged, the model
+        whose first chunk arrives first wins and the other stream is dropped.
+        """
+        max_chars = max_chars or self.stream_max_chars
+        max_tokens = max_tokens or self.max_tokens
+        # Keyed by the head of the route actually requested; samples a fallback model served don't count
+        route_model = models[0] if models else self.model
+        cache_key = LLMCache.key(route_model, system_prompt, prompt, self.temperature, max_tokens, response_format)
+        cached = self.cache.lookup(cache_key, model=route_model)
+        if cached is not None:
+            logger.info("LLM response served from cache", length=len(cached))
+            if on_text is not None:
+                on_text(cached)
+            return cached
+        if not self._may_call(reserved):
+            return None
+
+        def attempt(model: ModelSpec, first_output) -> Optional[str]:
+            return self._request_stream(
+                model, prompt, system_prompt, response_format, cache_key, on_text, max_chars, max_tokens, first_output,
+            )
+
+        messages = self._messages(prompt, system_prompt)
+        admit_extra = lambda model: self._admit_extra(model, messages, max_tokens)
+        content, model_id = self.router.run(attempt, stream=True, admit_extra=admit_extra, models=models)
+        if content is not None:
+            logger.info("LLM stream complete", model=model_id, length=len(content))
+        return content
+
+    def _request_stream(
+        self,
+        model: ModelSpec,
+        prompt: str,
+        system_prompt: Optional[str],
+        response_format: Optional[Dict],
+        cache_key: str,
+        on_text: Optional[Callable[[str], bool]],
+        max_chars: int,
+        max_tokens: int,
+        first_output: Callable[[], bool],
+    ) -> Optional[str]:
+        payload = self._payload(model, prompt, system_prompt, response_format, max_tokens)
+        payload["stream"] = True
+        parts: List[str] = []
+        length = 0
+        usage: Dict = {}
+        usd = 0.0
+        started = False
+
+        try:
+            with http_client.stream(
+                "POST",
+                self.base_url,
+                headers=self._headers(),
+                json=payload,
+                timeout=model.timeout,
+                retries=self._http_retries(),
+            ) as response:
+                if response.status_code != 200:
+                    response.read()
+                    logger.error("LLM API error", model=model.id, status_code=response.status_code, response=response.text[:200])
+                    return None
+                started = True
+
+                for line in response.iter_lines():
+                    # SSE: "data: {...}" events, ": comment" keep-alives, "data: [DONE]" at the end
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    if "error" in event:
+                        logger.error("LLM stream error", model=model.id, error=str(event["error"])[:200])
+                        return None
+                    usage = event.get("usage") or usage
+                    delta = ((event.get("choices") or [{}])[0].get("delta") or {}).get("content") or ""
+                    if not delta:
+                        continue
+
+                    if not parts and not first_output():
+                        return None # Another model's stream won the race
+                    parts.append(delta)
+                    length += len(delta)
+                    if length > max_chars:
+                        logger.warning("LLM stream over length, aborted", model=model.id, length=length, max_chars=max_chars)
+                        return None
+                    if on_text is not None and on_text("".join(parts)) is False:
+                        logger.warning("LLM stream malformed, aborted", model=model.id, length=length)
+                        return None
+
+        except httpx.TimeoutException:
+            logger.warning("LLM stream timeout", model=model.id, timeout=model.timeout)
             return None
         except Exception as e:
-            logger.error("LLM generation error", error=str(e))
+            logger.error("LLM stream error", model=model.id, error=str(e))
             return None
+        finally:
+            if started:
+                # Aborted and losing streams are billed too: for the prompt and what was generated
+                usd = self._account(model, payload["messages"], "".join(parts), usage)
+
+        content = "".join(parts)
+        if not content:
+            return None
+        self.cache.store(cache_key, content, cost_usd=usd, model=model.id)
+        return content
+
+    def _http_retries(self) -> Optional[int]:
+        # With a fallback model a failed request moves on along the chain instead of retrying
+        return 0 if len(self.router.models) > 1 else None
+
+    def _may_call(self, reserved: bool) -> bool:
+        if self.replay_only:
+            logger.warning("Replay-only mode and no cached response, using fallback")
+            return False
+        if not self.api_key:
+            logger.warning("No API key configured, using fallback")
+            return False
+        if self.ledger.remaining_usd() <= 0:
+            logger.warning("LLM budget exhausted, using fallback", **self.ledger.get_stats())
+            return False
+        if not reserved and not rate_limiter.consume("openrouter", tokens=1, **self.RATE_LIMIT):
+            logger.warning("Rate limit exceeded for OpenRouter")
+            return False
+        return True
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://viralos.prime",
+            "X-Title": "ViralOS Prime",
+        }
+
+    @staticmethod
+    def _messages(prompt: str, system_prompt: Optional[str]) -> List[Dict]:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _payload(
+        self,
+        model: ModelSpec,
+        prompt: str,
+        system_prompt: Optional[str],
+        response_format: Optional[Dict],
+        max_tokens: Optional[int] = None,
+    ) -> Dict:
+        payload = {
+            "model": model.id,
+            "messages": self._messages(prompt, system_prompt),
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": self.temperature,
+        }
+        if response_format:
+            payload["response_format"] = response_format
+        return payload
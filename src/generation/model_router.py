@@ -0,0 +1,267 @@
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+class ModelSpec:
+    def __init__(
+        self,
+        model_id: str,
+        timeout_seconds: float = 10.0,
+        usd_per_1k_input_tokens: float = 0.0,
+        usd_per_1k_output_tokens: float = 0.0,
+    ):
+        self.id = model_id
+        self.timeout = timeout_seconds
+        self.usd_per_1k_input = usd_per_1k_input_tokens
+        self.usd_per_1k_output = usd_per_1k_output_tokens
+
+    def cost(self, usage: Dict) -> float:
+        if "cost" in usage:
+            return float(usage["cost"])
+        return (
+            usage.get("prompt_tokens", 0) / 1000 * self.usd_per_1k_input
+            + usage.get("completion_tokens", 0) / 1000 * self.usd_per_1k_output
+        )
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with exponential decay, so percentiles follow recent behaviour."""
+
+    BOUNDS = [round(0.05 * 1.25 ** i, 4) for i in range(40)] # 50 ms .. ~5 min, upper bucket bounds
+
+    def __init__(self, decay: float = 0.98, counts: Optional[List[float]] = None, samples: int = 0):
+        self.decay = decay
+        self.counts = counts if counts and len(counts) == len(self.BOUNDS) else [0.0] * len(self.BOUNDS)
+        self.samples = samples
+
+    def record(self, seconds: float):
+        self.counts = [c * self.decay for c in self.counts]
+        for i, bound in enumerate(self.BOUNDS):
+            if seconds <= bound or i == len(self.BOUNDS) - 1:
+                self.counts[i] += 1.0
+                break
+        self.samples += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        total = sum(self.counts)
+        if total <= 0:
+            return None
+        target = total * pct / 100.0
+        running = 0.0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return self.BOUNDS[-1]
+
+    def to_dict(self) -> Dict:
+        return {"counts": [round(c, 4) for c in self.counts], "samples": self.samples}
+
+class ModelRouter:
+    """Runs a request along an ordered chain of models, hedging slow ones.
+
+    The first model is asked first. If it hasn't produced any output after its hedge
+    delay (a latency percentile from its histogram, clamped to the configured
+    range) the next model in the chain is asked as well, and the first valid
+    response wins. A request that fails or times out is replaced by the next
+    model right away. Latency is measured to the first output: the first
+    streamed chunk, or the whole response when not streaming, and kept per
+    model and mode.
+    """
+
+    def __init__(self, models: List[ModelSpec], hedging: Optional[Dict] = None, state_path: Optional[str] = None):
+        if not models:
+            raise ValueError("ModelRouter needs at least one model")
+        self.models = models
+        hedging = hedging or {}
+        self.hedging_enabled = hedging.get("enabled", True) and len(models) > 1
+        self.hedge_percentile = hedging.get("percentile", 90)
+        self.min_samples = hedging.get("min_samples", 20)
+        self.initial_delay = hedging.get("initial_delay_seconds", 4.0)
+        self.min_delay = hedging.get("min_delay_seconds", 0.5)
+        self.max_delay = hedging.get("max_delay_seconds", 8.0)
+        self.decay = hedging.get("histogram_decay", 0.98)
+        self.state_path = Path(state_path) if state_path else None
+
+        self.histograms: Dict[str, LatencyHistogram] = self._load()
+        self.stats: Dict[str, Dict[str, int]] = {
+            m.id: {"requests": 0, "wins": 0, "failures": 0, "hedges": 0, "hedge_wins": 0} for m in models
+        }
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._executor = ThreadPoolExecutor(max_workers=hedging.get("max_in_flight", 16), thread_name_prefix="llm")
+
+        logger.info("ModelRouter initialized", models=[m.id for m in models], hedging=self.hedging_enabled)
+
+    @classmethod
+    def from_config(cls, config_path: str = "config/llm_models.json", primary_model: Optional[str] = None) -> "ModelRouter":
+        path = Path(config_path)
+        config = {}
+        if path.exists():
+            with open(path) as f:
+                config = json.load(f)
+        models = [
+            ModelSpec(
+                m["id"],
+                timeout_seconds=m.get("timeout_seconds", 10.0),
+                usd_per_1k_input_tokens=m.get("usd_per_1k_input_tokens", 0.0),
+                usd_per_1k_output_tokens=m.get("usd_per_1k_output_tokens", 0.0),
+            )
+            for m in config.get("models", [])
+        ]
+        if primary_model and (not models or models[0].id != primary_model):
+            # An explicitly chosen model (OPENROUTER_MODEL) leads the chain
+            known = next((m for m in models if m.id == primary_model), None)
+            models = [known or ModelSpec(primary_model)] + [m for m in models if m.id != primary_model]
+        return cls(models, hedging=config.get("hedging"), state_path=config.get("latency_state_path"))
+
+    def _load(self) -> Dict[str, LatencyHistogram]:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path) as f:
+                data = json.load(f)
+            return {k: LatencyHistogram(self.decay, v.get("counts"), v.get("samples", 0)) for k, v in data.items()}
+        except Exception as e:
+            logger.warning("Latency histograms unreadable, starting fresh", error=str(e))
+            return {}
+
+    def save(self):
+        if not self.state_path or not self._dirty:
+            return
+        with self._lock:
+            data = {k: h.to_dict() for k, h in self.histograms.items()}
+            self._dirty = False
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        tmp.replace(self.state_path)
+
+    @staticmethod
+    def _key(model: ModelSpec, stream: bool) -> str:
+        return f"{model.id}|{'stream' if stream else 'full'}"
+
+    def _record(self, model: ModelSpec, stream: bool, seconds: float):
+        with self._lock:
+            key = self._key(model, stream)
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram(self.decay)
+            self.histograms[key].record(seconds)
+            self._dirty = True
+
+    def hedge_delay(self, model: ModelSpec, stream: bool = False) -> float:
+        with self._lock:
+            histogram = self.histograms.get(self._key(model, stream))
+            if histogram is None or histogram.samples < self.min_samples:
+                delay = self.initial_delay
+            else:
+                delay = histogram.percentile(self.hedge_percentile) or self.initial_delay
+        return min(max(delay, self.min_delay), self.max_delay, model.timeout)
+
+    def run(
+        self,
+        attempt: Callable[[ModelSpec, Callable[[], bool]], Optional[str]],
+        stream: bool = False,
+        admit_extra: Callable[[ModelSpec], bool] = lambda model: True,
+        models: Optional[List[str]] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Run attempt(model, first_output) along the chain; returns (response, model id).
+
+        models restricts (and orders) the chain for this request, by model id.
+
+        attempt returns the response or None. A streaming attempt calls
+        first_output() before handing its first chunk on and stops if it
+        returns False (another model already won). admit_extra(model) is asked
+        before each request beyond the first (hedges, failovers), e.g. to
+        charge the rate limit, and only once there is a model left to send it to.
+        """
+        lock = threading.Lock()
+        winner: Dict[str, object] = {}
+        by_id = {m.id: m for m in self.models}
+        route = [by_id[m] for m in models if m in by_id] if models else self.models
+        remaining = list(route)
+        pending: Dict = {}
+
+        def first_output(token: object, model: ModelSpec, start: float, seen: Dict) -> bool:
+            if not seen:
+                seen["at"] = time.time()
+                self._record(model, stream, seen["at"] - start)
+            with lock:
+                winner.setdefault("token", token)
+                return winner["token"] is token
+
+        def launch(hedge: bool, extra: bool = True) -> bool:
+            # Pick the model before charging for the request, so an exhausted chain costs nothing
+            if not remaining or (extra and not admit_extra(remaining[0])):
+                return False
+            model = remaining.pop(0)
+            token, start, seen = object(), time.time(), {}
+            claim = lambda: first_output(token, model, start, seen)
+
+            def run_attempt():
+                result = attempt(model, claim)
+                # Not streamed: the whole response is the first output
+                return result if result is not None and claim() else None
+
+            with self._lock:
+                self.stats[model.id]["requests"] += 1
+                if hedge:
+                    self.stats[model.id]["hedges"] += 1
+            pending[self._executor.submit(run_attempt)] = (model, token, hedge)
+            return True
+
+        launch(hedge=False, extra=False)
+        primary = route[0]
+        started = time.time()
+        hedged = not self.hedging_enabled or len(route) < 2
+        while pending:
+            timeout = None if hedged else max(self.hedge_delay(primary, stream) - (time.time() - started), 0)
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                with lock:
+                    # The deadline is to first output: a stream that has started is slow to finish, not stalled
+                    started_output = "token" in winner
+                if not started_output and launch(hedge=True):
+                    logger.info("Hedging slow LLM request", primary=primary.id, after_seconds=round(time.time() - started, 2))
+                continue
+
+            for future in done:
+                model, token, hedge = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning("LLM attempt raised", model=model.id, error=str(e))
+                    result = None
+                if result is not None:
+                    with self._lock:
+                        self.stats[model.id]["wins"] += 1
+                        if hedge:
+                            self.stats[model.id]["hedge_wins"] += 1
+                    return result, model.id
+
+                with self._lock:
+                    self.stats[model.id]["failures"] += 1
+                with lock:
+                    if winner.get("token") is token:
+                        winner.clear() # It had started streaming; let the next model take over
+                if not pending:
+                    launch(hedge=False)
+        return None, None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = {model_id: dict(s) for model_id, s in self.stats.items()}
+            for key, histogram in self.histograms.items():
+                model_id, mode = key.split("|")
+                if model_id in stats:
+                    stats[model_id][f"{mode}_p50_s"] = histogram.percentile(50)
+                    stats[model_id][f"{mode}_p90_s"] = histogram.percentile(90)
+        return stats
@@ -0,0 +1,58 @@
+import re
+from typing import Callable, Dict, List, Optional
+
+TIMING_MARKER = re.compile(r"\[(\d{1,2}):(\d{2})\]")
+
+class ScriptSectionParser:
+    """Splits a script into timed sections at its [m:ss] markers as the text arrives.
+
+    feed() takes the script received so far; a section is complete (and handed
+    to on_section) once the next marker has arrived. finish() takes the final
+    script and completes the rest. Text before the first marker opens the
+    first section. If the final script isn't a continuation of what was fed
+    (the streamed one was replaced by a fallback) it is re-parsed from scratch,
+    so the sections only ever depend on the final script.
+    """
+
+    def __init__(self, on_section: Optional[Callable[[Dict], None]] = None):
+        self.on_section = on_section
+        self.sections: List[Dict] = []
+        self._fed = ""
+        self._done = 0 # markers whose section has been emitted
+
+    def _emit(self, start: float, text: str):
+        section = {"index": len(self.sections), "start": start, "text": " ".join(text.split())}
+        self.sections.append(section)
+        if self.on_section is not None:
+            self.on_section(section)
+
+    def feed(self, script: str) -> List[Dict]:
+        if not script.startswith(self._fed):
+            self.sections, self._done = [], 0
+        self._fed = script
+        before = len(self.sections)
+
+        markers = list(TIMING_MARKER.finditer(script))
+        while self._done + 1 < len(markers):
+            self._emit_marker(script, markers, markers[self._done + 1].start())
+        return self.sections[before:]
+
+    def _emit_marker(self, script: str, markers: List, end: int):
+        marker = markers[self._done]
+        if self._done == 0:
+            # The first section opens the video and takes any text before its marker
+            start, text = 0.0, script[:marker.start()] + " " + script[marker.end():end]
+        else:
+            start, text = float(int(marker.group(1)) * 60 + int(marker.group(2))), script[marker.end():end]
+        self._emit(start, text)
+        self._done += 1
+
+    def finish(self, script: str) -> List[Dict]:
+        """Complete the remaining sections; returns all of them."""
+        self.feed(script)
+        markers = list(TIMING_MARKER.finditer(script))
+        if self._done < len(markers):
+            self._emit_marker(script, markers, len(script))
+        elif not markers and not self.sections and script.strip():
+            self._emit(0.0, script)
+        return self.sections
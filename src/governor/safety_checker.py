@@ -1,7 +1,7 @@
 import json
 from pathlib import Path
 from typing import Dict, List, Tuple
-from ..shared import get_logger
+from ..shared import get_logger, text_features
 
 logger = get_logger(__name__)
 
@@ -10,6 +10,8 @@ class SafetyChecker:
         self.safety_config = self._load_safety_config()
         self.hard_blocklist = self._extract_keywords(self.safety_config.get("hard_blocklist", {}))
         self.soft_blacklist = self._extract_keywords(self.safety_config.get("soft_blacklist", {}))
+        text_features.register_group("safety.hard", self.hard_blocklist)
+        text_features.register_group("safety.soft", self.soft_blacklist)
         
         logger.info("SafetyChecker initialized", hard_rules=len(self.hard_blocklist), soft_rules=len(self.soft_blacklist))
     
@@ -29,21 +31,17 @@ class SafetyChecker:
     def check_content(self, content: Dict) -> Tuple[bool, List[str]]:
         violations = []
         
-        title = content.get("title", "").lower()
-        description = content.get("description", "").lower()
-        combined = f"{title} {description}"
+        features = text_features.extract(content.get("title", ""), content.get("description", ""))
         
-        for keyword in self.hard_blocklist:
-            if keyword.lower() in combined:
-                violations.append(f"hard_violation: {keyword}")
+        for keyword in features.hits("safety.hard"):
+            violations.append(f"hard_violation: {keyword}")
         
         if violations:
             logger.warning("Hard violations detected", count=len(violations), video_id=content.get("video_id"))
             return False, violations
         
-        for keyword in self.soft_blacklist:
-            if keyword.lower() in combined:
-                violations.append(f"soft_violation: {keyword}")
+        for keyword in features.hits("safety.soft"):
+            violations.append(f"soft_violation: {keyword}")
         
         if violations:
             logger.info("Soft violations detected", count=len(violations), video_id=content.get("video_id"))
@@ -1,14 +1,14 @@
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from ..shared import get_logger
 
 logger = get_logger(__name__)
 
 class PatternAnalyzer:
-    def __init__(self):
-        self.rules_dir = Path("memory/learned_rules")
+    def __init__(self, rules_dir: str = "memory/learned_rules"):
+        self.rules_dir = Path(rules_dir)
         self.rules_dir.mkdir(parents=True, exist_ok=True)
         logger.info("PatternAnalyzer initialized")
     
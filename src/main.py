@@ -3,99 +3,169 @@ import sys
 import json
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List, Optional
 
-from shared import get_logger, resource_monitor, cache_manager
+from shared import get_logger, resource_monitor, cache_manager, http_client, load_channel_profiles, ChannelProfile, CandidateBatch
 from sense import TrendAggregator, SemanticDeduplicator
 from validation import TrendValidator
 from scoring import VPSScorer
-from decision import NarrativeSelector
+from decision import NarrativeSelector, CalendarPlanner
 from generation import ContentGenerator
 from production import VideoAssembler, AssetManager
 from publishing import YouTubePublisher
-from memory import RCIManager
+from memory import RCIManager, VectorMemory
 from learning import PatternAnalyzer
 from governor import SafetyChecker
 from observation.monitor import CanaryMonitor
 
 logger = get_logger(__name__)
 
+class ChannelContext:
+    """Everything that must stay isolated per channel: lanes, schedule, credentials, outputs, memory, quotas."""
+
+    def __init__(self, profile: ChannelProfile):
+        self.profile = profile
+        self.channel_id = profile.channel_id
+        self.schedule_config = profile.load_schedule()
+        self.selector = NarrativeSelector(config_path=str(profile.narrative_lanes_path))
+        self.calendar_planner = CalendarPlanner(
+            self.selector, self.schedule_config, path=str(profile.memory_dir / "content_calendar.json")
+        )
+        self.publisher = YouTubePublisher(
+            channel_id=profile.channel_id,
+            credentials=profile.credentials(),
+            queue_dir=str(profile.queue_dir),
+            records_dir=str(profile.output_dir),
+            daily_upload_quota=profile.daily_upload_quota,
+        )
+        self.rci_manager = RCIManager(memory_dir=str(profile.memory_dir))
+        self.pattern_analyzer = PatternAnalyzer(rules_dir=str(profile.memory_dir / "learned_rules"))
+        self.canary_monitor = CanaryMonitor(metrics_dir=str(profile.output_dir), history_file=str(profile.history_path))
+        # "seen" dedup is shared across channels, but what a channel produced only blocks that channel
+        self.produced_memory = VectorMemory(root=str(profile.produced_memory_dir))
+        self.output_dir = profile.output_dir
+
 class ViralosPrime:
-    def __init__(self):
+    def __init__(self, channel_ids: Optional[List[str]] = None):
+        # Shared across channels: fetching, embeddings, validation/scoring, generation and rendering
         self.aggregator = TrendAggregator()
         self.deduplicator = SemanticDeduplicator()
         self.validator = TrendValidator()
         self.scorer = VPSScorer()
-        self.selector = NarrativeSelector()
         self.generator = ContentGenerator()
         self.assembler = VideoAssembler()
         self.asset_manager = AssetManager()
-        self.publisher = YouTubePublisher()
-        self.rci_manager = RCIManager()
-        self.pattern_analyzer = PatternAnalyzer()
         self.safety_checker = SafetyChecker()
-        self.canary_monitor = CanaryMonitor()
-        
-        self.schedule_config = self._load_schedule_config()
         
-        logger.info("VIRALOS PRIME v2.0 initialized")
+        self.channels = [ChannelContext(p) for p in load_channel_profiles(only=channel_ids)]
         
-    def _load_schedule_config(self) -> dict:
-        path = Path("config/publishing_schedule.json")
-        if path.exists():
-            with open(path) as f:
-                return json.load(f)
-        return {}
+        logger.info("VIRALOS PRIME v2.0 initialized", channels=[c.channel_id for c in self.channels])
     
     def run_daily_production(self):
         logger.info("=== STARTING DAILY PRODUCTION ===")
         start_time = datetime.utcnow()
         
-        # Determine counts from config
-        shorts_count = self.schedule_config.get("shorts", {}).get("daily_count", 2)
-        long_count = self.schedule_config.get("longform", {}).get("daily_count", 1)
-        
         try:
-            logger.info("STAGE 1: SENSE - Discovering trends")
-            trends = self.aggregator.aggregate_all()
-            logger.info(f"Discovered {len(trends)} trends")
-            
-            logger.info("STAGE 2: DEDUPLICATION")
-            unique_trends = self.deduplicator.deduplicate(trends)
+            # Sense and dedup run as one streamed pipeline: sources yield small batches that are
+            # prefiltered, embedded and clustered as they arrive, never materialized as a whole list
+            logger.info("STAGE 1-2: SENSE + DEDUPLICATION - Discovering trends")
+            unique_trends = self.deduplicator.deduplicate_stream(self.aggregator.iter_trends(mode="daily"))
+            logger.info(f"Discovered {self.aggregator.last_trend_count} trends")
             logger.info(f"Deduplicated to {len(unique_trends)} unique trends")
             
             self._save_output("trend_records.json", unique_trends)
             
             logger.info("STAGE 3: VALIDATION")
-            validated = self.validator.validate_batch(unique_trends)
-            passed_validation = [v for v in validated if v.get("passed", False)]
+            # Validation, scoring and selection share one columnar batch; dicts are only
+            # materialized for the saved artifacts and the selection plan
+            validated = self.validator.validate_batch(CandidateBatch.from_records(unique_trends))
+            passed_validation = validated.filter(validated["passed"]) if len(validated) else validated
             logger.info(f"Validated: {len(passed_validation)}/{len(validated)} passed")
             
-            self._save_output("validated_candidates.json", passed_validation)
+            self._save_output("validated_candidates.json", passed_validation.to_records())
             
             logger.info("STAGE 4: VPS SCORING")
             scored = self.scorer.score_batch(passed_validation)
-            logger.info(f"Scored {len(scored)} candidates")
-            
-            self._save_output("scored_candidates.json", scored)
+            logger.info(f"Scored {len(scored)} candidates", score_cache=self.scorer.score_cache.get_stats())
             
-            logger.info("STAGE 5: DECISION - Selecting content")
-            total_needed = shorts_count + long_count
-            selection = self.selector.select_daily_content(scored, count=total_needed)
-            logger.info(f"Selected {selection['total_selected']} items for production")
-            
-            self._save_output("selection_plan.json", selection)
-            
-            logger.info("STAGE 6: GENERATION - Creating content")
-            all_selected = selection["shorts"] + selection["long"]
-            generated_content = []
-            
-            for topic in all_selected:
-                content = self.generator.generate_content(topic)
-                generated_content.append(content)
-            
-            logger.info(f"Generated {len(generated_content)} content items")
-            
-            logger.info("STAGE 7: SAFETY CHECK")
+            self._save_output("scored_candidates.json", scored.to_records())
+        except Exception as e:
+            logger.error(f"Daily production failed: {str(e)}", exc_info=True)
+            return {"status": "failed", "error": str(e)}
+        
+        # Stages 5-9 run once per channel against the shared scored pool
+        channel_summaries = {}
+        for channel in self.channels:
+            channel_summaries[channel.channel_id] = self._run_channel_production(channel, scored)
+        
+        failed = [cid for cid, s in channel_summaries.items() if s["status"] != "success"]
+        if len(failed) < len(channel_summaries):
+            # Items polled this run were consumed; a run that failed outright gets them again next time
+            self.aggregator.commit_seen()
+        
+        logger.info("STAGE 10: CLEANUP")
+        try:
+            cache_manager.cleanup_expired()
+            resource_monitor.log_stats()
+        except Exception as e:
+            logger.warning("Cleanup failed", error=str(e))
+        
+        elapsed = (datetime.utcnow() - start_time).total_seconds() / 60
+        logger.info(f"=== DAILY PRODUCTION COMPLETE === ({elapsed:.1f} minutes)")
+        
+        summary = {
+            "status": "failed" if len(failed) == len(channel_summaries) else "success",
+            "elapsed_minutes": round(elapsed, 1),
+            "trends_discovered": self.aggregator.last_trend_count,
+            "prefilter": self.deduplicator.prefilter.last_report,
+            "score_cache": self.scorer.score_cache.get_stats(),
+            "llm_cache": self.generator.llm_client.cache.get_stats(),
+            "llm_routing": self.generator.llm_client.router.get_stats(),
+            "llm_spend": self.generator.llm_client.ledger.get_stats(),
+            "sense_fetch": self.aggregator.get_fetch_stats(),
+            "http_hosts": http_client.get_host_metrics(),
+            "videos_published": sum(s.get("videos_published", 0) for s in channel_summaries.values()),
+            "failed_channels": failed,
+            "channels": channel_summaries,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        
+        self._save_output("daily_summary.json", summary)
+        return summary
+    
+    def _run_channel_production(self, channel: ChannelContext, scored: CandidateBatch) -> Dict:
+        logger.info("=== CHANNEL PRODUCTION ===", channel=channel.channel_id)
+        
+        privacy = channel.schedule_config.get("canary_settings", {}).get("initial_privacy", "unlisted")
+        # Calendar slots whose topic is settled (sent out, queued or rejected); only these are
+        # committed, so a run that fails midway gets the rest of today's slots back on a re-run
+        done_slots = []
+        # Same for the produced memory: only topics that were assembled and sent out (now or via the
+        # queue) are kept out of future selections
+        produced_topics = []
+        
+        try:
+            logger.info("STAGE 5: DECISION - Selecting content", channel=channel.channel_id)
+            # Today's pool joins the channel's backlog and re-plans the week's open slots (counts and
+            # days come from the schedule); production takes whatever is planned for today
+            candidates = self.deduplicator.drop_produced(scored, channel.produced_memory)
+            calendar_stats = channel.calendar_planner.update(candidates)
+            selection = channel.calendar_planner.take_today()
+            selection["calendar"] = calendar_stats
+            logger.info(f"Selected {selection.get('total_selected', 0)} items for production")
+            
+            self._save_output("selection_plan.json", selection, channel.output_dir)
+            self._save_output("content_calendar.json", channel.calendar_planner.get_calendar(), channel.output_dir)
+            
+            logger.info("STAGE 6: GENERATION - Creating content", channel=channel.channel_id)
+            # Tagging the channel keeps video IDs (file names, queue and upload records) apart when channels pick the same trend
+            all_selected = [dict(t, channel_id=channel.channel_id) for t in selection.get("shorts", []) + selection.get("long", [])]
+            # Topics run concurrently under the generation cap; results keep the selection order
+            generated_content = self.generator.generate_batch(all_selected)
+            
+            logger.info(f"Generated {len(generated_content)} content items", **self.generator.last_batch_stats)
+            
+            logger.info("STAGE 7: SAFETY CHECK", channel=channel.channel_id)
             # Create content objects for checker
             check_payload = []
             for c in generated_content:
@@ -112,86 +182,101 @@ class ViralosPrime:
                 if result["action"] in ["approve", "add_attribution"]:
                     approved_content.append(generated_content[i])
                 else:
+                    done_slots.append(generated_content[i]["topic"].get("slot_id"))
                     logger.warning(f"Content rejected by safety check: {generated_content[i]['video_id']}")
             
             logger.info(f"Safety check: {len(approved_content)}/{len(generated_content)} approved")
             
-            logger.info("STAGE 8: PRODUCTION - Assembling videos")
+            logger.info("STAGE 8: PRODUCTION - Assembling videos", channel=channel.channel_id)
             assembled = self.assembler.batch_assemble(approved_content)
             logger.info(f"Assembled {len(assembled)} videos")
             
-            self._save_output("assembled_videos.json", assembled)
+            self._save_output("assembled_videos.json", assembled, channel.output_dir)
             
-            logger.info("STAGE 9: PUBLISHING")
+            logger.info("STAGE 9: PUBLISHING", channel=channel.channel_id)
             published_count = 0
             
             for i, item in enumerate(assembled):
                 if item["status"] == "success" and item["video_path"]:
                     # All published as unlisted for Canary testing first (Phase 2.11)
-                    privacy = self.schedule_config.get("canary_settings", {}).get("initial_privacy", "unlisted")
-                    
-                    result = self.publisher.publish_video(
+                    result = channel.publisher.publish_video(
                         item["video_path"],
                         item["metadata"],
                         privacy
                     )
-                    
                     if result:
+                        done_slots.append(approved_content[i]["topic"].get("slot_id"))
+                        produced_topics.append(approved_content[i]["topic"])
+                    
+                    if result and result.get("status") == "published":
                         published_count += 1
+                        content = approved_content[i]
                         
                         rci_record = {
                             "video_id": item["video_id"],
-                            "hook": generated_content[i]["hooks"][0] if generated_content[i]["hooks"] else "",
+                            "channel_id": channel.channel_id,
+                            "hook": content["hooks"][0] if content["hooks"] else "",
                             "title": item["metadata"]["titles"][0],
                             "format": item["metadata"].get("format", "short"),
                             "posting_time": datetime.utcnow().isoformat(),
                             "publishing_hour": datetime.utcnow().hour,
                             "day_of_week": datetime.utcnow().strftime("%A"),
-                            "niche": generated_content[i]["topic"].get("niche", "general"),
-                            "narrative_lane": generated_content[i]["topic"].get("narrative_lane", "unknown"),
-                            "vps_score": generated_content[i]["topic"].get("final_score", 0),
+                            "niche": content["topic"].get("niche", "general"),
+                            "narrative_lane": content["topic"].get("narrative_lane", "unknown"),
+                            "vps_score": content["topic"].get("final_score", 0),
                         }
                         
-                        self.rci_manager.add_record(rci_record)
-            
-            logger.info(f"Published {published_count} videos (privacy: {privacy})")
-            
-            logger.info("STAGE 10: CLEANUP")
-            cache_manager.cleanup_expired()
-            resource_monitor.log_stats()
+                        channel.rci_manager.add_record(rci_record)
             
-            elapsed = (datetime.utcnow() - start_time).total_seconds() / 60
-            logger.info(f"=== DAILY PRODUCTION COMPLETE === ({elapsed:.1f} minutes)")
+            logger.info(f"Published {published_count} videos (privacy: {privacy})", channel=channel.channel_id)
             
             summary = {
                 "status": "success",
-                "elapsed_minutes": round(elapsed, 1),
-                "trends_discovered": len(trends),
+                "selected": selection.get("total_selected", 0),
+                "generated": len(generated_content),
                 "videos_published": published_count,
                 "timestamp": datetime.utcnow().isoformat(),
             }
-            
-            self._save_output("daily_summary.json", summary)
-            return summary
-            
         except Exception as e:
-            logger.error(f"Daily production failed: {str(e)}", exc_info=True)
-            return {"status": "failed", "error": str(e)}
+            logger.error(f"Channel production failed: {str(e)}", channel=channel.channel_id, exc_info=True)
+            summary = {"status": "failed", "error": str(e)}
+        
+        channel.calendar_planner.commit([slot_id for slot_id in done_slots if slot_id])
+        self.deduplicator.remember_produced(produced_topics, channel.produced_memory)
+        
+        if not channel.profile.is_default:
+            self._save_output("daily_summary.json", summary, channel.output_dir)
+        return summary
     
     def run_weekly_learning(self):
         logger.info("=== STARTING WEEKLY LEARNING ===")
         
         try:
-            recent_records = self.rci_manager.get_recent_records(days=7)
-            logger.info(f"Analyzing {len(recent_records)} records from past 7 days")
-            
-            rules = self.pattern_analyzer.analyze_weekly(recent_records)
-            logger.info(f"Generated {len(rules)} learned rules")
+            rules_generated = {}
+            all_records = []
+            for channel in self.channels:
+                recent_records = channel.rci_manager.get_recent_records(days=7)
+                logger.info(f"Analyzing {len(recent_records)} records from past 7 days", channel=channel.channel_id)
+                all_records.extend(recent_records)
+                
+                rules = channel.pattern_analyzer.analyze_weekly(recent_records)
+                logger.info(f"Generated {len(rules)} learned rules", channel=channel.channel_id)
+                rules_generated[channel.channel_id] = len(rules)
+                
+                channel.rci_manager.prune_old_records()
             
-            self.rci_manager.prune_old_records()
+            # Scoring is shared across channels, so one index holds every channel's winners and lanes
+            winners_index = self.scorer.winners_index.rebuild(
+                all_records, [c.profile.narrative_lanes_path for c in self.channels]
+            )
             
             logger.info("=== WEEKLY LEARNING COMPLETE ===")
-            return {"status": "success", "rules_generated": len(rules)}
+            return {
+                "status": "success",
+                "rules_generated": sum(rules_generated.values()),
+                "channels": rules_generated,
+                "winners_index": winners_index,
+            }
             
         except Exception as e:
             logger.error(f"Weekly learning failed: {str(e)}", exc_info=True)
@@ -201,18 +286,30 @@ class ViralosPrime:
         logger.info("=== STARTING RECOVERY WORKER ===")
         
         try:
-            processed = self.publisher.process_queue()
-            logger.info(f"Processed {processed} queued items")
-            
-            # Also run Canary Monitor here since recovery runs frequently (every 2h)
-            # Ticket says Canary testing is 30 mins after publish.
-            # We can run canary monitor here or in a separate job.
-            # Recovery worker is a good place.
-            canary_results = self.canary_monitor.check_active_canaries()
-            logger.info(f"Canary checks: {len(canary_results)} videos evaluated")
+            processed = 0
+            canary_checks = 0
+            for channel in self.channels:
+                channel_processed = channel.publisher.process_queue()
+                logger.info(f"Processed {channel_processed} queued items", channel=channel.channel_id)
+                processed += channel_processed
+                
+                # Also run Canary Monitor here since recovery runs frequently (every 2h)
+                # Ticket says Canary testing is 30 mins after publish.
+                # We can run canary monitor here or in a separate job.
+                # Recovery worker is a good place.
+                canary_results = channel.canary_monitor.check_active_canaries()
+                logger.info(f"Canary checks: {len(canary_results)} videos evaluated", channel=channel.channel_id)
+                canary_checks += len(canary_results)
+            
+            # Poll fast-moving sources between daily runs so the next run starts from a fresher pool
+            try:
+                refreshed = self.aggregator.refresh(mode="recovery")
+            except Exception as e:
+                logger.error("Sense refresh failed", error=str(e))
+                refreshed = 0
             
             logger.info("=== RECOVERY COMPLETE ===")
-            return {"status": "success", "processed": processed, "canary_checks": len(canary_results)}
+            return {"status": "success", "processed": processed, "canary_checks": canary_checks, "trends_refreshed": refreshed}
             
         except Exception as e:
             logger.error(f"Recovery failed: {str(e)}", exc_info=True)
@@ -221,15 +318,18 @@ class ViralosPrime:
     def run_monitor(self):
         logger.info("=== STARTING MONITOR ===")
         try:
-            canary_results = self.canary_monitor.check_active_canaries()
-            logger.info(f"Canary checks: {len(canary_results)} videos evaluated")
-            return {"status": "success", "canary_checks": len(canary_results)}
+            canary_checks = 0
+            for channel in self.channels:
+                canary_results = channel.canary_monitor.check_active_canaries()
+                logger.info(f"Canary checks: {len(canary_results)} videos evaluated", channel=channel.channel_id)
+                canary_checks += len(canary_results)
+            return {"status": "success", "canary_checks": canary_checks}
         except Exception as e:
             logger.error(f"Monitor failed: {str(e)}", exc_info=True)
             return {"status": "failed", "error": str(e)}
     
-    def _save_output(self, filename: str, data):
-        output_dir = Path("data/metrics")
+    def _save_output(self, filename: str, data, output_dir: Optional[Path] = None):
+        output_dir = Path(output_dir or "data/metrics")
         output_dir.mkdir(parents=True, exist_ok=True)
         
         output_path = output_dir / filename
@@ -240,11 +340,12 @@ class ViralosPrime:
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python main.py [daily|weekly|recovery|monitor]")
+        print("Usage: python main.py [daily|weekly|recovery|monitor] [channel_id ...]")
         sys.exit(1)
     
     mode = sys.argv[1]
-    viralos = ViralosPrime()
+    # Optional channel ids restrict the run to a subset of config/channels.json
+    viralos = ViralosPrime(channel_ids=sys.argv[2:] or None)
     
     if mode == "daily":
         result = viralos.run_daily_production()
@@ -1,3 +1,5 @@
 from .rci_manager import RCIManager
+from .vector_memory import VectorMemory
+from .winners_index import WinnersIndex
 
-__all__ = ["RCIManager"]
+__all__ = ["RCIManager", "VectorMemory", "WinnersIndex"]
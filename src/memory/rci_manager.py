@@ -7,8 +7,8 @@ from ..shared import get_logger
 logger = get_logger(__name__)
 
 class RCIManager:
-    def __init__(self):
-        self.memory_dir = Path("memory")
+    def __init__(self, memory_dir: str = "memory"):
+        self.memory_dir = Path(memory_dir)
         self.memory_dir.mkdir(parents=True, exist_ok=True)
         self.half_life_days = 90
         self.max_age_days = 270
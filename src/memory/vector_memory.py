@@ -0,0 +1,185 @@
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+class VectorMemory:
+    """Persistent, time-decayed store of topic embeddings.
+
+    Vectors live in a single L2-normalized float32 matrix that is memory-mapped
+    on load; ids, timestamps and kinds ("seen" or "produced") sit alongside it
+    in meta.json. A stored vector matches on raw similarity for as long as it
+    is within ttl_days; its age only discounts the score used to rank matches.
+    Entries older than ttl_days are dropped on save.
+    """
+
+    def __init__(self, root: str = "memory/vector_memory", half_life_days: float = 14.0, ttl_days: float = 14.0):
+        self.root = Path(root)
+        self.vectors_path = self.root / "vectors.npy"
+        self.meta_path = self.root / "meta.json"
+        self.half_life_days = half_life_days
+        self.ttl_days = ttl_days
+
+        self.vectors: Optional[np.ndarray] = None
+        self.ids: List[str] = []
+        self.timestamps = np.zeros(0)
+        self.kinds: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._pending: Dict[str, Dict] = {}
+        self._load()
+
+    @staticmethod
+    def text_id(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _load(self):
+        if not (self.vectors_path.exists() and self.meta_path.exists()):
+            return
+        try:
+            with open(self.meta_path, 'r') as f:
+                meta = json.load(f)
+            vectors = np.load(self.vectors_path, mmap_mode="r")
+            if vectors.shape[0] != len(meta["ids"]):
+                raise ValueError("vector count does not match metadata")
+
+            self.vectors = vectors
+            self.ids = meta["ids"]
+            self.timestamps = np.asarray(meta["timestamps"], dtype=np.float64)
+            self.kinds = meta["kinds"]
+            self._index = {entry_id: i for i, entry_id in enumerate(self.ids)}
+            logger.info("Vector memory loaded", entries=len(self.ids))
+        except Exception as e:
+            logger.warning("Vector memory unreadable, starting fresh", error=str(e))
+
+    def __len__(self) -> int:
+        return len(self.ids) + sum(1 for entry_id in self._pending if entry_id not in self._index)
+
+    @property
+    def dim(self) -> Optional[int]:
+        if self.vectors is not None and len(self.ids):
+            return self.vectors.shape[1]
+        return None
+
+    def get_vectors(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """Stored vectors for the given ids, so callers can skip re-embedding known texts."""
+        found = {}
+        for entry_id in ids:
+            if entry_id in self._pending:
+                found[entry_id] = self._pending[entry_id]["vector"]
+            elif entry_id in self._index:
+                found[entry_id] = np.asarray(self.vectors[self._index[entry_id]])
+        return found
+
+    def add(self, ids: List[str], vectors: List[np.ndarray], kind: str = "seen"):
+        now = time.time()
+        for entry_id, vector in zip(ids, vectors):
+            if vector is None:
+                continue
+            previous = self._pending.get(entry_id)
+            if previous is None and entry_id in self._index:
+                previous = {"kind": self.kinds[self._index[entry_id]]}
+            # Once produced, a topic stays produced even if it is seen again
+            if previous and previous["kind"] == "produced":
+                kind_for_entry = "produced"
+            else:
+                kind_for_entry = kind
+            self._pending[entry_id] = {"vector": np.asarray(vector, dtype=np.float32), "timestamp": now, "kind": kind_for_entry}
+
+    def query_batch(self, vectors: List[np.ndarray], threshold: float, kinds: Optional[List[str]] = None) -> List[Optional[Dict]]:
+        """Best match in memory for each query vector, or None when nothing live reaches threshold.
+
+        The threshold applies to raw similarity; among the matches the most
+        recent (highest decayed score) wins.
+        """
+        results: List[Optional[Dict]] = [None] * len(vectors)
+        if self.vectors is None or not self.ids:
+            return results
+
+        valid = [i for i, v in enumerate(vectors) if v is not None and len(v) == self.dim]
+        if not valid:
+            return results
+
+        queries = self._normalize(np.stack([vectors[i] for i in valid]))
+        age_days = (time.time() - self.timestamps) / 86400
+        decay = np.power(0.5, np.clip(age_days, 0, None) / self.half_life_days)
+        live = age_days <= self.ttl_days
+        if kinds:
+            live &= np.isin(np.asarray(self.kinds), kinds)
+        if not live.any():
+            return results
+
+        similarities = queries @ np.asarray(self.vectors).T
+        scores = np.where(live & (similarities >= threshold), similarities * decay, -np.inf)
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(valid)), best]
+
+        for row, (query_idx, score) in enumerate(zip(valid, best_scores)):
+            if not np.isfinite(score):
+                continue
+            j = best[row]
+            results[query_idx] = {
+                "id": self.ids[j],
+                "kind": self.kinds[j],
+                "similarity": round(float(similarities[row, j]), 4),
+                "score": round(float(score), 4),
+                "age_days": round(float(age_days[j]), 2),
+            }
+        return results
+
+    def save(self):
+        """Merge pending vectors, drop expired entries and rewrite the matrix atomically."""
+        now = time.time()
+        cutoff = now - self.ttl_days * 86400
+
+        dim = self.dim
+        pending_dims = {len(p["vector"]) for p in self._pending.values()}
+        if pending_dims and dim is not None and pending_dims != {dim}:
+            # Embedding model changed; old vectors are no longer comparable
+            logger.warning("Embedding dimension changed, resetting vector memory", old=dim, new=sorted(pending_dims))
+            self.ids, self.kinds, self.timestamps, self.vectors, self._index = [], [], np.zeros(0), None, {}
+
+        keep = [i for i, entry_id in enumerate(self.ids) if entry_id not in self._pending and self.timestamps[i] >= cutoff]
+        ids = [self.ids[i] for i in keep] + list(self._pending.keys())
+        kinds = [self.kinds[i] for i in keep] + [p["kind"] for p in self._pending.values()]
+        timestamps = [float(self.timestamps[i]) for i in keep] + [p["timestamp"] for p in self._pending.values()]
+
+        parts = []
+        if keep:
+            parts.append(np.asarray(self.vectors[keep]))
+        if self._pending:
+            parts.append(self._normalize(np.stack([p["vector"] for p in self._pending.values()])))
+        if not parts:
+            return
+
+        matrix = np.concatenate(parts).astype(np.float32)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        # Drop the mmap before replacing the file underneath it
+        self.vectors = None
+        tmp_vectors = self.root / "vectors.tmp.npy"
+        np.save(tmp_vectors, matrix)
+        tmp_vectors.replace(self.vectors_path)
+
+        tmp_meta = self.meta_path.with_suffix(".tmp")
+        with open(tmp_meta, 'w') as f:
+            json.dump({"ids": ids, "timestamps": timestamps, "kinds": kinds}, f)
+        tmp_meta.replace(self.meta_path)
+
+        expired = len(self.ids) - len(keep) - sum(1 for entry_id in self._pending if entry_id in self._index)
+        self._pending = {}
+        self._load()
+        logger.info("Vector memory saved", entries=len(ids), expired=expired)
@@ -0,0 +1,182 @@
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..shared import get_logger, embedding_service
+from .vector_memory import VectorMemory
+
+logger = get_logger(__name__)
+
+class WinnersIndex:
+    """Embeddings of past top-performing titles/hooks plus narrative lane centroids.
+
+    Built (incrementally) by the weekly learning job from RCI records and lane
+    examples in narrative_lanes.json; daily scoring loads both matrices
+    memory-mapped and only runs matmuls against them.
+    """
+
+    def __init__(self, root: str = "memory/winners_index", top_fraction: float = 0.25, max_winners: int = 2000):
+        self.root = Path(root)
+        self.winners_path = self.root / "winners.npy"
+        self.lanes_path = self.root / "lanes.npy"
+        self.meta_path = self.root / "meta.json"
+        self.top_fraction = top_fraction
+        self.max_winners = max_winners
+
+        self.winners: Optional[np.ndarray] = None
+        self.lanes: Optional[np.ndarray] = None
+        self.meta: Dict = {"winner_ids": [], "lane_ids": [], "lanes_digest": None}
+        self._load()
+
+    def _load(self):
+        if not self.meta_path.exists():
+            return
+        try:
+            with open(self.meta_path, 'r') as f:
+                meta = json.load(f)
+            winners = np.load(self.winners_path, mmap_mode="r") if self.winners_path.exists() else None
+            lanes = np.load(self.lanes_path, mmap_mode="r") if self.lanes_path.exists() else None
+            if (winners is not None and winners.shape[0] != len(meta["winner_ids"])) or \
+               (lanes is not None and lanes.shape[0] != len(meta["lane_ids"])):
+                raise ValueError("matrix size does not match metadata")
+
+            self.meta, self.winners, self.lanes = meta, winners, lanes
+            logger.info("Winners index loaded", winners=len(meta["winner_ids"]), lanes=len(meta["lane_ids"]))
+        except Exception as e:
+            logger.warning("Winners index unreadable, scoring falls back to defaults", error=str(e))
+
+    def __len__(self) -> int:
+        return len(self.meta["winner_ids"])
+
+    @property
+    def ready(self) -> bool:
+        return self.winners is not None or self.lanes is not None
+
+    @property
+    def dim(self) -> Optional[int]:
+        for matrix in (self.winners, self.lanes):
+            if matrix is not None and matrix.shape[0]:
+                return matrix.shape[1]
+        return None
+
+    @staticmethod
+    def performance(record: Dict) -> float:
+        """Observed performance of a published video, falling back to its predicted score."""
+        signals = record.get("early_signals") or {}
+        return float(signals.get("views_24h") or signals.get("view_velocity") or record.get("vps_score") or 0)
+
+    def select_winners(self, records: List[Dict]) -> List[Dict]:
+        scored = [r for r in records if self.performance(r) > 0]
+        if not scored:
+            return []
+        cutoff = np.quantile([self.performance(r) for r in scored], 1 - self.top_fraction)
+        return [r for r in scored if self.performance(r) >= cutoff]
+
+    @staticmethod
+    def _lane_examples(lane_configs: List[Path]) -> Dict[str, List[str]]:
+        examples: Dict[str, List[str]] = {}
+        for path in lane_configs:
+            if not Path(path).exists():
+                continue
+            with open(path) as f:
+                lanes = json.load(f).get("lanes", {})
+            for lane_id, lane in lanes.items():
+                texts = examples.setdefault(lane_id, [])
+                for text in [lane.get("description", "")] + lane.get("examples", []):
+                    if text and text not in texts:
+                        texts.append(text)
+        return examples
+
+    def rebuild(self, records: List[Dict], lane_configs: List[Path]) -> Dict:
+        """Add this period's winners and refresh lane centroids if the lane examples changed.
+
+        Winners already in the index keep their vectors; only new titles/hooks are
+        embedded. The oldest winners are dropped beyond max_winners.
+        """
+        texts = []
+        for record in self.select_winners(records):
+            for text in (record.get("title"), record.get("hook")):
+                if text and text not in texts:
+                    texts.append(text)
+
+        ids = list(self.meta["winner_ids"])
+        known = set(ids)
+        new_texts = [t for t in texts if VectorMemory.text_id(t) not in known]
+        new_vectors = embedding_service.encode_batch(new_texts) if new_texts else []
+
+        winners = np.asarray(self.winners) if self.winners is not None else None
+        if len(new_vectors) == len(new_texts) and new_texts:
+            fresh = VectorMemory._normalize(np.stack(new_vectors))
+            if winners is not None and winners.shape[1] != fresh.shape[1]:
+                # Embedding model changed; old vectors are no longer comparable
+                logger.warning("Embedding dimension changed, resetting winners", old=winners.shape[1], new=fresh.shape[1])
+                winners, ids = None, []
+            winners = fresh if winners is None else np.concatenate([winners, fresh])
+            ids += [VectorMemory.text_id(t) for t in new_texts]
+        if winners is not None and len(ids) > self.max_winners:
+            winners, ids = winners[-self.max_winners:], ids[-self.max_winners:]
+
+        examples = self._lane_examples(lane_configs)
+        digest = hashlib.sha1(json.dumps(examples, sort_keys=True).encode("utf-8")).hexdigest()
+        lanes, lane_ids = (np.asarray(self.lanes) if self.lanes is not None else None), list(self.meta["lane_ids"])
+        if digest != self.meta.get("lanes_digest") or (winners is not None and lanes is not None and lanes.shape[1] != winners.shape[1]):
+            centroids, lane_ids = [], []
+            for lane_id, lane_texts in examples.items():
+                vectors = embedding_service.encode_batch(lane_texts)
+                if len(vectors) != len(lane_texts):
+                    continue
+                centroids.append(VectorMemory._normalize(np.stack(vectors)).mean(axis=0))
+                lane_ids.append(lane_id)
+            lanes = VectorMemory._normalize(np.stack(centroids)) if centroids else None
+
+        # Without centroids (e.g. the embedding model failed) the digest is left unset so the next run retries
+        self._save(winners, ids, lanes, lane_ids, digest if lanes is not None else None)
+        stats = {"winners": len(ids), "added": len(new_texts), "lanes": len(lane_ids)}
+        logger.info("Winners index rebuilt", **stats)
+        return stats
+
+    def _save(self, winners: Optional[np.ndarray], ids: List[str], lanes: Optional[np.ndarray], lane_ids: List[str], digest: Optional[str]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Drop the mmaps before replacing the files underneath them
+        self.winners, self.lanes = None, None
+        for matrix, path in ((winners, self.winners_path), (lanes, self.lanes_path)):
+            if matrix is None:
+                path.unlink(missing_ok=True)
+                continue
+            tmp = path.with_name(path.stem + ".tmp.npy")
+            np.save(tmp, np.asarray(matrix, dtype=np.float32))
+            tmp.replace(path)
+
+        self.meta = {"winner_ids": ids if winners is not None else [], "lane_ids": lane_ids if lanes is not None else [],
+                     "lanes_digest": digest, "updated_at": time.time()}
+        tmp_meta = self.meta_path.with_suffix(".tmp")
+        with open(tmp_meta, 'w') as f:
+            json.dump(self.meta, f)
+        tmp_meta.replace(self.meta_path)
+        self._load()
+
+    def query(self, vectors: np.ndarray, top_k: int = 5) -> Dict[str, np.ndarray]:
+        """Per-query max and top-k mean similarity to winners, and max similarity to any lane.
+
+        Entries are NaN where the matrix is missing. Similarities are rounded to 1e-6
+        so a candidate's score does not depend on how many rows share its matmul.
+        """
+        n = len(vectors)
+        result = {name: np.full(n, np.nan) for name in ("winner_max", "winner_mean", "lane_max")}
+        if not n or self.dim is None or np.asarray(vectors).shape[1] != self.dim:
+            return result
+
+        queries = VectorMemory._normalize(vectors)
+        if self.winners is not None and self.winners.shape[0]:
+            similarities = np.round(queries @ np.asarray(self.winners).T, 6).astype(np.float64)
+            k = min(top_k, similarities.shape[1])
+            top = -np.sort(-similarities, axis=1)[:, :k]
+            result["winner_max"] = top[:, 0]
+            result["winner_mean"] = top.mean(axis=1)
+        if self.lanes is not None and self.lanes.shape[0]:
+            result["lane_max"] = np.round(queries @ np.asarray(self.lanes).T, 6).astype(np.float64).max(axis=1)
+        return result
@@ -8,10 +8,10 @@ from ..shared import get_logger
 logger = get_logger(__name__)
 
 class CanaryMonitor:
-    def __init__(self):
-        self.metrics_dir = Path("data/metrics")
+    def __init__(self, metrics_dir: str = "data/metrics", history_file: str = "data/history/performance_history.json"):
+        self.metrics_dir = Path(metrics_dir)
         self.metrics_dir.mkdir(parents=True, exist_ok=True)
-        self.history_file = Path("data/history/performance_history.json")
+        self.history_file = Path(history_file)
         self.history_file.parent.mkdir(parents=True, exist_ok=True)
         
         # Load history percentiles or defaults
@@ -1,6 +1,7 @@
 import subprocess
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 from ..shared import get_logger, handle_errors
@@ -12,24 +13,25 @@ class TTSGenerator:
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-    def generate_audio(self, text: str, voice: str = "default") -> Optional[Path]:
+    def generate_audio(self, text: str, voice: str = "default", name: str = "tts", duration: float = 5.0) -> Optional[Path]:
         # Fallback Chain: Kokoro -> Piper -> eSpeak -> Captions (None)
+        # name keeps concurrent syntheses (one per scene) apart
         
         # 1. Try Kokoro (Simulated)
         if self._try_kokoro(text):
-            return self.output_dir / "tts_kokoro.wav"
+            return self.output_dir / f"{name}_kokoro.wav"
             
         # 2. Try Piper (Simulated)
         if self._try_piper(text):
-            return self.output_dir / "tts_piper.wav"
+            return self.output_dir / f"{name}_piper.wav"
             
         # 3. Try eSpeak (Simulated)
         if self._try_espeak(text):
-            return self.output_dir / "tts_espeak.wav"
+            return self.output_dir / f"{name}_espeak.wav"
             
         # 4. Fallback to Captions (return None, implied silence)
         logger.warning("All TTS engines failed, falling back to captions-only")
-        return self._generate_silence(duration=5.0) # Dummy silence
+        return self._generate_silence(duration=duration, name=name) # Dummy silence
     
     def _try_kokoro(self, text: str) -> bool:
         # Simulate check
@@ -41,8 +43,8 @@ class TTSGenerator:
     def _try_espeak(self, text: str) -> bool:
         return False # Not installed
     
-    def _generate_silence(self, duration: float) -> Optional[Path]:
-        output_path = self.output_dir / "silence.wav"
+    def _generate_silence(self, duration: float, name: str = "tts") -> Optional[Path]:
+        output_path = self.output_dir / f"{name}_silence.wav"
         try:
             cmd = [
                 "ffmpeg", "-y", "-f", "lavfi", "-i", f"anullsrc=r=44100:cl=mono", 
@@ -85,12 +87,26 @@ class ThumbnailGenerator:
             return False
 
 class VideoAssembler:
-    def __init__(self):
+    def __init__(self, config_path: str = "config/github_actions_limits.json"):
         self.output_dir = Path("data/assets/videos")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.tts = TTSGenerator(self.output_dir / "audio")
         self.thumb_gen = ThumbnailGenerator(self.output_dir / "thumbnails")
-        logger.info("VideoAssembler initialized")
+        # Rendered scenes by content hash, reused by any video (or re-render) with the same scene
+        self.scene_dir = self.output_dir / "scenes"
+        self.scene_dir.mkdir(parents=True, exist_ok=True)
+
+        parallelism = self._load_config(config_path).get("parallelism", {})
+        self.scene_workers = parallelism.get("scene_render_parallel", 4) if parallelism.get("enabled", True) else 1
+        self.last_render_stats: Dict = {}
+        logger.info("VideoAssembler initialized", scene_workers=self.scene_workers)
+
+    def _load_config(self, config_path: str) -> Dict:
+        path = Path(config_path)
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return {}
     
     def check_ffmpeg(self) -> bool:
         try:
@@ -120,13 +136,17 @@ class VideoAssembler:
         
         output_path = self.output_dir / f"{video_id}.mp4"
         
-        # 1. Generate TTS
-        # In a real run, we'd loop through scenes. Here simplified.
-        script = edg.get("metadata", {}).get("script_full", "")
-        audio_path = self.tts.generate_audio(script[:100]) # Sample
-        
-        # 2. Assemble Video
-        success = self._create_ffmpeg_video(edg, output_path, audio_path)
+        scenes = edg.get("scenes", [])
+        if scenes and all(scene.get("content_hash") for scene in scenes):
+            # 1-2. TTS and video per scene, in parallel, then joined
+            success = self._render_scenes(edg, output_path)
+        else:
+            # 1. Generate TTS
+            script = edg.get("metadata", {}).get("script_full", "")
+            audio_path = self.tts.generate_audio(script[:100]) # Sample
+            
+            # 2. Assemble Video
+            success = self._create_ffmpeg_video(edg, output_path, audio_path)
         
         # 3. Generate Thumbnails
         thumbnails = self.thumb_gen.generate_variants(video_id, edg.get("metadata", {}).get("titles", ["Video"])[0])
@@ -191,6 +211,109 @@ class VideoAssembler:
             logger.error("FFmpeg error", error=str(e))
             return False
     
+    @staticmethod
+    def _frame_size(aspect_ratio: str):
+        return (1080, 1920) if aspect_ratio == "9:16" else (1920, 1080)
+
+    def _render_scenes(self, edg: Dict, output_path: Path) -> bool:
+        """Render each distinct scene once (or reuse it by content hash) and concatenate them in order."""
+        scenes = edg["scenes"]
+        width, height = self._frame_size(edg.get("aspect_ratio", "9:16"))
+        unique = {scene["content_hash"]: scene for scene in scenes}
+        cached = {h for h in unique if (self.scene_dir / f"{h}.mp4").exists()}
+        todo = [scene for h, scene in unique.items() if h not in cached]
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.scene_workers, len(todo) or 1))) as executor:
+            rendered = list(executor.map(lambda scene: self._render_scene(scene, width, height), todo))
+        failed = len(todo) - sum(rendered)
+
+        self.last_render_stats = {
+            "video_id": edg.get("video_id"),
+            "scenes": len(scenes),
+            "reused": sum(1 for scene in scenes if scene["content_hash"] in cached),
+            "rendered": sum(rendered),
+            "failed": failed,
+            "elapsed_seconds": round(time.time() - start, 2),
+        }
+        logger.info("Scenes rendered", **self.last_render_stats)
+        if failed:
+            return False
+        return self._concat_scenes([self.scene_dir / f"{scene['content_hash']}.mp4" for scene in scenes], output_path)
+
+    def _render_scene(self, scene: Dict, width: int, height: int) -> bool:
+        output_path = self.scene_dir / f"{scene['content_hash']}.mp4"
+        tmp_path = output_path.with_suffix(".tmp.mp4")
+        duration = scene.get("duration") or max(scene.get("end", 0) - scene.get("start", 0), 0.5)
+        # Audio is keyed like the render: scenes sharing narration can differ in duration and render concurrently
+        audio_path = self.tts.generate_audio(scene.get("tts_text", ""), name=scene["content_hash"], duration=duration)
+        cmd = self._scene_command(scene, width, height, duration, audio_path, tmp_path)
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+            if result.returncode != 0:
+                logger.error("Scene render failed", scene=scene.get("id"), stderr=result.stderr[:200])
+                return False
+            tmp_path.replace(output_path) # only complete renders land in the scene cache
+            return True
+        except subprocess.TimeoutExpired:
+            logger.error("Scene render timeout", scene=scene.get("id"))
+            return False
+        except Exception as e:
+            logger.error("Scene render error", scene=scene.get("id"), error=str(e))
+            return False
+
+    def _scene_command(
+        self,
+        scene: Dict,
+        width: int,
+        height: int,
+        duration: float,
+        audio_path: Optional[Path],
+        output_path: Path,
+    ) -> List[str]:
+        # The overlay goes through a file: drawtext would otherwise parse %, ' and : in figures like "0.5%"
+        overlay_path = self.scene_dir / f"{scene['content_hash']}.txt"
+        overlay_path.write_text(scene.get("text_overlay", ""), encoding="utf-8")
+
+        inputs = ["-f", "lavfi", "-i", f"color=c=#1a1a2e:s={width}x{height}:d={duration}"]
+        if audio_path and audio_path.exists():
+            inputs.extend(["-i", str(audio_path)])
+        else:
+            # Silent track keeps every scene's streams identical for the concat
+            inputs.extend(["-f", "lavfi", "-i", "anullsrc=r=44100:cl=mono"])
+        return [
+            "ffmpeg", "-y",
+            *inputs,
+            "-vf", f"drawtext=textfile='{overlay_path.as_posix()}':expansion=none:fontsize=48:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2",
+            "-c:v", "libx264", "-preset", "ultrafast",
+            "-c:a", "aac", "-ar", "44100", "-ac", "1",
+            "-t", str(duration),
+            "-map", "0:v", "-map", "1:a",
+            str(output_path),
+        ]
+
+    def _concat_scenes(self, scene_paths: List[Path], output_path: Path) -> bool:
+        list_path = output_path.with_suffix(".scenes.txt")
+        with open(list_path, 'w') as f:
+            for path in scene_paths:
+                f.write(f"file '{path.resolve()}'\n")
+        try:
+            result = subprocess.run(
+                ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(list_path), "-c", "copy", str(output_path)],
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+            if result.returncode != 0:
+                logger.error("Scene concat failed", stderr=result.stderr[:200])
+                return False
+            return True
+        except Exception as e:
+            logger.error("Scene concat error", error=str(e))
+            return False
+        finally:
+            list_path.unlink(missing_ok=True)
+
     def _create_placeholder_video(self, video_id: str, format_type: str) -> Optional[str]:
         output_path = self.output_dir / f"{video_id}_placeholder.txt"
         
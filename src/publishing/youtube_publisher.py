@@ -3,19 +3,36 @@ import json
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
-from ..shared import get_logger, handle_errors
+from ..shared import get_logger, handle_errors, DEFAULT_CHANNEL_ID
 
 logger = get_logger(__name__)
 
 class YouTubePublisher:
-    def __init__(self):
-        self.client_id = os.getenv("YOUTUBE_CLIENT_ID", "")
-        self.client_secret = os.getenv("YOUTUBE_CLIENT_SECRET", "")
-        self.refresh_token = os.getenv("YOUTUBE_REFRESH_TOKEN", "")
-        self.queue_dir = Path("data/queue")
+    def __init__(
+        self,
+        channel_id: str = DEFAULT_CHANNEL_ID,
+        credentials: Optional[Dict] = None,
+        queue_dir: str = "data/queue",
+        records_dir: str = "data/metrics",
+        daily_upload_quota: int = 6,
+    ):
+        credentials = credentials or {
+            "client_id": os.getenv("YOUTUBE_CLIENT_ID", ""),
+            "client_secret": os.getenv("YOUTUBE_CLIENT_SECRET", ""),
+            "refresh_token": os.getenv("YOUTUBE_REFRESH_TOKEN", ""),
+        }
+        self.channel_id = channel_id
+        self.client_id = credentials.get("client_id", "")
+        self.client_secret = credentials.get("client_secret", "")
+        self.refresh_token = credentials.get("refresh_token", "")
+        self.daily_upload_quota = daily_upload_quota
+        self.queue_dir = Path(queue_dir)
         self.queue_dir.mkdir(parents=True, exist_ok=True)
+        self.records_dir = Path(records_dir)
+        # Persisted next to the publish records so daily reruns and recovery runs share the day's count
+        self.quota_path = self.records_dir / "upload_quota.json"
         
-        logger.info("YouTubePublisher initialized", has_credentials=bool(self.client_id))
+        logger.info("YouTubePublisher initialized", channel=channel_id, has_credentials=bool(self.client_id))
     
     @handle_errors(fallback_value=None)
     def publish_video(self, video_path: str, metadata: Dict, privacy: str = "unlisted") -> Optional[Dict]:
@@ -33,8 +50,14 @@ class YouTubePublisher:
             logger.warning("Cannot publish: missing credentials or video file")
             return self._queue_for_retry(video_path, metadata, privacy)
         
+        # Upload quota is tracked per channel so one busy channel can't starve the others
+        if not self._consume_upload_quota():
+            logger.warning("Upload quota exhausted, queueing", channel=self.channel_id)
+            return self._queue_for_retry(video_path, metadata, privacy)
+        
         publish_record = {
             "video_id": video_id,
+            "channel_id": self.channel_id,
             "format": metadata.get("format", "short"),
             "title": title,
             "scheduled_time": datetime.utcnow().isoformat(),
@@ -52,6 +75,28 @@ class YouTubePublisher:
         logger.info("Video published (simulated)", youtube_id=publish_record["youtube_video_id"])
         return publish_record
     
+    def _consume_upload_quota(self) -> bool:
+        """Count one upload against today's (UTC) per-channel quota; False once it is used up."""
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        usage = {}
+        if self.quota_path.exists():
+            try:
+                with open(self.quota_path, 'r') as f:
+                    usage = json.load(f)
+            except Exception as e:
+                logger.warning("Upload quota state unreadable, starting fresh", error=str(e))
+        
+        uploads = usage.get("uploads", 0) if usage.get("date") == today else 0
+        if uploads >= self.daily_upload_quota:
+            return False
+        
+        self.records_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.quota_path.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump({"date": today, "uploads": uploads + 1}, f)
+        tmp.replace(self.quota_path)
+        return True
+    
     def _queue_for_retry(self, video_path: str, metadata: Dict, privacy: str) -> Dict:
         queue_item = {
             "video_path": video_path,
@@ -69,10 +114,9 @@ class YouTubePublisher:
         return queue_item
     
     def _save_publish_record(self, record: Dict):
-        records_dir = Path("data/metrics")
-        records_dir.mkdir(parents=True, exist_ok=True)
+        self.records_dir.mkdir(parents=True, exist_ok=True)
         
-        record_file = records_dir / f"publish_{record['video_id']}.json"
+        record_file = self.records_dir / f"publish_{record['video_id']}.json"
         with open(record_file, 'w') as f:
             json.dump(record, f, indent=2)
     
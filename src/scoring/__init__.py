@@ -1,3 +1,4 @@
 from .vps_scorer import VPSScorer
+from .score_cache import ScoreCache
 
-__all__ = ["VPSScorer"]
+__all__ = ["VPSScorer", "ScoreCache"]
@@ -0,0 +1,93 @@
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+class ScoreCache:
+    """Time-independent score parts per candidate, persisted across runs.
+
+    Entries are keyed by a digest of the candidate's lower-cased text and the
+    other inputs the cached parts depend on. The whole cache is tied to a
+    config version (niche multipliers, weights, score tables, winners index):
+    when that changes, the stored entries are dropped on load.
+    """
+
+    def __init__(self, path: str = "data/cache/score_cache.json", config_version: str = "", ttl_days: float = 14.0):
+        self.path = Path(path)
+        self.config_version = config_version
+        self.ttl_days = ttl_days
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = False
+        self._dirty = False
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning("Score cache unreadable, starting fresh", error=str(e))
+            return {}
+        if data.get("config_version") != self.config_version:
+            logger.info("Scoring config changed, score cache invalidated", entries=len(data.get("entries", {})))
+            self.invalidated = True
+            self._dirty = True
+            return {}
+        return data.get("entries", {})
+
+    @staticmethod
+    def key(title: str, description: str, *inputs) -> str:
+        # Keyword matching and the (uncased) embedding model both ignore case
+        text = f"{(title or '').strip().lower()}\n{(description or '').strip().lower()}"
+        return hashlib.sha1(json.dumps([text, *inputs]).encode("utf-8")).hexdigest()
+
+    def lookup(self, keys: List[str]) -> List[Optional[Dict]]:
+        now = time.time()
+        found = []
+        for key in keys:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                entry["last_used"] = now
+                self._dirty = True
+            found.append(entry)
+        return found
+
+    def store(self, keys: List[str], values: List[Dict]):
+        now = time.time()
+        for key, value in zip(keys, values):
+            self.entries[key] = dict(value, last_used=now)
+        self._dirty = self._dirty or bool(keys)
+
+    def save(self):
+        if not self._dirty:
+            return
+        cutoff = time.time() - self.ttl_days * 86400
+        self.entries = {k: v for k, v in self.entries.items() if v.get("last_used", 0) >= cutoff}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump({"config_version": self.config_version, "entries": self.entries}, f)
+        tmp.replace(self.path)
+        self._dirty = False
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self.entries),
+            "invalidated": self.invalidated,
+        }
@@ -1,14 +1,20 @@
 import json
+import hashlib
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Tuple, Union
 import datetime
-from ..shared import get_logger, embedding_service
+import numpy as np
+from ..shared import get_logger, embedding_service, text_features, CandidateBatch
+from ..memory.winners_index import WinnersIndex
+from .score_cache import ScoreCache
 
 logger = get_logger(__name__)
 
 class VPSScorer:
-    def __init__(self):
+    def __init__(self, winners_index: Optional[WinnersIndex] = None, score_cache: Optional[ScoreCache] = None):
         self.niche_config = self._load_niche_config()
+        # Built by the weekly learning job; until then the pattern components use fixed defaults
+        self.winners_index = winners_index if winners_index is not None else WinnersIndex()
         self.weights = {
             "emotional_charge": 0.15,
             "curiosity_gap": 0.25,
@@ -18,8 +24,30 @@ class VPSScorer:
             "historical_pattern": 0.10,
             "narrative_fit": 0.10,
         }
+        
+        text_features.register_group("scoring.curiosity", self.CURIOSITY_TRIGGERS)
+        text_features.register_group("scoring.shareability", self.SHAREABLE_ELEMENTS)
+        text_features.register_group("scoring.niches", {
+            niche_name: niche_data.get("keywords", [])
+            for niche_name, niche_data in self.niche_config.get("niches", {}).items()
+        })
+        # Everything but timeliness and saturation is reused across runs while the config is unchanged
+        self.score_cache = score_cache if score_cache is not None else ScoreCache(config_version=self.config_version())
         logger.info("VPSScorer initialized")
     
+    def config_version(self) -> str:
+        """Digest of everything the cached (time-independent) score parts depend on."""
+        inputs = {
+            "niches": self.niche_config,
+            "weights": self.weights,
+            "keywords": [self.CURIOSITY_TRIGGERS, self.SHAREABLE_ELEMENTS],
+            "tables": [self.EMOTION_SCORES, self.SIMPLICITY_BINS, self.HISTORICAL_DEFAULT, self.NARRATIVE_DEFAULT, self.SIMILARITY_RANGE],
+            "winners_index": self.winners_index.meta,
+            "embedding_model": embedding_service.model_name,
+            "format": self.CACHE_FORMAT,
+        }
+        return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    
     def _load_niche_config(self) -> Dict:
         config_path = Path("config/niche_multipliers.json")
         if config_path.exists():
@@ -27,34 +55,240 @@ class VPSScorer:
                 return json.load(f)
         return {"niches": {}, "default_multiplier": 1.0}
     
-    def score_batch(self, candidates: List[Dict]) -> List[Dict]:
-        scored = []
+    SCORE_FIELDS = (
+        "candidate_id", "title", "base_vps", "components", "niche",
+        "niche_multiplier", "saturation_factor", "competitor_count", "final_score",
+    )
+    
+    # Score tables shared by the per-candidate and batch paths
+    CURIOSITY_TRIGGERS = ["why", "how", "what", "secret", "hidden", "revealed", "truth", "myth", "lie", "wrong"]
+    SHAREABLE_ELEMENTS = ["data", "study", "research", "reveals", "shows", "proves", "chart", "map"]
+    EMOTION_SCORES = {
+        "surprise": 85,
+        "concern": 80,
+        "curiosity": 90,
+        "opportunity": 85, # Added as per ticket
+        "awe": 75,
+        "neutral": 40,
+    }
+    TIMELINESS_BINS = ([6, 24, 48], [95, 80, 60, 40]) # age_hours < bin
+    SIMPLICITY_BINS = ([30, 45, 60], [95, 80, 65, 40]) # explainability_seconds <= bin
+    SATURATION_BINS = ([2, 5, 15, 50], [1.8, 1.0, 0.7, 0.3, 0.0]) # competitor_count <= bin
+    HISTORICAL_DEFAULT = 70
+    NARRATIVE_DEFAULT = 65
+    SIMILARITY_RANGE = (0.2, 0.8) # cosine similarity mapped linearly onto 40-100
+    
+    # Score parts that depend only on the candidate and the config, not on the clock or counts
+    CACHED_FIELDS = ("emotional_charge", "curiosity_gap", "shareability", "simplicity", "historical_pattern", "narrative_fit", "niche")
+    CACHE_FORMAT = 1
+    
+    def score_batch(self, candidates: Union[List[Dict], CandidateBatch]) -> Union[List[Dict], CandidateBatch]:
+        """Score, drop skipped (final_score 0) candidates and sort best first.
+        
+        Every component is computed as an array over the whole batch (see
+        _score_arrays); results match score_single for each candidate.
+        A CandidateBatch in gives a CandidateBatch of score columns out.
+        """
+        is_batch = isinstance(candidates, CandidateBatch)
+        batch = candidates if is_batch else CandidateBatch.from_records(candidates)
+        
+        scored = CandidateBatch.from_columns(**self._score_arrays(batch)) if len(batch) else CandidateBatch({})
+        if len(scored):
+            scored = scored.filter(scored["final_score"] > 0).sort_by("final_score") # Filter out skipped ones
+        self._log_scores(scored["final_score"].tolist() if len(scored) else [])
+        self.score_cache.save()
+        
+        return scored if is_batch else scored.to_records()
+    
+    def _score_arrays(self, batch: CandidateBatch) -> Dict[str, List]:
+        """Score columns (SCORE_FIELDS) for a batch, unfiltered and in input order."""
+        n = len(batch)
+        cached = self._cached_columns(batch)
+        
+        # Component matrix, one column per weight, in self.weights order
+        columns = {name: cached[name] for name in self.weights if name in cached}
+        columns["timeliness"] = self._timeliness_array(batch.column("timestamp", ""))
+        components = np.column_stack([columns[name] for name in self.weights])
+        weights = np.array([self.weights[name] for name in self.weights])
+        
+        # components @ weights, accumulated column by column so the float sum (and with it
+        # every rounded score) is bit-identical to score_single's left-to-right sum
+        base_vps = np.zeros(n)
+        for j in range(len(weights)):
+            base_vps = base_vps + components[:, j] * weights[j]
+        
+        niche_names = list(self.niche_config.get("niches", {}))
+        niche_table = niche_names + ["general"]
+        position = {name: i for i, name in enumerate(niche_table)}
+        niche_idx = np.array([position[name] for name in cached["niche"]], dtype=np.int64)
+        multiplier_table = [self._get_niche_multiplier(name) for name in niche_table]
+        niche_multiplier = np.array(multiplier_table, dtype=float)[niche_idx]
+        
+        # Saturation: explicit competitor_count wins, origin_count is the proxy
+        competitor_count = batch.column("competitor_count", 0)
+        saturation_count = np.where(batch.present("competitor_count"), competitor_count, batch.column("origin_count", 0)).astype(float)
+        saturation_bins, saturation_factors = self.SATURATION_BINS
+        saturation_idx = np.digitize(saturation_count, saturation_bins, right=True)
+        saturation_factor = np.array(saturation_factors)[saturation_idx]
+        
+        final_score = base_vps * niche_multiplier * saturation_factor
+        
+        # Python's round() is correctly rounded (np.round is not), so output values use it
+        names = list(self.weights)
+        component_values = [
+            [round(v, 2) for v in columns[name].tolist()] if columns[name].dtype.kind == "f" else columns[name].tolist()
+            for name in names
+        ]
+        return {
+            "candidate_id": batch.column("id").tolist(),
+            "title": batch.column("title").tolist(),
+            "base_vps": [round(v, 2) for v in base_vps.tolist()],
+            "components": [dict(zip(names, row)) for row in zip(*component_values)],
+            "niche": [niche_table[i] for i in niche_idx],
+            "niche_multiplier": [multiplier_table[i] for i in niche_idx],
+            "saturation_factor": [saturation_factors[i] for i in saturation_idx],
+            "competitor_count": competitor_count.tolist(),
+            "final_score": [round(v, 2) for v in final_score.tolist()],
+        }
+    
+    def _cached_columns(self, batch: CandidateBatch) -> Dict[str, Any]:
+        """CACHED_FIELDS for a batch, computing (and caching) only the rows not seen before."""
+        keys = [
+            ScoreCache.key(title, description, emotion, explainability)
+            for title, description, emotion, explainability in zip(
+                batch.column("title", "").tolist(),
+                batch.column("description", "").tolist(),
+                batch.column("emotional_vector", "neutral").tolist(),
+                batch.column("explainability_seconds", 60).tolist(),
+            )
+        ]
+        rows = self.score_cache.lookup(keys)
+        
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            computed = self._static_columns(batch.take(missing))
+            values = [computed[name].tolist() if name != "niche" else computed[name] for name in self.CACHED_FIELDS]
+            fresh = [dict(zip(self.CACHED_FIELDS, row)) for row in zip(*values)]
+            self.score_cache.store([keys[i] for i in missing], fresh)
+            for i, row in zip(missing, fresh):
+                rows[i] = row
+        
+        columns = {name: np.array([row[name] for row in rows]) for name in self.CACHED_FIELDS if name != "niche"}
+        columns["niche"] = [row["niche"] for row in rows]
+        return columns
+    
+    def _static_columns(self, batch: CandidateBatch) -> Dict[str, Any]:
+        """Time-independent components and niche for a batch."""
+        n = len(batch)
+        titles = batch.column("title", "").tolist()
+        descriptions = batch.column("description", "").tolist()
+        features = [text_features.extract(title or "", description or "") for title, description in zip(titles, descriptions)]
+        
+        curiosity = np.array([f.count("scoring.curiosity", title_only=True) for f in features], dtype=np.int64)
+        shares = np.array([f.count("scoring.shareability", title_only=True) for f in features], dtype=np.int64)
+        explainability = np.asarray(batch.column("explainability_seconds", 60), dtype=float)
+        simplicity_bins, simplicity_scores = self.SIMPLICITY_BINS
+        historical, narrative = self._pattern_arrays([title or "" for title in titles])
+        
+        # Niche: first configured niche with a keyword hit, else "general"
+        niche_names = list(self.niche_config.get("niches", {}))
+        rank = {name: i for i, name in enumerate(niche_names)}
+        general = len(niche_names)
+        niche_idx = [
+            min((rank.get(label, general) for label in f.matched_labels("scoring.niches")), default=general)
+            for f in features
+        ]
+        
+        return {
+            "emotional_charge": self._lookup(batch.column("emotional_vector", "neutral"), self.EMOTION_SCORES, 50),
+            "curiosity_gap": np.minimum(50 + curiosity * 15, 100),
+            "shareability": np.minimum(60 + shares * 10, 100),
+            "simplicity": np.array(simplicity_scores)[np.digitize(explainability, simplicity_bins, right=True)],
+            "historical_pattern": historical,
+            "narrative_fit": narrative,
+            "niche": [(niche_names + ["general"])[i] for i in niche_idx],
+        }
+    
+    def _pattern_arrays(self, titles: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Historical-pattern and narrative-fit scores from similarity to the winners index."""
+        n = len(titles)
+        historical = np.full(n, self.HISTORICAL_DEFAULT)
+        narrative = np.full(n, self.NARRATIVE_DEFAULT)
+        if not n or not self.winners_index.ready:
+            return historical, narrative
+        
+        embeddings = embedding_service.encode_batch(titles)
+        if len(embeddings) != n:
+            return historical, narrative
+        similarity = self.winners_index.query(np.stack(embeddings))
         
-        for candidate in candidates:
-            score_record = self.score_single(candidate)
-            if score_record["final_score"] > 0: # Filter out skipped ones
-                scored.append(score_record)
+        # Mostly the closest winner, with some credit for being near several
+        winner_similarity = 0.7 * similarity["winner_max"] + 0.3 * similarity["winner_mean"]
+        historical = np.where(np.isnan(winner_similarity), historical, self._similarity_score(winner_similarity))
+        narrative = np.where(np.isnan(similarity["lane_max"]), narrative, self._similarity_score(similarity["lane_max"]))
+        return historical, narrative
+    
+    def _similarity_score(self, similarity: np.ndarray) -> np.ndarray:
+        low, high = self.SIMILARITY_RANGE
+        return 40 + 60 * np.clip((np.nan_to_num(similarity) - low) / (high - low), 0, 1)
+    
+    @staticmethod
+    def _lookup(values: np.ndarray, table: Dict, default: Any) -> np.ndarray:
+        """Map values through a table, one dict lookup per distinct value."""
+        keys = values.tolist()
+        index = {}
+        codes = np.fromiter((index.setdefault(k, len(index)) for k in keys), dtype=np.int64, count=len(keys))
+        return np.array([table.get(k, default) for k in index])[codes]
+    
+    def _timeliness_array(self, timestamps: np.ndarray) -> np.ndarray:
+        """Timeliness for a column of ISO timestamps; each distinct string is parsed once."""
+        keys = timestamps.tolist()
+        index = {}
+        codes = np.fromiter((index.setdefault(k, len(index)) for k in keys), dtype=np.int64, count=len(keys))
         
-        scored.sort(key=lambda x: x["final_score"], reverse=True)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        ages = np.array([self._age_hours(k, now) for k in index], dtype=float)[codes]
         
+        bins, scores = self.TIMELINESS_BINS
+        return np.where(np.isnan(ages), 50, np.array(scores)[np.digitize(np.nan_to_num(ages), bins)])
+    
+    @staticmethod
+    def _age_hours(timestamp_str: Any, now: datetime.datetime) -> float:
+        """Age in hours, or NaN when missing or unparseable."""
+        try:
+            if timestamp_str:
+                timestamp = datetime.datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+                # Handle tz aware vs naive
+                if timestamp.tzinfo is None:
+                    timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+                return (now - timestamp).total_seconds() / 3600
+        except Exception:
+            pass
+        return float("nan")
+    
+    def _log_scores(self, final_scores: List[float]):
         logger.info(
             "Scoring complete",
-            count=len(scored),
-            top_score=scored[0]["final_score"] if scored else 0,
-            threshold_70_count=sum(1 for s in scored if s["final_score"] >= 70)
+            count=len(final_scores),
+            top_score=final_scores[0] if final_scores else 0,
+            threshold_70_count=sum(1 for s in final_scores if s >= 70)
         )
-        
-        return scored
     
     def score_single(self, candidate: Dict) -> Dict:
+        return dict(zip(self.SCORE_FIELDS, self._score_values(candidate)))
+    
+    def _score_values(self, candidate) -> Tuple:
+        """Score fields in SCORE_FIELDS order; works on dicts and CandidateBatch rows."""
+        # One title embedding serves both winners-index components
+        patterns = self._pattern_arrays([candidate.get("title") or ""])
         components = {
             "emotional_charge": self._score_emotional_charge(candidate),
             "curiosity_gap": self._score_curiosity_gap(candidate),
             "timeliness": self._score_timeliness(candidate),
             "shareability": self._score_shareability(candidate),
             "simplicity": self._score_simplicity(candidate),
-            "historical_pattern": self._score_historical_pattern(candidate),
-            "narrative_fit": self._score_narrative_fit(candidate),
+            "historical_pattern": self._score_historical_pattern(candidate, patterns),
+            "narrative_fit": self._score_narrative_fit(candidate, patterns),
         }
         
         base_vps = sum(
@@ -69,69 +303,43 @@ class VPSScorer:
         
         final_score = base_vps * niche_multiplier * saturation_factor
         
-        return {
-            "candidate_id": candidate.get("id"),
-            "title": candidate.get("title"),
-            "base_vps": round(base_vps, 2),
-            "components": {k: round(v, 2) for k, v in components.items()},
-            "niche": niche,
-            "niche_multiplier": niche_multiplier,
-            "saturation_factor": saturation_factor,
-            "competitor_count": candidate.get("competitor_count", 0),
-            "final_score": round(final_score, 2),
-        }
+        return (
+            candidate.get("id"),
+            candidate.get("title"),
+            round(base_vps, 2),
+            {k: round(v, 2) for k, v in components.items()},
+            niche,
+            niche_multiplier,
+            saturation_factor,
+            candidate.get("competitor_count", 0),
+            round(final_score, 2),
+        )
     
     def _score_emotional_charge(self, candidate: Dict) -> float:
         emotion = candidate.get("emotional_vector", "neutral")
-        emotion_scores = {
-            "surprise": 85,
-            "concern": 80,
-            "curiosity": 90,
-            "opportunity": 85, # Added as per ticket
-            "awe": 75,
-            "neutral": 40,
-        }
-        return emotion_scores.get(emotion, 50)
+        return self.EMOTION_SCORES.get(emotion, 50)
     
     def _score_curiosity_gap(self, candidate: Dict) -> float:
-        title = candidate.get("title", "").lower()
-        
-        curiosity_triggers = ["why", "how", "what", "secret", "hidden", "revealed", "truth", "myth", "lie", "wrong"]
-        trigger_count = sum(1 for trigger in curiosity_triggers if trigger in title)
+        trigger_count = text_features.extract_candidate(candidate).count("scoring.curiosity", title_only=True)
         
         return min(50 + (trigger_count * 15), 100)
     
     def _score_timeliness(self, candidate: Dict) -> float:
-        timestamp_str = candidate.get("timestamp", "")
-        
-        try:
-            if timestamp_str:
-                timestamp = datetime.datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                # Handle tz aware vs naive
-                now = datetime.datetime.now(datetime.timezone.utc)
-                if timestamp.tzinfo is None:
-                    timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
-                
-                age_hours = (now - timestamp).total_seconds() / 3600
-                
-                if age_hours < 6:
-                    return 95
-                elif age_hours < 24:
-                    return 80
-                elif age_hours < 48:
-                    return 60
-                else:
-                    return 40
-        except Exception:
-            pass
+        age_hours = self._age_hours(candidate.get("timestamp", ""), datetime.datetime.now(datetime.timezone.utc))
+        if np.isnan(age_hours):
+            return 50
         
-        return 50
+        if age_hours < 6:
+            return 95
+        elif age_hours < 24:
+            return 80
+        elif age_hours < 48:
+            return 60
+        else:
+            return 40
     
     def _score_shareability(self, candidate: Dict) -> float:
-        title = candidate.get("title", "")
-        
-        shareable_elements = ["data", "study", "research", "reveals", "shows", "proves", "chart", "map"]
-        element_count = sum(1 for elem in shareable_elements if elem in title.lower())
+        element_count = text_features.extract_candidate(candidate).count("scoring.shareability", title_only=True)
         
         base_score = 60
         bonus = element_count * 10
@@ -150,25 +358,21 @@ class VPSScorer:
         else:
             return 40
     
-    def _score_historical_pattern(self, candidate: Dict) -> float:
-        # Ideal: Embedding similarity with past winners
-        # Implementation: Check if embedding service is ready, if so, use it.
-        # Otherwise return heuristic.
-        # Assuming we don't have past winners loaded in memory for this task context
-        # but in a real run, they would be in RCI.
-        return 70
+    def _score_historical_pattern(self, candidate: Dict, patterns: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> float:
+        # Similarity to past winners' titles/hooks (WinnersIndex)
+        patterns = patterns or self._pattern_arrays([candidate.get("title") or ""])
+        return patterns[0].tolist()[0]
     
-    def _score_narrative_fit(self, candidate: Dict) -> float:
-        # Check alignment with narrative lanes
-        # This will be handled more in Decision layer, but here we score general fit
-        return 65
+    def _score_narrative_fit(self, candidate: Dict, patterns: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> float:
+        # General fit with the narrative lanes; per-channel lane choice happens in the Decision layer
+        patterns = patterns or self._pattern_arrays([candidate.get("title") or ""])
+        return patterns[1].tolist()[0]
     
     def _detect_niche(self, candidate: Dict) -> str:
-        combined = f"{candidate.get('title', '')} {candidate.get('description', '')}".lower()
+        features = text_features.extract_candidate(candidate)
         
-        for niche_name, niche_data in self.niche_config.get("niches", {}).items():
-            keywords = niche_data.get("keywords", [])
-            if any(kw in combined for kw in keywords):
+        for niche_name in self.niche_config.get("niches", {}):
+            if features.any("scoring.niches", niche_name):
                 return niche_name
         
         return "general"
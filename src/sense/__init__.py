@@ -1,4 +1,5 @@
 from .aggregator import TrendAggregator
 from .deduplicator import SemanticDeduplicator
+from .sources import TrendSource, register_source, SOURCE_REGISTRY
 
-__all__ = ["TrendAggregator", "SemanticDeduplicator"]
+__all__ = ["TrendAggregator", "SemanticDeduplicator", "TrendSource", "register_source", "SOURCE_REGISTRY"]
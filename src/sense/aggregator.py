@@ -1,29 +1,35 @@
-import requests
-import feedparser
-import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterator, List
 
 from ..shared import (
     get_logger,
-    retry_with_backoff,
     handle_errors,
     cache_manager,
-    SenseLayerError,
 )
+from .fetch_engine import FetchEngine
+from .poll_scheduler import PollScheduler, SourceHealthTracker
+from .trend_archive import TrendArchive
+from .sources import SOURCE_REGISTRY, TrendSource
+from .seen_store import SeenIdStore
 
 logger = get_logger(__name__)
 
 class TrendAggregator:
     def __init__(self):
-        self.sources = {
-            "finance_rss": self._fetch_finance_rss,
-            "reddit_finance": self._fetch_reddit_finance,
-        }
+        self.sources = {name: source_cls() for name, source_cls in SOURCE_REGISTRY.items()}
+        self.seen_store = SeenIdStore()
+        self.source_stats: Dict[str, Dict] = {}
         self.evergreen_topics = self._load_evergreen()
-        self.archive_path = Path("/home/engine/project/data/sense_archive.json")
+        self.archive = TrendArchive()
+        self.fetch_engine = FetchEngine()
+        self.last_trend_count = 0
+        
+        polling_config = self._load_polling_config()
+        self.health_tracker = SourceHealthTracker(alpha=polling_config.get("ewma_alpha", 0.3))
+        self.poll_scheduler = PollScheduler(self.health_tracker, polling_config)
         
         logger.info("TrendAggregator initialized", sources=list(self.sources.keys()))
     
@@ -41,179 +47,153 @@ class TrendAggregator:
             {"title": "ETF vs Individual Stocks", "source": "evergreen", "description": "Diversification strategies"}
         ]
     
-    @retry_with_backoff(max_retries=3, base_delay=1.0)
+    def _load_polling_config(self, config_path: str = "config/github_actions_limits.json") -> Dict:
+        path = Path(config_path)
+        if path.exists():
+            with open(path) as f:
+                return json.load(f).get("sense_fetch", {}).get("adaptive_polling", {})
+        return {}
+    
     @handle_errors(fallback_value=[])
-    def _fetch_finance_rss(self) -> List[Dict]:
-        # Live sources
-        cached = cache_manager.get("sense", "finance_rss", max_age_hours=24)
-        if cached:
-            logger.info("Using cached Finance RSS data")
-            return cached
+    def _poll_source(self, source: TrendSource, mode: str = "daily") -> List[Dict]:
+        due, reason = self.poll_scheduler.should_poll(source, mode)
+        if not due:
+            logger.info("Skipping source poll", source=source.name, mode=mode, reason=reason)
+            self.source_stats[source.name] = {"polled": False, "reason": reason, "fetched": 0, "new": 0}
+            return []
         
-        trends = []
-        rss_feeds = [
-            "https://finance.yahoo.com/news/rssindex",
-            "https://search.cnbc.com/rs/search/combinedcms/view.xml?partnerId=wrss01&id=10000664", # CNBC Finance
-            "http://feeds.marketwatch.com/marketwatch/topstories",
-            "https://www.investing.com/rss/news_25.rss", # Economic indicators
-        ]
+        start = time.time()
+        try:
+            fetched = source.fetch(self.fetch_engine)
+        except Exception:
+            self.health_tracker.record(source.name, 0, time.time() - start, error=True)
+            raise
+        latency = time.time() - start
         
-        for feed_url in rss_feeds:
-            try:
-                feed = feedparser.parse(feed_url)
-                
-                for entry in feed.entries[:15]:
-                    trends.append({
-                        "title": entry.get("title", ""),
-                        "source": "finance_rss",
-                        "source_url": entry.get("link", ""),
-                        "description": entry.get("summary", "")[:300],
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "origin_count": 1,
-                    })
-            except Exception as e:
-                logger.warning(f"RSS fetch error for {feed_url}", error=str(e))
+        if not fetched:
+            # Nothing came back (likely fetch errors); count it against the source's health and back off
+            self.health_tracker.record(source.name, 0, latency, error=True)
+            self.source_stats[source.name] = {"polled": True, "reason": reason, "fetched": 0, "new": 0}
+            return []
         
-        if trends:
-            cache_manager.set("sense", "finance_rss", trends, ttl_hours=24)
-            logger.info("Finance RSS trends fetched", count=len(trends))
-        return trends
+        # Only entries this source has never emitted before go downstream; they are
+        # persisted as seen by commit_seen() once the run has handled them
+        new_items = self.seen_store.filter_new(source.name, fetched)
+        self.health_tracker.record(
+            source.name, len(new_items), latency, error=False,
+            min_gap_hours=source.poll_interval_hours,
+        )
+        self.source_stats[source.name] = {"polled": True, "reason": reason, "fetched": len(fetched), "new": len(new_items)}
+        return new_items
     
-    @retry_with_backoff(max_retries=3, base_delay=1.0)
-    @handle_errors(fallback_value=[])
-    def _fetch_reddit_finance(self) -> List[Dict]:
-        cached = cache_manager.get("sense", "reddit_finance", max_age_hours=24)
-        if cached:
-            logger.info("Using cached Reddit Finance data")
-            return cached
-        
-        trends = []
-        subreddits = ["stocks", "investing", "cryptocurrency", "finance", "wallstreetbets", "financialindependence"]
-        
-        for subreddit in subreddits:
-            try:
-                url = f"https://www.reddit.com/r/{subreddit}/hot.json"
-                headers = {"User-Agent": "ViralosPrime/2.0"}
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    posts = data.get("data", {}).get("children", [])
-                    
-                    for post in posts[:10]:
-                        post_data = post.get("data", {})
-                        if post_data.get("stickied"): continue
-                        
-                        trends.append({
-                            "title": post_data.get("title", ""),
-                            "source": "reddit",
-                            "source_url": f"https://reddit.com{post_data.get('permalink', '')}",
-                            "description": post_data.get("selftext", "")[:300],
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "origin_count": 1,
-                            "score": post_data.get("score", 0),
-                        })
-                
-                time.sleep(1.0) # Respect rate limits
-            except Exception as e:
-                logger.warning(f"Reddit fetch error for r/{subreddit}", error=str(e))
+    def _iter_polled(self, mode: str) -> Iterator[List[Dict]]:
+        """Yield each source's new items in registry order; sources are polled concurrently."""
+        # Each source fans out its own requests through the fetch engine
+        with ThreadPoolExecutor(max_workers=max(1, len(self.sources))) as executor:
+            futures = {name: executor.submit(self._poll_source, source, mode) for name, source in self.sources.items()}
+            
+            for source_name, future in futures.items():
+                try:
+                    source_trends = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to aggregate from {source_name}", error=str(e))
+                    continue
+                if source_trends:
+                    logger.info(f"Aggregated from {source_name}", count=len(source_trends))
+                    yield source_trends
+    
+    def _poll_all(self, mode: str) -> List[Dict]:
+        return [trend for batch in self._iter_polled(mode) for trend in batch]
+    
+    def refresh(self, mode: str = "recovery") -> int:
+        """Poll sources that are likely to have changed and hold new items for the next daily run."""
+        trends = self._poll_all(mode)
+        if not trends:
+            return 0
         
-        if trends:
-            cache_manager.set("sense", "reddit_finance", trends, ttl_hours=24)
-            logger.info("Reddit Finance trends fetched", count=len(trends))
-        return trends
+        pending = cache_manager.get("sense", "pending_trends", max_age_hours=24) or []
+        pending.extend(trends)
+        cache_manager.set("sense", "pending_trends", pending, ttl_hours=24)
+        # The items are held for the next daily run now, so they can be marked as seen
+        self.commit_seen()
         
-    def _get_archived_trends(self) -> List[Dict]:
-        """Retrieve trends from the 7-day archive"""
         try:
-            if not self.archive_path.exists():
-                return []
-                
-            with open(self.archive_path, 'r') as f:
-                archive = json.load(f)
-            
-            # Filter for last 7 days
-            cutoff = (datetime.utcnow() - timedelta(days=7)).isoformat()
-            valid_items = [item for item in archive if item.get('timestamp') > cutoff]
-            
-            logger.info(f"Retrieved {len(valid_items)} trends from archive")
-            return valid_items
-        except Exception as e:
-            logger.error("Failed to read archive", error=str(e))
-            return []
-
-    def _update_archive(self, trends: List[Dict]):
-        """Update the 7-day archive with new trends"""
-        try:
-            existing = []
-            if self.archive_path.exists():
-                with open(self.archive_path, 'r') as f:
-                    existing = json.load(f)
-            
-            # Combine and dedup by title
-            seen_titles = {item['title'] for item in existing}
-            for trend in trends:
-                if trend['title'] not in seen_titles:
-                    existing.append(trend)
-                    seen_titles.add(trend['title'])
-            
-            # Prune old
-            cutoff = (datetime.utcnow() - timedelta(days=7)).isoformat()
-            existing = [item for item in existing if item.get('timestamp') > cutoff]
-            
-            # Ensure directory exists
-            self.archive_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.archive_path, 'w') as f:
-                json.dump(existing, f)
+            self.archive.append(trends)
         except Exception as e:
             logger.error("Failed to update archive", error=str(e))
-
-    def aggregate_all(self) -> List[Dict]:
-        all_trends = []
         
-        # 1. Try Live Sources
-        for source_name, fetch_func in self.sources.items():
-            try:
-                trends = fetch_func()
-                if trends:
-                    all_trends.extend(trends)
-                    logger.info(f"Aggregated from {source_name}", count=len(trends))
-            except Exception as e:
-                logger.error(f"Failed to aggregate from {source_name}", error=str(e))
+        logger.info("Sense refresh complete", mode=mode, new=len(trends), pending=len(pending))
+        return len(trends)
+    
+    def commit_seen(self):
+        """Persist the entry ids emitted so far; call once the run that consumed them succeeded."""
+        self.seen_store.commit()
+    
+    def get_source_health(self) -> Dict:
+        return {name: self.health_tracker.get(name) for name in self.sources}
+    
+    def get_fetch_stats(self) -> Dict:
+        """Per-feed conditional-request stats for the current run (304 ratios, bytes saved)."""
+        return {
+            **self.fetch_engine.feed_state.summary(),
+            "sources": dict(self.source_stats),
+            "source_health": self.get_source_health(),
+        }
+    
+    def aggregate_all(self, mode: str = "daily") -> List[Dict]:
+        return list(self.iter_trends(mode))
+    
+    def iter_trends(self, mode: str = "daily") -> Iterator[Dict]:
+        """Stream trends batch by batch: recovery-refresh leftovers, live sources, then fallbacks.
         
-        # 2. Fallback to 48h Cache (handled inside fetch functions essentially, but we can check if all_trends is empty)
-        # The fetch functions check cache first. If they return empty/fail, we move to step 3.
+        Only small per-source batches are held at a time; the archive and evergreen
+        fallbacks only need the running count.
+        """
+        run_ts = int(time.time())
+        count = 0
+        titles = set()
         
-        # 3. Fallback to 7-day Archive
-        if len(all_trends) < 10:
-            logger.warning("Low live trend count, checking archive", current=len(all_trends))
-            archived = self._get_archived_trends()
-            # Randomly sample or take latest from archive to fill up
-            needed = 20 - len(all_trends)
-            if needed > 0 and archived:
-                # Simple strategy: take most recent not already present
-                current_titles = {t['title'] for t in all_trends}
-                added_count = 0
-                for item in sorted(archived, key=lambda x: x['timestamp'], reverse=True):
-                    if item['title'] not in current_titles:
-                        all_trends.append(item)
-                        added_count += 1
-                        if added_count >= needed:
-                            break
+        def emit(batch: List[Dict], archive: bool = True) -> Iterator[Dict]:
+            nonlocal count
+            if archive:
+                # Update archive with whatever we found (if it's fresh)
+                try:
+                    self.archive.append([t for t in batch if t.get("source") != "evergreen"])
+                except Exception as e:
+                    logger.error("Failed to update archive", error=str(e))
+            for trend in batch:
+                if "id" not in trend:
+                    trend["id"] = f"trend_{run_ts}_{count}"
+                if count < 10:
+                    # Titles are only needed to exclude duplicates from the archive fallback
+                    titles.add(trend.get("title"))
+                count += 1
+                yield trend
         
-        # 4. Fallback to Evergreen
-        if len(all_trends) < 5:
-            logger.warning("Critical low trend count, adding evergreen", current=len(all_trends))
-            all_trends.extend(self.evergreen_topics)
-            
-        # Update archive with whatever we found (if it's fresh)
-        self._update_archive(all_trends)
+        # 1. Items picked up by recovery refreshes since the last run, then live sources
+        pending = cache_manager.get("sense", "pending_trends", max_age_hours=24) or []
+        if pending:
+            cache_manager.delete("sense", "pending_trends")
+            logger.info("Using trends from recovery refreshes", count=len(pending))
+            yield from emit(pending)
+        del pending
+        
+        for batch in self._iter_polled(mode):
+            yield from emit(batch)
+        
+        # 2. Fallback to 7-day Archive
+        self.archive.prune()
+        if count < 10:
+            logger.warning("Low live trend count, checking archive", current=count)
+            # Take the most recent archived trends not already present
+            archived = self.archive.recent(20 - count, exclude_titles=titles)
+            logger.info(f"Retrieved {len(archived)} trends from archive")
+            yield from emit(archived, archive=False)
         
-        # Add IDs
-        for i, trend in enumerate(all_trends):
-            if "id" not in trend:
-                trend["id"] = f"trend_{int(time.time())}_{i}"
+        # 3. Fallback to Evergreen
+        if count < 5:
+            logger.warning("Critical low trend count, adding evergreen", current=count)
+            yield from emit([dict(t) for t in self.evergreen_topics], archive=False)
         
-        logger.info("Total trends aggregated", count=len(all_trends))
-        return all_trends
+        self.last_trend_count = count
+        logger.info("Total trends aggregated", count=count)
@@ -1,49 +1,174 @@
-from typing import List, Dict
-from ..shared import get_logger, embedding_service
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from ..shared import get_logger, embedding_service, IncrementalClusterer, CandidateBatch
+from ..memory.vector_memory import VectorMemory
+from .prefilter import TrendPrefilter, normalize_title
 
 logger = get_logger(__name__)
 
 class SemanticDeduplicator:
-    def __init__(self, similarity_threshold: float = 0.75):
+    def __init__(self, similarity_threshold: float = 0.75, memory: Optional[VectorMemory] = None, batch_size: int = 64):
         self.similarity_threshold = similarity_threshold
-        logger.info("SemanticDeduplicator initialized", threshold=similarity_threshold)
+        self.batch_size = batch_size
+        self.memory = memory if memory is not None else VectorMemory()
+        self.prefilter = TrendPrefilter()
+        # Scored records drop the description, so produced topics are looked up by title
+        self._representative_texts: Dict[str, str] = {}
+        logger.info("SemanticDeduplicator initialized", threshold=similarity_threshold, memory_entries=len(self.memory))
+    
+    @staticmethod
+    def _text(trend: Dict) -> str:
+        return f"{trend.get('title', '')} {trend.get('description', '')}"
+    
+    def _embed(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Embed texts, reusing vectors already held in memory for identical text."""
+        ids = [VectorMemory.text_id(text) for text in texts]
+        known = self.memory.get_vectors(ids)
+        
+        missing = [i for i, entry_id in enumerate(ids) if entry_id not in known]
+        encoded = embedding_service.encode_batch([texts[i] for i in missing]) if missing else []
+        
+        embeddings = [known.get(entry_id) for entry_id in ids]
+        for i, emb in zip(missing, encoded):
+            embeddings[i] = emb
+        
+        logger.info("Embeddings resolved", total=len(texts), reused=len(texts) - len(missing), encoded=len(encoded))
+        return embeddings
     
     def deduplicate(self, trends: List[Dict]) -> List[Dict]:
         if not trends:
             return []
+        return self.deduplicate_stream(trends)
+    
+    def _micro_batches(self, items: Iterable[Dict]) -> Iterator[List[Dict]]:
+        iterator = iter(items)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    def deduplicate_stream(self, trends: Iterable[Dict]) -> List[Dict]:
+        """Prefilter, embed and cluster trends in micro-batches.
+        
+        Only the current batch's texts and embeddings are held; across batches we keep
+        the cluster seed matrix plus references to member items, so peak memory grows
+        with the number of clusters rather than every text and vector at once.
+        """
+        input_count = 0
+        
+        def counted(items: Iterable[Dict]) -> Iterator[Dict]:
+            nonlocal input_count
+            for item in items:
+                input_count += 1
+                yield item
+        
+        clusterer = IncrementalClusterer(self.similarity_threshold)
+        members: List[List[Dict]] = []
+        seed_texts: List[str] = []
+        prefiltered = 0
+        
+        # Exact duplicates and junk never reach the embedding model
+        for batch in self._micro_batches(self.prefilter.iter_filter(counted(trends))):
+            prefiltered += len(batch)
+            texts = [self._text(t) for t in batch]
+            embeddings = self._embed(texts)
+            
+            valid = [i for i, emb in enumerate(embeddings) if emb is not None]
+            for i, cluster_id in zip(valid, clusterer.assign_batch([embeddings[i] for i in valid])):
+                if cluster_id == len(members):
+                    members.append([])
+                    seed_texts.append(texts[i])
+                members[cluster_id].append(batch[i])
         
-        texts = [f"{t.get('title', '')} {t.get('description', '')}" for t in trends]
+        if not members:
+            return []
         
-        clusters = embedding_service.cluster_by_similarity(texts, self.similarity_threshold)
+        # Match cluster representatives against earlier days in one batched query each
+        seed_vectors = list(clusterer.seeds)
+        produced = self.memory.query_batch(seed_vectors, self.similarity_threshold, kinds=["produced"])
+        history = self.memory.query_batch(seed_vectors, self.similarity_threshold)
         
         deduplicated = []
-        for cluster in clusters:
-            representative_idx = cluster[0]
-            representative = trends[representative_idx].copy()
+        already_produced = 0
+        for cluster, text, produced_match, match in zip(members, seed_texts, produced, history):
+            if produced_match:
+                already_produced += 1
+                continue
+            
+            # The prefilter already handed us private copies, so annotate in place
+            representative = cluster[0]
             
-            representative["origin_count"] = len(cluster)
+            representative["origin_count"] = sum(t.get("origin_count", 1) for t in cluster)
             
             if len(cluster) > 1:
-                sources = list(set(trends[i].get("source", "") for i in cluster))
+                sources = list(set(s for t in cluster for s in t.get("sources", [t.get("source", "")])))
                 representative["consensus_sources"] = sources
                 representative["cluster_size"] = len(cluster)
             
+            if match:
+                representative["seen_before"] = {"similarity": match["similarity"], "age_days": match["age_days"]}
+            
             deduplicated.append(representative)
+            self._representative_texts[representative.get("title", "")] = text
+        
+        self.memory.add([VectorMemory.text_id(text) for text in seed_texts], seed_vectors, kind="seen")
+        self._save_memory()
         
         logger.info(
             "Deduplication complete",
-            input_count=len(trends),
+            input_count=input_count,
+            prefiltered_count=prefiltered,
             output_count=len(deduplicated),
-            reduction_pct=round((1 - len(deduplicated)/len(trends)) * 100, 1)
+            already_produced=already_produced,
+            reduction_pct=round((1 - len(deduplicated)/input_count) * 100, 1)
         )
         
         return deduplicated
     
+    def _topic_text(self, topic) -> str:
+        # Scored records drop the description, so fall back to the text the representative was embedded with
+        return self._representative_texts.get(topic.get("title", ""), self._text(topic))
+    
+    def drop_produced(self, batch: CandidateBatch, memory: VectorMemory) -> CandidateBatch:
+        """Drop candidates close to a topic already produced into the given (per-channel) memory."""
+        if not len(batch) or not len(memory):
+            return batch
+        
+        texts = [self._topic_text(row) for row in batch.rows()]
+        matches = memory.query_batch(self._embed(texts), self.similarity_threshold, kinds=["produced"])
+        keep = np.array([match is None for match in matches], dtype=bool)
+        
+        logger.info("Produced topics dropped", input_count=len(batch), dropped=int((~keep).sum()))
+        return batch.filter(keep)
+    
+    def remember_produced(self, topics: List[Dict], memory: Optional[VectorMemory] = None):
+        """Record topics that went into production so later runs drop close matches.
+        
+        Channels pass their own memory so one channel producing a topic doesn't
+        hide it from the others; without one the shared memory is used.
+        """
+        if not topics:
+            return
+        
+        memory = memory if memory is not None else self.memory
+        texts = [self._topic_text(t) for t in topics]
+        memory.add([VectorMemory.text_id(text) for text in texts], self._embed(texts), kind="produced")
+        self._save_memory(memory)
+        logger.info("Produced topics remembered", count=len(topics))
+    
+    def _save_memory(self, memory: Optional[VectorMemory] = None):
+        try:
+            (memory if memory is not None else self.memory).save()
+        except Exception as e:
+            logger.error("Failed to save vector memory", error=str(e))
+    
     def merge_origins(self, trends: List[Dict]) -> List[Dict]:
         title_map = {}
         
         for trend in trends:
-            title = trend.get("title", "").lower().strip()
+            title = normalize_title(trend.get("title", ""))
             if title:
                 if title not in title_map:
                     title_map[title] = trend.copy()
@@ -0,0 +1,116 @@
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+class FeedStateStore:
+    """Persists HTTP validators, last parsed entries and GUID high-water marks per feed URL."""
+
+    def __init__(self, path: str = "data/cache/feed_state.json"):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.state = self._load()
+        self.run_stats: Dict[str, Dict] = {}
+
+    def _load(self) -> Dict:
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning("Feed state unreadable, starting fresh", error=str(e))
+        return {}
+
+    def save(self):
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump(self.state, f)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        entry = self.state.get(url, {})
+        headers = {}
+        # Validators are only useful if we still have the entries they vouch for
+        if entry.get("entries") is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record_not_modified(self, url: str) -> Optional[List[Dict]]:
+        """Previous entries for a 304, counted as reused; None (and nothing recorded) if there are none."""
+        with self.lock:
+            entry = self.state.get(url, {})
+            entries = entry.get("entries")
+            if entries is None:
+                return None
+            self._bump(url, not_modified=True, bytes_received=0, bytes_saved=entry.get("body_bytes", 0), new_entries=0)
+            return entries
+
+    def record_response(self, url: str, headers: Dict, body_bytes: int, entries: List[Dict]):
+        with self.lock:
+            entry = self.state.setdefault(url, {})
+            new_entries = self._count_new(entry.get("guid_high_water"), entries)
+
+            entry["etag"] = headers.get("ETag") or headers.get("etag")
+            entry["last_modified"] = headers.get("Last-Modified") or headers.get("last-modified")
+            entry["body_bytes"] = body_bytes
+            entry["entries"] = entries
+            entry["fetched_at"] = datetime.utcnow().isoformat()
+            if entries and isinstance(entries[0], dict) and entries[0].get("guid"):
+                entry["guid_high_water"] = entries[0]["guid"]
+
+            self._bump(url, not_modified=False, bytes_received=body_bytes, bytes_saved=0, new_entries=new_entries)
+
+    def _count_new(self, high_water: Optional[str], entries: List[Dict]) -> int:
+        # Feeds list newest first, so everything ahead of the previous newest GUID is new
+        if not isinstance(entries, list):
+            return 0
+        if not high_water:
+            return len(entries)
+        for i, item in enumerate(entries):
+            if isinstance(item, dict) and item.get("guid") == high_water:
+                return i
+        return len(entries)
+
+    def _bump(self, url: str, not_modified: bool, bytes_received: int, bytes_saved: int, new_entries: int):
+        totals = self.state.setdefault(url, {}).setdefault("totals", {"requests": 0, "not_modified": 0, "bytes_saved": 0})
+        totals["requests"] += 1
+        totals["not_modified"] += int(not_modified)
+        totals["bytes_saved"] += bytes_saved
+
+        run = self.run_stats.setdefault(url, {
+            "requests": 0,
+            "not_modified": 0,
+            "bytes_received": 0,
+            "bytes_saved": 0,
+            "new_entries": 0,
+        })
+        run["requests"] += 1
+        run["not_modified"] += int(not_modified)
+        run["bytes_received"] += bytes_received
+        run["bytes_saved"] += bytes_saved
+        run["new_entries"] += new_entries
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            feeds = {}
+            for url, run in self.run_stats.items():
+                totals = self.state.get(url, {}).get("totals", {})
+                feeds[url] = {
+                    **run,
+                    "not_modified_ratio": round(run["not_modified"] / run["requests"], 2) if run["requests"] else 0.0,
+                    "lifetime_not_modified_ratio": round(totals.get("not_modified", 0) / totals["requests"], 2) if totals.get("requests") else 0.0,
+                }
+            return {
+                "feeds": feeds,
+                "bytes_received": sum(f["bytes_received"] for f in feeds.values()),
+                "bytes_saved": sum(f["bytes_saved"] for f in feeds.values()),
+            }
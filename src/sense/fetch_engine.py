@@ -0,0 +1,170 @@
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from ..shared import get_logger, http_client
+from .feed_state import FeedStateStore
+
+logger = get_logger(__name__)
+
+class HostPoliteness:
+    """Caps concurrent requests and spaces request starts for a single host."""
+
+    def __init__(self, max_concurrent: int = 2, min_interval_seconds: float = 0.0):
+        self.semaphore = threading.Semaphore(max(1, max_concurrent))
+        self.min_interval_seconds = min_interval_seconds
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        if self.min_interval_seconds > 0:
+            with self.lock:
+                now = time.time()
+                start_at = max(now, self.next_start)
+                self.next_start = start_at + self.min_interval_seconds
+            if start_at > now:
+                time.sleep(start_at - now)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.semaphore.release()
+        return False
+
+class FetchJob:
+    def __init__(
+        self,
+        key: str,
+        url: str,
+        parse: Callable[[Any], Any],
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        conditional: bool = True,
+    ):
+        self.key = key
+        self.url = url
+        self.parse = parse
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.conditional = conditional
+
+    @property
+    def host(self) -> str:
+        return urlparse(self.url).netloc
+
+class FetchEngine:
+    """Bounded thread-pool fetcher for the sense layer.
+
+    Results are returned for every job that finished inside the stage deadline;
+    slow or failing jobs are logged and left out instead of holding up the stage.
+    """
+
+    def __init__(
+        self,
+        config_path: str = "config/github_actions_limits.json",
+        feed_state: Optional[FeedStateStore] = None,
+    ):
+        config = self._load_config(config_path)
+        parallelism = config.get("parallelism", {})
+        fetch_config = config.get("sense_fetch", {})
+
+        enabled = parallelism.get("enabled", True)
+        self.max_workers = parallelism.get("sense_sources_parallel", 8) if enabled else 1
+        self.request_timeout = fetch_config.get("request_timeout_seconds", 10)
+        self.stage_timeout = fetch_config.get("stage_timeout_seconds", 60)
+        self.default_host_limit = fetch_config.get("default_host_limit", {"max_concurrent": 2, "min_interval_seconds": 0.0})
+        self.host_limits = fetch_config.get("host_limits", {})
+
+        self._hosts: Dict[str, HostPoliteness] = {}
+        self._hosts_lock = threading.Lock()
+        self.last_run_stats: Dict = {}
+        self.feed_state = feed_state or FeedStateStore()
+
+        logger.info("FetchEngine initialized", max_workers=self.max_workers, request_timeout=self.request_timeout)
+
+    def _load_config(self, config_path: str) -> Dict:
+        path = Path(config_path)
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return {}
+
+    def _politeness_for(self, host: str) -> HostPoliteness:
+        with self._hosts_lock:
+            if host not in self._hosts:
+                limits = self.host_limits.get(host, self.default_host_limit)
+                self._hosts[host] = HostPoliteness(
+                    max_concurrent=limits.get("max_concurrent", 2),
+                    min_interval_seconds=limits.get("min_interval_seconds", 0.0),
+                )
+            return self._hosts[host]
+
+    def _run_job(self, job: FetchJob) -> Any:
+        headers = dict(job.headers)
+        if job.conditional:
+            headers.update(self.feed_state.conditional_headers(job.url))
+        
+        with self._politeness_for(job.host):
+            response = http_client.get(job.url, headers=headers, timeout=job.timeout or self.request_timeout)
+        
+        if response.status_code == 304 and job.conditional:
+            previous = self.feed_state.record_not_modified(job.url)
+            if previous is not None:
+                return previous
+            # No entries to reuse, so the 304 isn't counted; fall back to an unconditional fetch
+            with self._politeness_for(job.host):
+                response = http_client.get(job.url, headers=job.headers, timeout=job.timeout or self.request_timeout)
+        
+        response.raise_for_status()
+        parsed = job.parse(response)
+        if job.conditional:
+            self.feed_state.record_response(job.url, response.headers, len(response.content), parsed)
+        return parsed
+
+    def fetch_all(self, jobs: List[FetchJob], max_workers: Optional[int] = None) -> Dict[str, Any]:
+        if not jobs:
+            return {}
+
+        start = time.time()
+        results = {}
+        failed = []
+
+        workers = min(self.max_workers, max_workers or self.max_workers, len(jobs))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {executor.submit(self._run_job, job): job for job in jobs}
+
+        try:
+            done, not_done = wait(futures, timeout=self.stage_timeout)
+
+            for future in done:
+                job = futures[future]
+                try:
+                    results[job.key] = future.result()
+                except Exception as e:
+                    failed.append(job.key)
+                    logger.warning("Fetch failed", key=job.key, url=job.url, error=str(e))
+
+            for future in not_done:
+                job = futures[future]
+                future.cancel()
+                logger.warning("Fetch exceeded stage deadline", key=job.key, url=job.url)
+        finally:
+            # Stragglers finish on their own request timeout; the stage doesn't wait for them
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if any(job.conditional for job in jobs):
+            self.feed_state.save()
+        
+        self.last_run_stats = {
+            "jobs": len(jobs),
+            "succeeded": len(results),
+            "failed": len(failed),
+            "timed_out": len(not_done),
+            "elapsed_seconds": round(time.time() - start, 2),
+        }
+        logger.info("Fetch batch complete", **self.last_run_stats)
+        return results
@@ -0,0 +1,105 @@
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+class SourceHealthTracker:
+    """Exponentially weighted change rate, latency and error rate per source."""
+
+    def __init__(self, path: str = "data/cache/source_health.json", alpha: float = 0.3):
+        self.path = Path(path)
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        self.state = self._load()
+
+    def _load(self) -> Dict:
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning("Source health unreadable, starting fresh", error=str(e))
+        return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+
+    def _ewma(self, previous: Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return self.alpha * value + (1 - self.alpha) * previous
+
+    def get(self, source: str) -> Dict:
+        with self.lock:
+            return dict(self.state.get(source, {}))
+
+    def record(self, source: str, new_items: int, latency_seconds: float, error: bool, min_gap_hours: float = 1.0):
+        with self.lock:
+            now = time.time()
+            entry = self.state.setdefault(source, {"polls": 0, "consecutive_errors": 0})
+
+            # New items per hour since the previous poll; the gap is floored so back-to-back polls don't spike the rate
+            last_polled = entry.get("last_polled")
+            gap_hours = max((now - last_polled) / 3600, min_gap_hours) if last_polled else min_gap_hours
+
+            entry["ewma_latency_seconds"] = round(self._ewma(entry.get("ewma_latency_seconds"), latency_seconds), 3)
+            entry["ewma_error_rate"] = round(self._ewma(entry.get("ewma_error_rate"), 1.0 if error else 0.0), 3)
+            entry["polls"] += 1
+
+            if error:
+                entry["consecutive_errors"] += 1
+            else:
+                entry["consecutive_errors"] = 0
+                entry["ewma_new_items"] = round(self._ewma(entry.get("ewma_new_items"), new_items), 3)
+                entry["ewma_new_per_hour"] = round(self._ewma(entry.get("ewma_new_per_hour"), new_items / gap_hours), 4)
+                entry["last_polled"] = now
+
+            entry["last_attempt"] = now
+            self._save()
+
+class PollScheduler:
+    """Decides whether a source is worth polling in a given run mode."""
+
+    def __init__(self, tracker: SourceHealthTracker, config: Optional[Dict] = None):
+        config = config or {}
+        self.tracker = tracker
+        self.min_expected_new = {
+            "daily": config.get("daily_min_expected_new", 1.0),
+            "recovery": config.get("recovery_min_expected_new", 3.0),
+        }
+        self.max_staleness_hours = config.get("max_staleness_hours", 24)
+        self.max_error_backoff_hours = config.get("max_error_backoff_hours", 24)
+
+    def should_poll(self, source, mode: str = "daily") -> Tuple[bool, str]:
+        health = self.tracker.get(source.name)
+        now = time.time()
+
+        last_attempt = health.get("last_attempt")
+        errors = health.get("consecutive_errors", 0)
+        if errors and last_attempt:
+            backoff_hours = min(source.poll_interval_hours * (2 ** (errors - 1)), self.max_error_backoff_hours)
+            if (now - last_attempt) / 3600 < backoff_hours:
+                return False, "error_backoff"
+
+        last_polled = health.get("last_polled")
+        if last_polled is None or health.get("ewma_new_per_hour") is None:
+            return True, "no_history"
+
+        hours_since = (now - last_polled) / 3600
+        if hours_since < source.poll_interval_hours:
+            return False, "poll_interval"
+        if hours_since >= self.max_staleness_hours:
+            return True, "stale"
+
+        expected_new = health["ewma_new_per_hour"] * hours_since
+        threshold = self.min_expected_new.get(mode, self.min_expected_new["daily"])
+        if expected_new >= threshold:
+            return True, "expected_new"
+        return False, "low_change_rate"
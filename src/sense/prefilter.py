@@ -0,0 +1,151 @@
+import re
+import hashlib
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+
+ENGLISH_STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was",
+    "were", "it", "this", "that", "with", "as", "at", "by", "from", "be", "has", "have",
+    "will", "not", "but", "you", "your", "how", "why", "what", "after", "over", "its",
+}
+
+def normalize_title(title: str) -> str:
+    """Unicode-normalized, casefolded title with punctuation stripped and whitespace collapsed."""
+    title = unicodedata.normalize("NFKC", title or "").casefold()
+    title = _PUNCTUATION.sub(" ", title)
+    return _WHITESPACE.sub(" ", title).strip()
+
+class TrendPrefilter:
+    """Cheap checks that run before anything is embedded.
+
+    Exact and near-exact duplicate titles are merged (summing origin_count), and
+    scraped items that fail length, charset or language heuristics are dropped.
+    Evergreen and source-less items skip the heuristics. The minimum title
+    length is per source: editorial feeds write short headlines ("Fed holds
+    rates"), while short Reddit titles are mostly memes.
+    """
+
+    def __init__(
+        self,
+        min_title_words: int = 2,
+        source_min_title_words: Optional[Dict[str, int]] = None,
+        max_title_chars: int = 300,
+        short_title_words: int = 6,
+        min_latin_ratio: float = 0.8,
+        min_alnum_ratio: float = 0.6,
+        min_stopword_ratio: float = 0.05,
+        min_language_words: int = 12,
+        trusted_sources: Optional[Set[str]] = None,
+    ):
+        self.min_title_words = min_title_words
+        self.source_min_title_words = source_min_title_words if source_min_title_words is not None else {"reddit": 4}
+        self.max_title_chars = max_title_chars
+        self.short_title_words = short_title_words
+        self.min_latin_ratio = min_latin_ratio
+        self.min_alnum_ratio = min_alnum_ratio
+        self.min_stopword_ratio = min_stopword_ratio
+        self.min_language_words = min_language_words
+        self.trusted_sources = trusted_sources or {"evergreen"}
+        self.last_report: Dict[str, int] = {}
+
+    def _near_key(self, normalized: str) -> Optional[str]:
+        # Word order and filler words don't make a different story
+        tokens = sorted(set(normalized.split()) - ENGLISH_STOPWORDS)
+        if not tokens:
+            # Nothing left to compare on; every such title would collide, so leave it to the embedding stage
+            return None
+        return hashlib.sha1(" ".join(tokens).encode("utf-8")).hexdigest()
+
+    def _rejection(self, item: Dict, normalized: str) -> Optional[str]:
+        if not item.get("source") or item.get("source") in self.trusted_sources:
+            return None
+
+        title = item.get("title", "")
+        words = normalized.split()
+        if len(words) < self.source_min_title_words.get(item.get("source"), self.min_title_words):
+            return "too_short"
+        if len(title) > self.max_title_chars:
+            return "too_long"
+
+        visible = [c for c in title if not c.isspace()]
+        if visible and sum(c.isalnum() for c in visible) / len(visible) < self.min_alnum_ratio:
+            return "charset"
+        letters = [c for c in title if c.isalpha()]
+        if letters and sum(c.isascii() for c in letters) / len(letters) < self.min_latin_ratio:
+            return "charset"
+
+        description = item.get("description", "") or ""
+        if not description.strip() and len(words) < self.short_title_words:
+            return "empty_description"
+
+        # Headlines often have no function words at all, so only judge language on prose
+        description_words = normalize_title(description).split()
+        if len(description_words) >= self.min_language_words:
+            stopwords = sum(1 for w in description_words if w in ENGLISH_STOPWORDS)
+            if stopwords / len(description_words) < self.min_stopword_ratio:
+                return "language"
+        return None
+
+    def filter(self, trends: List[Dict]) -> List[Dict]:
+        return list(self.iter_filter(trends))
+
+    def iter_filter(self, trends: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield surviving items as they arrive.
+
+        Later duplicates are merged into the already-yielded item, so its
+        origin_count and sources are only final once the stream is exhausted.
+        """
+        report = {
+            "input": 0,
+            "exact_duplicates": 0,
+            "near_duplicates": 0,
+            "too_short": 0,
+            "too_long": 0,
+            "charset": 0,
+            "empty_description": 0,
+            "language": 0,
+            "output": 0,
+        }
+        self.last_report = report
+
+        exact: Dict[str, Dict] = {}
+        near: Dict[str, Dict] = {}
+
+        for item in trends:
+            report["input"] += 1
+            normalized = normalize_title(item.get("title", ""))
+            if not normalized:
+                report["too_short"] += 1
+                continue
+
+            exact_key = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+            near_key = self._near_key(normalized)
+            existing = exact.get(exact_key) or (near.get(near_key) if near_key else None)
+            if existing is not None:
+                report["exact_duplicates" if exact_key in exact else "near_duplicates"] += 1
+                existing["origin_count"] = existing.get("origin_count", 1) + item.get("origin_count", 1)
+                sources = set(existing.get("sources", [existing.get("source")])) | set(item.get("sources", [item.get("source")]))
+                existing["sources"] = sorted(s for s in sources if s)
+                continue
+
+            reason = self._rejection(item, normalized)
+            if reason:
+                report[reason] += 1
+                continue
+
+            merged = dict(item)
+            merged["origin_count"] = item.get("origin_count", 1)
+            exact[exact_key] = merged
+            if near_key:
+                near[near_key] = merged
+            report["output"] += 1
+            yield merged
+
+        logger.info("Prefilter complete", **report)
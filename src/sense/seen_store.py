@@ -0,0 +1,88 @@
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+class SeenIdStore:
+    """Persistent per-source record of entry ids already emitted, plus last poll time.
+
+    filter_new only updates the in-memory state; commit() writes it out once the
+    caller has safely handed the items on, so a run that fails midway emits them again.
+    """
+
+    def __init__(self, root: str = "data/cache/sense_seen", retention_days: int = 14):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.retention_seconds = retention_days * 86400
+        self.lock = threading.Lock()
+        self._sources: Dict[str, Dict] = {}
+        self._dirty = set()
+
+    def _path(self, source: str) -> Path:
+        return self.root / f"{source}.json"
+
+    def _state(self, source: str) -> Dict:
+        if source not in self._sources:
+            state = {"seen": {}, "last_polled": None}
+            path = self._path(source)
+            if path.exists():
+                try:
+                    with open(path, 'r') as f:
+                        state = json.load(f)
+                except Exception as e:
+                    logger.warning("Seen-ID store unreadable, starting fresh", source=source, error=str(e))
+            self._sources[source] = state
+        return self._sources[source]
+
+    def _save(self, source: str):
+        with open(self._path(source), 'w') as f:
+            json.dump(self._sources[source], f)
+
+    @staticmethod
+    def entry_id(item: Dict) -> str:
+        key = item.get("guid") or item.get("source_url") or item.get("title", "")
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+    def last_polled(self, source: str) -> Optional[float]:
+        with self.lock:
+            return self._state(source).get("last_polled")
+
+    def filter_new(self, source: str, items: List[Dict]) -> List[Dict]:
+        """Return items not emitted before and remember them (until commit); also stamps the poll time."""
+        with self.lock:
+            state = self._state(source)
+            seen = state["seen"]
+            now = time.time()
+
+            new_items = []
+            for item in items:
+                entry_id = self.entry_id(item)
+                if entry_id in seen:
+                    continue
+                seen[entry_id] = now
+                item["entry_id"] = entry_id
+                new_items.append(item)
+
+            cutoff = now - self.retention_seconds
+            state["seen"] = {k: ts for k, ts in seen.items() if ts >= cutoff}
+            state["last_polled"] = now
+            self._dirty.add(source)
+
+        logger.info("Seen-ID filter applied", source=source, fetched=len(items), new=len(new_items))
+        return new_items
+
+    def commit(self):
+        """Persist the ids (and poll times) recorded since the last commit."""
+        with self.lock:
+            for source in sorted(self._dirty):
+                self._save(source)
+            committed = len(self._dirty)
+            self._dirty.clear()
+        if committed:
+            logger.info("Seen-ID store committed", sources=committed)
@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Dict, List, Type
+
+import feedparser
+
+from ..shared import get_logger
+from .fetch_engine import FetchEngine, FetchJob
+
+logger = get_logger(__name__)
+
+SOURCE_REGISTRY: Dict[str, Type["TrendSource"]] = {}
+
+def register_source(cls: Type["TrendSource"]) -> Type["TrendSource"]:
+    SOURCE_REGISTRY[cls.name] = cls
+    return cls
+
+class TrendSource:
+    """Base class for sense-layer sources.
+
+    Subclasses declare their fetch budget as class attributes and turn a list of
+    FetchJobs into trend dicts; scheduling, seen-ID tracking and caching live in
+    the aggregator so every source gets them for free.
+    """
+
+    name = ""
+    concurrency = 2
+    timeout_seconds = 10
+    poll_interval_hours = 6.0
+    cost = 1.0  # Relative cost of one poll, roughly requests issued
+
+    def build_jobs(self) -> List[FetchJob]:
+        raise NotImplementedError
+
+    def fetch(self, engine: FetchEngine) -> List[Dict]:
+        jobs = self.build_jobs()
+        results = engine.fetch_all(jobs, max_workers=self.concurrency)
+
+        # Keep job order stable regardless of which request finished first
+        trends = []
+        for job in jobs:
+            trends.extend(results.get(job.key, []))
+        return trends
+
+    def describe(self) -> Dict:
+        return {
+            "concurrency": self.concurrency,
+            "timeout_seconds": self.timeout_seconds,
+            "poll_interval_hours": self.poll_interval_hours,
+            "cost": self.cost,
+        }
+
+@register_source
+class FinanceRSSSource(TrendSource):
+    name = "finance_rss"
+    concurrency = 4
+    timeout_seconds = 10
+    poll_interval_hours = 4.0
+    cost = 4.0
+
+    feeds = [
+        "https://finance.yahoo.com/news/rssindex",
+        "https://search.cnbc.com/rs/search/combinedcms/view.xml?partnerId=wrss01&id=10000664", # CNBC Finance
+        "http://feeds.marketwatch.com/marketwatch/topstories",
+        "https://www.investing.com/rss/news_25.rss", # Economic indicators
+    ]
+
+    def build_jobs(self) -> List[FetchJob]:
+        return [
+            FetchJob(feed_url, feed_url, self._parse_feed, timeout=self.timeout_seconds)
+            for feed_url in self.feeds
+        ]
+
+    def _parse_feed(self, response) -> List[Dict]:
+        feed = feedparser.parse(response.content)
+
+        trends = []
+        for entry in feed.entries[:15]:
+            trends.append({
+                "title": entry.get("title", ""),
+                "guid": entry.get("id") or entry.get("link", ""),
+                "source": "finance_rss",
+                "source_url": entry.get("link", ""),
+                "description": entry.get("summary", "")[:300],
+                "timestamp": datetime.utcnow().isoformat(),
+                "origin_count": 1,
+            })
+        return trends
+
+@register_source
+class RedditFinanceSource(TrendSource):
+    name = "reddit_finance"
+    concurrency = 2
+    timeout_seconds = 10
+    poll_interval_hours = 2.0
+    cost = 6.0
+
+    subreddits = ["stocks", "investing", "cryptocurrency", "finance", "wallstreetbets", "financialindependence"]
+    headers = {"User-Agent": "ViralosPrime/2.0"}
+
+    def build_jobs(self) -> List[FetchJob]:
+        # Reddit's rate limits are enforced by the engine's per-host politeness settings
+        return [
+            FetchJob(
+                subreddit,
+                f"https://www.reddit.com/r/{subreddit}/hot.json",
+                self._parse_listing,
+                headers=self.headers,
+                timeout=self.timeout_seconds,
+            )
+            for subreddit in self.subreddits
+        ]
+
+    def _parse_listing(self, response) -> List[Dict]:
+        data = response.json()
+        posts = data.get("data", {}).get("children", [])
+
+        trends = []
+        for post in posts[:10]:
+            post_data = post.get("data", {})
+            if post_data.get("stickied"): continue
+
+            trends.append({
+                "title": post_data.get("title", ""),
+                "guid": post_data.get("name", ""),
+                "source": "reddit",
+                "source_url": f"https://reddit.com{post_data.get('permalink', '')}",
+                "description": post_data.get("selftext", "")[:300],
+                "timestamp": datetime.utcnow().isoformat(),
+                "origin_count": 1,
+                "score": post_data.get("score", 0),
+            })
+        return trends
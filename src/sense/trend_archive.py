@@ -0,0 +1,158 @@
+import json
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from ..shared import get_logger
+
+logger = get_logger(__name__)
+
+class TrendArchive:
+    """Time-partitioned trend archive.
+
+    One append-only JSONL segment per day plus a persistent title-hash index, so
+    dedup is a dict lookup and retention is dropping whole segment files.
+    """
+
+    def __init__(
+        self,
+        root: str = "data/sense_archive",
+        retention_days: int = 7,
+        legacy_path: str = "data/sense_archive.json",
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.retention_days = retention_days
+        self.index_path = self.root / "title_index.json"
+        self.index = self._load_index()
+        self._migrate_legacy(Path(legacy_path))
+
+    def _segment_path(self, day: str) -> Path:
+        return self.root / f"segment_{day}.jsonl"
+
+    def _segment_days(self) -> List[str]:
+        return sorted(p.stem.split("_")[-1] for p in self.root.glob("segment_*.jsonl"))
+
+    def _title_hash(self, title: str) -> str:
+        return hashlib.sha1(title.encode("utf-8")).hexdigest()[:16]
+
+    def _load_index(self) -> Dict[str, str]:
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning("Archive index unreadable, rebuilding", error=str(e))
+        return self._rebuild_index()
+
+    def _rebuild_index(self) -> Dict[str, str]:
+        index = {}
+        for day in self._segment_days():
+            for item in self._read_segment(day):
+                index[self._title_hash(item.get("title", ""))] = day
+        return index
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        tmp_path.replace(self.index_path)
+
+    def _read_segment(self, day: str) -> List[Dict]:
+        items = []
+        path = self._segment_path(day)
+        if not path.exists():
+            return items
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted append shouldn't poison the segment
+                    logger.warning("Skipping corrupt archive line", segment=day)
+        return items
+
+    def _migrate_legacy(self, legacy_path: Path):
+        if not legacy_path.exists():
+            return
+        try:
+            with open(legacy_path, 'r') as f:
+                legacy = json.load(f)
+
+            by_day: Dict[str, List[Dict]] = {}
+            for item in legacy:
+                try:
+                    day = datetime.fromisoformat(item["timestamp"]).strftime("%Y%m%d")
+                except Exception:
+                    continue
+                by_day.setdefault(day, []).append(item)
+
+            migrated = sum(self._append_to_segment(day, items) for day, items in sorted(by_day.items()))
+            self._save_index()
+            legacy_path.rename(legacy_path.with_suffix(".json.migrated"))
+            logger.info("Legacy archive migrated", items=migrated)
+        except Exception as e:
+            logger.error("Legacy archive migration failed", error=str(e))
+
+    def _append_to_segment(self, day: str, trends: List[Dict]) -> int:
+        added = 0
+        with open(self._segment_path(day), 'a') as f:
+            for trend in trends:
+                title_hash = self._title_hash(trend.get("title", ""))
+                if title_hash in self.index:
+                    continue
+                f.write(json.dumps(trend) + "\n")
+                self.index[title_hash] = day
+                added += 1
+        return added
+
+    def contains(self, title: str) -> bool:
+        return self._title_hash(title) in self.index
+
+    def append(self, trends: List[Dict]) -> int:
+        fresh = [t for t in trends if t.get("title") and not self.contains(t["title"])]
+        if not fresh:
+            return 0
+
+        added = self._append_to_segment(datetime.utcnow().strftime("%Y%m%d"), fresh)
+        self._save_index()
+        logger.info("Archive updated", added=added, indexed=len(self.index))
+        return added
+
+    def prune(self) -> int:
+        cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).strftime("%Y%m%d")
+        expired = [day for day in self._segment_days() if day < cutoff]
+        if not expired:
+            return 0
+
+        expired_set = set(expired)
+        for day in expired:
+            self._segment_path(day).unlink()
+        self.index = {h: day for h, day in self.index.items() if day not in expired_set}
+        self._save_index()
+
+        logger.info("Archive segments pruned", segments=len(expired), indexed=len(self.index))
+        return len(expired)
+
+    def iter_recent(self) -> Iterator[Dict]:
+        """Yield archived trends newest first, one segment in memory at a time."""
+        for day in reversed(self._segment_days()):
+            for item in reversed(self._read_segment(day)):
+                yield item
+
+    def recent(self, limit: int, exclude_titles: Optional[Set[str]] = None) -> List[Dict]:
+        exclude_titles = exclude_titles or set()
+        results = []
+        if limit <= 0:
+            return results
+        for item in self.iter_recent():
+            if item.get("title") in exclude_titles:
+                continue
+            results.append(item)
+            if len(results) >= limit:
+                break
+        return results
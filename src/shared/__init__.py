@@ -14,9 +14,13 @@ from .error_handler import (
     ErrorContext,
 )
 from .token_bucket import TokenBucket, RateLimiter, rate_limiter
-from .embeddings import EmbeddingService, embedding_service
+from .embeddings import EmbeddingService, IncrementalClusterer, embedding_service
 from .cache_manager import CacheManager, cache_manager
 from .resource_monitor import ResourceMonitor, resource_monitor
+from .http_client import HTTPClient, http_client
+from .text_features import TextFeatureExtractor, TextFeatures, text_features
+from .candidate_batch import CandidateBatch, CandidateRow
+from .channels import ChannelProfile, load_channel_profiles, DEFAULT_CHANNEL_ID
 
 __all__ = [
     "get_logger",
@@ -38,8 +42,19 @@ __all__ = [
     "rate_limiter",
     "EmbeddingService",
     "embedding_service",
+    "IncrementalClusterer",
     "CacheManager",
     "cache_manager",
     "ResourceMonitor",
     "resource_monitor",
+    "HTTPClient",
+    "http_client",
+    "TextFeatureExtractor",
+    "TextFeatures",
+    "text_features",
+    "CandidateBatch",
+    "CandidateRow",
+    "ChannelProfile",
+    "load_channel_profiles",
+    "DEFAULT_CHANNEL_ID",
 ]
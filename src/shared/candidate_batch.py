@@ -0,0 +1,179 @@
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+class CandidateRow:
+    """Read-only dict-like view of one row, so per-row helpers written against
+    candidate dicts (``.get``, ``[]``, ``in``) work without materializing one."""
+
+    __slots__ = ("_batch", "_i")
+
+    def __init__(self, batch: "CandidateBatch", i: int):
+        self._batch = batch
+        self._i = i
+
+    def __contains__(self, name: str) -> bool:
+        return self._batch._present(name, self._i)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self:
+            raise KeyError(name)
+        return self._batch._value(name, self._i)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._batch._value(name, self._i) if name in self else default
+
+class CandidateBatch:
+    """Columnar pool of candidates passed between validation, scoring and selection.
+
+    Homogeneous bool/int/float fields become typed NumPy columns, strings are
+    interned in object columns, and anything else (lists, dicts, mixed types)
+    stays in an object column. Fields missing from some records carry a
+    presence mask, so to_records() round-trips the original dicts exactly.
+    Operations return new batches that share column arrays where possible.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], masks: Optional[Dict[str, np.ndarray]] = None, length: Optional[int] = None):
+        self.columns = columns
+        self.masks = masks or {}
+        if length is None:
+            length = len(next(iter(columns.values()))) if columns else 0
+        self.length = length
+
+    @staticmethod
+    def _to_column(values: List[Any]) -> np.ndarray:
+        kinds = {type(v) for v in values}
+        try:
+            if kinds == {bool}:
+                return np.array(values, dtype=bool)
+            if kinds == {int}:
+                return np.array(values, dtype=np.int64)
+            if kinds == {float}:
+                return np.array(values, dtype=np.float64)
+        except OverflowError:
+            pass
+
+        column = np.empty(len(values), dtype=object)
+        if kinds == {str}:
+            column[:] = [sys.intern(v) for v in values]
+        else:
+            for i, v in enumerate(values):
+                column[i] = v
+        return column
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict]) -> "CandidateBatch":
+        names: Dict[str, None] = {}
+        for record in records:
+            for name in record:
+                names.setdefault(name, None)
+
+        columns = {}
+        masks = {}
+        for name in names:
+            present = np.array([name in r for r in records], dtype=bool)
+            if present.all():
+                columns[name] = cls._to_column([r[name] for r in records])
+            else:
+                values = [r[name] for r in records if name in r]
+                dense = cls._to_column(values)
+                column = np.zeros(len(records), dtype=dense.dtype) if dense.dtype != object else np.empty(len(records), dtype=object)
+                column[present] = dense
+                columns[name] = column
+                masks[name] = present
+        return cls(columns, masks, length=len(records))
+
+    @classmethod
+    def from_columns(cls, **columns: Sequence[Any]) -> "CandidateBatch":
+        """Build from per-field value lists (all the same length, no missing values)."""
+        return cls({name: cls._to_column(list(values)) for name, values in columns.items()})
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def column(self, name: str, default: Any = None) -> np.ndarray:
+        """Column values with missing entries (or a missing column) filled with default."""
+        if name not in self.columns:
+            filled = np.empty(self.length, dtype=object)
+            filled[:] = [default] * self.length
+            return filled
+        mask = self.masks.get(name)
+        if mask is None:
+            return self.columns[name]
+        filled = self.columns[name].astype(object)
+        filled[~mask] = default
+        return filled
+
+    def present(self, name: str) -> np.ndarray:
+        """Boolean mask of the rows that carry the field."""
+        if name not in self.columns:
+            return np.zeros(self.length, dtype=bool)
+        mask = self.masks.get(name)
+        return np.ones(self.length, dtype=bool) if mask is None else mask
+
+    def _present(self, name: str, i: int) -> bool:
+        if name not in self.columns:
+            return False
+        mask = self.masks.get(name)
+        return True if mask is None else bool(mask[i])
+
+    def _value(self, name: str, i: int) -> Any:
+        value = self.columns[name][i]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def row(self, i: int) -> CandidateRow:
+        return CandidateRow(self, i)
+
+    def rows(self) -> Iterator[CandidateRow]:
+        return (CandidateRow(self, i) for i in range(self.length))
+
+    def to_records(self) -> List[Dict]:
+        # Convert whole columns at once; tolist() turns NumPy scalars into Python ones
+        lists = {name: column.tolist() for name, column in self.columns.items()}
+        masks = {name: mask.tolist() for name, mask in self.masks.items()}
+        records = []
+        for i in range(self.length):
+            record = {}
+            for name, values in lists.items():
+                mask = masks.get(name)
+                if mask is None or mask[i]:
+                    record[name] = values[i]
+            records.append(record)
+        return records
+
+    def take(self, indices: Sequence[int]) -> "CandidateBatch":
+        indices = np.asarray(indices, dtype=np.int64)
+        return CandidateBatch(
+            {name: column[indices] for name, column in self.columns.items()},
+            {name: mask[indices] for name, mask in self.masks.items()},
+            length=len(indices),
+        )
+
+    def filter(self, mask: np.ndarray) -> "CandidateBatch":
+        return self.take(np.flatnonzero(np.asarray(mask, dtype=bool)))
+
+    def sort_by(self, name: str, descending: bool = True) -> "CandidateBatch":
+        """Stable sort, matching list.sort(key=..., reverse=descending) on the records."""
+        values = self.columns[name]
+        order = np.argsort(-values if descending else values, kind="stable")
+        return self.take(order)
+
+    def with_columns(self, **columns: Any) -> "CandidateBatch":
+        """New batch with columns added or replaced; existing arrays are shared, not copied."""
+        new_columns = dict(self.columns)
+        new_masks = dict(self.masks)
+        for name, values in columns.items():
+            new_columns[name] = values if isinstance(values, np.ndarray) and values.dtype != object else self._to_column(list(values))
+            new_masks.pop(name, None)
+        return CandidateBatch(new_columns, new_masks, length=self.length)
@@ -0,0 +1,130 @@
+import os
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CHANNEL_ID = "default"
+
+class ChannelProfile:
+    """Per-channel configuration: lanes, schedule, credentials and isolated storage roots."""
+
+    def __init__(
+        self,
+        channel_id: str,
+        name: Optional[str] = None,
+        config_dir: str = "config",
+        credentials_env_prefix: str = "YOUTUBE",
+        daily_upload_quota: int = 6,
+        enabled: bool = True,
+    ):
+        self.channel_id = channel_id
+        self.name = name or channel_id
+        self.config_dir = Path(config_dir)
+        self.credentials_env_prefix = credentials_env_prefix
+        self.daily_upload_quota = daily_upload_quota
+        self.enabled = enabled
+
+    @property
+    def is_default(self) -> bool:
+        return self.channel_id == DEFAULT_CHANNEL_ID
+
+    @property
+    def narrative_lanes_path(self) -> Path:
+        return self._config_file("narrative_lanes.json")
+
+    @property
+    def schedule_path(self) -> Path:
+        return self._config_file("publishing_schedule.json")
+
+    @property
+    def output_dir(self) -> Path:
+        # The default channel keeps the historical layout so existing artifacts and workflows still line up
+        if self.is_default:
+            return Path("data/metrics")
+        return Path("data/metrics/channels") / self.channel_id
+
+    @property
+    def memory_dir(self) -> Path:
+        if self.is_default:
+            return Path("memory")
+        return Path("memory/channels") / self.channel_id
+
+    @property
+    def queue_dir(self) -> Path:
+        if self.is_default:
+            return Path("data/queue")
+        return Path("data/queue") / self.channel_id
+
+    @property
+    def history_path(self) -> Path:
+        if self.is_default:
+            return Path("data/history/performance_history.json")
+        return Path("data/history/channels") / self.channel_id / "performance_history.json"
+
+    @property
+    def produced_memory_dir(self) -> Path:
+        # Only "produced" entries are per channel; the shared deduplicator keeps the "seen" memory
+        return self.memory_dir / "produced_memory"
+
+    def _config_file(self, filename: str) -> Path:
+        # Channels only need to override the files that differ from the global config
+        path = self.config_dir / filename
+        if path.exists():
+            return path
+        return Path("config") / filename
+
+    def load_schedule(self) -> Dict:
+        path = self.schedule_path
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return {}
+
+    def credentials(self) -> Dict:
+        prefix = self.credentials_env_prefix
+        return {
+            "client_id": os.getenv(f"{prefix}_CLIENT_ID", ""),
+            "client_secret": os.getenv(f"{prefix}_CLIENT_SECRET", ""),
+            "refresh_token": os.getenv(f"{prefix}_REFRESH_TOKEN", ""),
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "channel_id": self.channel_id,
+            "name": self.name,
+            "config_dir": str(self.config_dir),
+            "credentials_env_prefix": self.credentials_env_prefix,
+            "daily_upload_quota": self.daily_upload_quota,
+            "enabled": self.enabled,
+        }
+
+def load_channel_profiles(
+    path: str = "config/channels.json",
+    only: Optional[List[str]] = None,
+) -> List[ChannelProfile]:
+    config_path = Path(path)
+    profiles = []
+
+    if config_path.exists():
+        with open(config_path) as f:
+            config = json.load(f)
+
+        for channel_id, data in config.get("channels", {}).items():
+            profile = ChannelProfile(channel_id, **data)
+            if profile.enabled:
+                profiles.append(profile)
+
+    if not profiles:
+        profiles = [ChannelProfile(DEFAULT_CHANNEL_ID)]
+
+    if only:
+        unknown = set(only) - {p.channel_id for p in profiles}
+        if unknown:
+            logger.warning("Unknown channels requested", channels=sorted(unknown))
+        profiles = [p for p in profiles if p.channel_id in only]
+
+    logger.info("Channel profiles loaded", channels=[p.channel_id for p in profiles])
+    return profiles
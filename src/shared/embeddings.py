@@ -105,26 +105,7 @@ class EmbeddingService:
             return []
         
         embeddings = self.encode_batch(texts)
-        clusters = []
-        assigned = set()
-        
-        for i, emb_i in enumerate(embeddings):
-            if i in assigned or emb_i is None:
-                continue
-            
-            cluster = [i]
-            assigned.add(i)
-            
-            for j, emb_j in enumerate(embeddings[i+1:], start=i+1):
-                if j in assigned or emb_j is None:
-                    continue
-                
-                similarity = self.cosine_similarity(emb_i, emb_j)
-                if similarity >= threshold:
-                    cluster.append(j)
-                    assigned.add(j)
-            
-            clusters.append(cluster)
+        clusters = self.cluster_embeddings(embeddings, threshold)
         
         logger.info(
             "Clustering complete",
@@ -135,6 +116,23 @@ class EmbeddingService:
         
         return clusters
     
+    def cluster_embeddings(
+        self,
+        embeddings: List[Optional[np.ndarray]],
+        threshold: float = 0.75,
+    ) -> List[List[int]]:
+        """Greedy clustering: each unassigned item seeds a cluster of later items within threshold."""
+        clusterer = IncrementalClusterer(threshold)
+        clusters: List[List[int]] = []
+        
+        valid = [i for i, emb in enumerate(embeddings) if emb is not None]
+        for idx, cluster_id in zip(valid, clusterer.assign_batch([embeddings[i] for i in valid])):
+            if cluster_id == len(clusters):
+                clusters.append([])
+            clusters[cluster_id].append(idx)
+        
+        return clusters
+    
     def save_cache(self):
         cache_file = self.cache_dir / "embedding_cache.pkl"
         try:
@@ -155,4 +153,65 @@ class EmbeddingService:
                 logger.error("Failed to load cache", error=str(e))
                 self._embedding_cache = {}
 
+class IncrementalClusterer:
+    """Streaming form of cluster_embeddings.
+
+    An item joins the earliest seed it is within threshold of, otherwise it
+    becomes a new seed; that is exactly what the greedy batch pass produces,
+    so feeding items in micro-batches gives the same clusters while only the
+    seed matrix is kept.
+    """
+    
+    def __init__(self, threshold: float = 0.75, initial_capacity: int = 64):
+        self.threshold = threshold
+        self.count = 0
+        self._seeds: Optional[np.ndarray] = None
+        self._capacity = initial_capacity
+    
+    @property
+    def seeds(self) -> np.ndarray:
+        if self._seeds is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._seeds[:self.count]
+    
+    def _add_seed(self, vector: np.ndarray) -> int:
+        if self._seeds is None:
+            self._seeds = np.zeros((self._capacity, len(vector)), dtype=np.float32)
+        elif self.count == len(self._seeds):
+            self._seeds = np.concatenate([self._seeds, np.zeros_like(self._seeds)])
+        self._seeds[self.count] = vector
+        self.count += 1
+        return self.count - 1
+    
+    def assign_batch(self, embeddings: List[np.ndarray]) -> List[int]:
+        """Cluster index for each embedding, in order; a new index means a new seed."""
+        if not embeddings:
+            return []
+        
+        batch = np.stack([np.asarray(e, dtype=np.float32) for e in embeddings])
+        norms = np.linalg.norm(batch, axis=1, keepdims=True)
+        # Zero vectors never match anything, same as cosine_similarity
+        batch = np.divide(batch, norms, out=np.zeros_like(batch), where=norms > 0)
+        
+        # Seeds from earlier batches precede anything seeded in this one, so check them first in one matmul
+        existing = self.count
+        if existing:
+            hits = (batch @ self.seeds.T) >= self.threshold
+            first_hit = np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+        else:
+            first_hit = np.full(len(batch), -1)
+        
+        assignments = []
+        for row, vector in enumerate(batch):
+            if first_hit[row] >= 0:
+                assignments.append(int(first_hit[row]))
+                continue
+            if self.count > existing:
+                new_hits = np.flatnonzero(self._seeds[existing:self.count] @ vector >= self.threshold)
+                if new_hits.size:
+                    assignments.append(existing + int(new_hits[0]))
+                    continue
+            assignments.append(self._add_seed(vector))
+        return assignments
+
 embedding_service = EmbeddingService()
@@ -0,0 +1,166 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class HostLatencyStats:
+    def __init__(self, window: int = 500):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.samples = deque(maxlen=window)
+
+    def record(self, elapsed_ms: float, error: bool = False):
+        self.requests += 1
+        self.errors += int(error)
+        self.total_ms += elapsed_ms
+        self.samples.append(elapsed_ms)
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "mean_ms": round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+            "p50_ms": round(self.percentile(50), 1),
+            "p95_ms": round(self.percentile(95), 1),
+        }
+
+class HTTPClient:
+    """Process-wide HTTP client: keep-alive pools per host, HTTP/2 when h2 is installed,
+    uniform timeouts and retries, and per-host latency metrics."""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        retries: int = 2,
+        backoff_seconds: float = 0.5,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.http2 = _http2_available() and transport is None
+        self._client = httpx.Client(
+            http2=self.http2,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            follow_redirects=True,
+            transport=transport,
+        )
+        self._stats: Dict[str, HostLatencyStats] = {}
+        self._stats_lock = threading.Lock()
+
+        logger.info("HTTPClient initialized", http2=self.http2, timeout=timeout, retries=retries)
+
+    def _host_stats(self, url: str) -> HostLatencyStats:
+        host = urlparse(url).netloc
+        with self._stats_lock:
+            if host not in self._stats:
+                self._stats[host] = HostLatencyStats()
+            return self._stats[host]
+
+    def request(self, method: str, url: str, retries: Optional[int] = None, **kwargs) -> httpx.Response:
+        retries = self.retries if retries is None else retries
+        stats = self._host_stats(url)
+
+        for attempt in range(retries + 1):
+            start = time.time()
+            try:
+                response = self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                stats.record((time.time() - start) * 1000, error=True)
+                if attempt >= retries:
+                    raise
+                logger.warning("HTTP transport error, retrying", url=url[:100], attempt=attempt + 1, error=str(e))
+            else:
+                retryable = response.status_code in RETRY_STATUS_CODES
+                stats.record((time.time() - start) * 1000, error=retryable)
+                if not retryable or attempt >= retries:
+                    return response
+                logger.warning("HTTP retryable status", url=url[:100], status_code=response.status_code, attempt=attempt + 1)
+
+            stats.retries += 1
+            time.sleep(self.backoff_seconds * (2 ** attempt))
+
+    @contextmanager
+    def stream(self, method: str, url: str, retries: Optional[int] = None, **kwargs) -> Iterator[httpx.Response]:
+        """Streamed request: the body is read by the caller (iter_lines/iter_text).
+
+        Retried like request() until a non-retryable response starts; latency is
+        recorded as time to response headers. The response is closed on exit.
+        """
+        retries = self.retries if retries is None else retries
+        stats = self._host_stats(url)
+
+        for attempt in range(retries + 1):
+            start = time.time()
+            try:
+                response = self._client.send(self._client.build_request(method, url, **kwargs), stream=True)
+            except httpx.TransportError as e:
+                stats.record((time.time() - start) * 1000, error=True)
+                if attempt >= retries:
+                    raise
+                logger.warning("HTTP transport error, retrying", url=url[:100], attempt=attempt + 1, error=str(e))
+            else:
+                retryable = response.status_code in RETRY_STATUS_CODES
+                stats.record((time.time() - start) * 1000, error=retryable)
+                if not retryable or attempt >= retries:
+                    try:
+                        yield response
+                    finally:
+                        response.close()
+                    return
+                response.close()
+                logger.warning("HTTP retryable status", url=url[:100], status_code=response.status_code, attempt=attempt + 1)
+
+            stats.retries += 1
+            time.sleep(self.backoff_seconds * (2 ** attempt))
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get_host_metrics(self) -> Dict[str, Dict]:
+        with self._stats_lock:
+            return {host: stats.to_dict() for host, stats in self._stats.items()}
+
+    def log_metrics(self):
+        logger.info("HTTP host metrics", hosts=self.get_host_metrics())
+
+    def close(self):
+        self._client.close()
+
+http_client = HTTPClient()
@@ -0,0 +1,198 @@
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+Payload = Tuple[str, str, int]  # (group, label, keyword index)
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over lowercase keywords.
+
+    Reports every occurrence of every keyword, so a keyword matches exactly
+    when `keyword in text` would.
+    """
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Payload]] = [[]]
+        self.always: List[Payload] = []
+
+    def add(self, keyword: str, payload: Payload):
+        if not keyword:
+            # "" is a substring of everything
+            self.always.append(payload)
+            return
+        state = 0
+        for char in keyword:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append(payload)
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, Payload]]:
+        """Yield (end_index, payload) for every keyword occurrence; end_index is exclusive."""
+        for payload in self.always:
+            yield 0, payload
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for payload in output[state]:
+                yield i + 1, payload
+
+class TextFeatures:
+    """Keyword hits for one (title, description) pair, split into full-text and title-only views.
+
+    Hits are stored as keyword indices per group and label, so the record is
+    plain JSON-safe data (see to_dict).
+    """
+
+    def __init__(self, groups: Dict[str, Dict[str, List[str]]], full: Dict, title: Dict):
+        self._groups = groups
+        self.full = full
+        self.title = title
+
+    def _view(self, title_only: bool) -> Dict:
+        return self.title if title_only else self.full
+
+    def hits(self, group: str, label: str = "_", title_only: bool = False) -> List[str]:
+        """Matched keywords in registration order (duplicates in the list count separately)."""
+        keywords = self._groups.get(group, {}).get(label, [])
+        indices = self._view(title_only).get(group, {}).get(label, [])
+        return [keywords[i] for i in indices]
+
+    def count(self, group: str, label: str = "_", title_only: bool = False) -> int:
+        return len(self._view(title_only).get(group, {}).get(label, []))
+
+    def counts(self, group: str, title_only: bool = False) -> Dict[str, int]:
+        """Hit count for every label of a group, in registration order (zeros included)."""
+        view = self._view(title_only).get(group, {})
+        return {label: len(view.get(label, [])) for label in self._groups.get(group, {})}
+
+    def any(self, group: str, label: str = "_", title_only: bool = False) -> bool:
+        return self.count(group, label, title_only) > 0
+
+    def matched_labels(self, group: str, title_only: bool = False) -> List[str]:
+        """Labels of a group with at least one hit (unordered)."""
+        return list(self._view(title_only).get(group, {}))
+
+    def to_dict(self) -> Dict:
+        return {"full": self.full, "title": self.title}
+
+class TextFeatureExtractor:
+    """Shared keyword matcher for the validator, scorer, selector and safety checker.
+
+    Each layer registers its keyword lists as named groups; every group is
+    compiled into one automaton and a candidate's text is scanned once.
+    Records are memoized by (title, description), so later layers reuse the
+    scan instead of lowercasing and searching the text again.
+    """
+
+    def __init__(self, max_records: int = 20000):
+        self.max_records = max_records
+        self.groups: Dict[str, Dict[str, List[str]]] = {}
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._records: "OrderedDict[Tuple[str, str], TextFeatures]" = OrderedDict()
+        self._by_title: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.RLock()
+        self.scans = 0
+        self.reuses = 0
+
+    def register_group(self, name: str, keywords: Union[List[str], Dict[str, List[str]]]):
+        """Register (or replace) a keyword group. A plain list is stored under the label "_"."""
+        labelled = {"_": list(keywords)} if isinstance(keywords, list) else {k: list(v) for k, v in keywords.items()}
+        with self._lock:
+            if self.groups.get(name) == labelled:
+                return
+            self.groups[name] = labelled
+            self._automaton = None
+            self._records.clear()
+            self._by_title.clear()
+
+    def _compile(self) -> KeywordAutomaton:
+        automaton = KeywordAutomaton()
+        for group, labels in self.groups.items():
+            for label, keywords in labels.items():
+                for idx, keyword in enumerate(keywords):
+                    automaton.add(keyword.lower(), (group, label, idx))
+        automaton.build()
+        logger.info("Text feature automaton compiled", groups=len(self.groups), states=len(automaton.goto))
+        return automaton
+
+    def _scan(self, title: str, description: str) -> TextFeatures:
+        if self._automaton is None:
+            self._automaton = self._compile()
+
+        title_lower = title.lower()
+        text = f"{title_lower} {description.lower()}"
+        title_end = len(title_lower)
+
+        full: Dict[str, Dict[str, set]] = {}
+        title_hits: Dict[str, Dict[str, set]] = {}
+        for end, (group, label, idx) in self._automaton.iter_matches(text):
+            full.setdefault(group, {}).setdefault(label, set()).add(idx)
+            if end <= title_end:
+                title_hits.setdefault(group, {}).setdefault(label, set()).add(idx)
+
+        def freeze(view: Dict[str, Dict[str, set]]) -> Dict[str, Dict[str, List[int]]]:
+            return {g: {l: sorted(ids) for l, ids in labels.items()} for g, labels in view.items()}
+
+        self.scans += 1
+        return TextFeatures(self.groups, freeze(full), freeze(title_hits))
+
+    def extract(self, title: str, description: Optional[str] = None) -> TextFeatures:
+        """Feature record for a title/description pair.
+
+        With description=None, a record already computed for this title (with any
+        description) is reused; callers must then only read title-only hits.
+        """
+        title = title or ""
+        with self._lock:
+            if description is None:
+                key = self._by_title.get(title, (title, ""))
+            else:
+                key = (title, description or "")
+
+            record = self._records.get(key)
+            if record is not None:
+                self._records.move_to_end(key)
+                self.reuses += 1
+                return record
+
+            record = self._scan(*key)
+            self._records[key] = record
+            self._by_title[title] = key
+            if len(self._records) > self.max_records:
+                old_key, _ = self._records.popitem(last=False)
+                if self._by_title.get(old_key[0]) == old_key:
+                    del self._by_title[old_key[0]]
+            return record
+
+    def extract_candidate(self, candidate: Dict) -> TextFeatures:
+        return self.extract(candidate.get("title", "") or "", candidate.get("description", "") or "")
+
+    def get_stats(self) -> Dict:
+        return {"scans": self.scans, "reuses": self.reuses, "records": len(self._records), "groups": len(self.groups)}
+
+text_features = TextFeatureExtractor()
@@ -1,5 +1,6 @@
-from typing import List, Dict, Optional
-from ..shared import get_logger
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
+from ..shared import get_logger, text_features, CandidateBatch
 
 logger = get_logger(__name__)
 
@@ -12,93 +13,186 @@ class TrendValidator:
             "valid_emotions": ["surprise", "concern", "curiosity", "opportunity"],
         }
         self.active_rules = self.base_rules.copy()
+        # Each step loosens the previous one; the first step reaching the target pass rate is used
+        self.relaxation_steps = [
+            {"max_explainability_seconds": 90},
+            {"min_relevance": 0.3, "min_source_count": 1}, # Allow single source if needed
+        ]
+        self.target_pass_rate = 0.5
+        
+        text_features.register_group("validation.emotion", {
+            "surprise": ["unexpected", "shocking", "surprising", "sudden", "breakthrough", "unknown"],
+            "concern": ["warning", "crisis", "risk", "threat", "danger", "concern", "crash", "collapse", "recession"],
+            "curiosity": ["why", "how", "what", "secret", "hidden", "revealed", "myth", "truth"],
+            "opportunity": ["opportunity", "profit", "gain", "growth", "bull", "buy", "surge", "boom", "rally"],
+        })
+        # Finance specific keywords
+        text_features.register_group("validation.relevance", [
+            "stock", "market", "economy", "finance", "money", "invest", "crypto", 
+            "bitcoin", "fed", "inflation", "rate", "tax", "wealth", "debt", 
+            "bank", "recession", "growth", "earning", "dividend", "portfolio"
+        ])
+        # Simple check for obvious red flags or fake claims
+        text_features.register_group("validation.red_flags", [
+            "guaranteed return", "free money", "instant profit", 
+            "nigerian prince", "send me bitcoin", "1000x guaranteed"
+        ])
         logger.info("TrendValidator initialized")
     
-    def validate_batch(self, candidates: List[Dict]) -> List[Dict]:
-        # Reset rules
-        self.active_rules = self.base_rules.copy()
-        
-        # First pass
-        validated = self._run_validation(candidates)
-        pass_count = sum(1 for v in validated if v["passed"])
-        pass_rate = pass_count / len(validated) if validated else 0
+    def validate_batch(
+        self,
+        candidates: Union[List[Dict], CandidateBatch],
+        in_place: bool = False,
+    ) -> Union[List[Dict], CandidateBatch]:
+        """Validate candidates, relaxing the rules if fewer than half pass.
+        
+        Features are extracted once into columns; each step of the relaxation schedule
+        is then just a threshold mask, evaluated for all steps in one sweep. The strictest
+        step reaching the target pass rate wins (the loosest if none does).
+        
+        A CandidateBatch comes back as a CandidateBatch with the validation columns
+        added. For lists, in_place=True annotates the candidates themselves instead of
+        copying them; use it when the caller owns the dicts (e.g. straight from dedup).
+        """
+        is_batch = isinstance(candidates, CandidateBatch)
+        if not len(candidates):
+            self.active_rules = self.base_rules.copy()
+            return candidates if is_batch else []
+        
+        rows = list(candidates.rows()) if is_batch else candidates
+        features = self._extract_features(rows)
+        schedule = self._rule_schedule()
+        passed = self._evaluate_schedule(features, schedule)
+        pass_rates = passed.mean(axis=1)
         
         logger.info(
             "Validation pass 1 complete",
-            total=len(validated),
-            passed=pass_count,
-            pass_rate=round(pass_rate, 2)
+            total=len(candidates),
+            passed=int(passed[0].sum()),
+            pass_rate=round(float(pass_rates[0]), 2)
         )
         
         # Adaptive relaxation if < 50% pass
-        if pass_rate < 0.5:
-            logger.warning("Low pass rate, relaxing rules for second pass", pass_rate=pass_rate)
-            self._relax_rules()
-            validated = self._run_validation(candidates)
-            pass_count = sum(1 for v in validated if v["passed"])
-            
+        reaching = np.flatnonzero(pass_rates >= self.target_pass_rate)
+        step = int(reaching[0]) if reaching.size else len(schedule) - 1
+        if step > 0:
+            logger.warning(
+                "Low pass rate, relaxing rules",
+                pass_rate=round(float(pass_rates[0]), 2),
+                step=step,
+                step_pass_rates=[round(float(r), 2) for r in pass_rates],
+            )
             logger.info(
-                "Validation pass 2 complete",
-                passed=pass_count,
-                pass_rate=round(pass_count / len(validated) if validated else 0, 2)
+                "Validation relaxed pass complete",
+                passed=int(passed[step].sum()),
+                pass_rate=round(float(pass_rates[step]), 2)
             )
-            
-        return validated
         
-    def _run_validation(self, candidates: List[Dict]) -> List[Dict]:
-        return [self.validate_single(c) for c in candidates]
+        self.active_rules = schedule[step]
+        if is_batch:
+            return self._annotate_batch(candidates, rows, features)
+        return [
+            self._build_result(candidate, features, i, in_place)
+            for i, candidate in enumerate(candidates)
+        ]
+    
+    def _annotate_batch(self, batch: CandidateBatch, rows: List, features: Dict[str, np.ndarray]) -> CandidateBatch:
+        outcomes = [self._outcome(row, features, i) for i, row in enumerate(rows)]
+        trend_ids = [row["trend_id"] if "trend_id" in row else row.get("id") for row in rows]
+        
+        return batch.with_columns(
+            passed=np.array([passed for passed, _ in outcomes], dtype=bool),
+            validation_notes=[notes for _, notes in outcomes],
+            explainability_seconds=features["explainability"],
+            emotional_vector=features["emotion"],
+            relevance=features["relevance"],
+            id=[f"validated_{trend_id or 'unknown'}" for trend_id in trend_ids],
+            trend_id=trend_ids,
+        )
+    
+    def _rule_schedule(self) -> List[Dict]:
+        """Base rules followed by progressively looser rule sets."""
+        schedule = [self.base_rules.copy()]
+        for relaxation in self.relaxation_steps:
+            rules = schedule[-1].copy()
+            rules.update(relaxation)
+            schedule.append(rules)
+        return schedule
+    
+    def _extract_features(self, candidates: List[Dict]) -> Dict[str, np.ndarray]:
+        """One pass over the candidates; everything rule-dependent is computed from these columns."""
+        return {
+            "origin_count": np.array([c.get("origin_count", 1) for c in candidates], dtype=float),
+            "explainability": np.array([self._estimate_explainability(c) for c in candidates], dtype=np.int64),
+            "emotion": np.array([self._detect_emotion(c) for c in candidates], dtype=object),
+            "relevance": np.array([self._calculate_relevance(c) for c in candidates], dtype=float),
+            "accurate": np.array([self._check_financial_accuracy(c) for c in candidates], dtype=bool),
+        }
     
-    def _relax_rules(self):
-        self.active_rules["max_explainability_seconds"] = 90
-        self.active_rules["min_relevance"] = 0.3
-        self.active_rules["min_source_count"] = 1 # Allow single source if needed
+    def _evaluate_schedule(self, features: Dict[str, np.ndarray], schedule: List[Dict]) -> np.ndarray:
+        """Pass mask of shape (steps, candidates)."""
+        min_sources = np.array([r["min_source_count"] for r in schedule], dtype=float)[:, None]
+        max_explain = np.array([r["max_explainability_seconds"] for r in schedule], dtype=float)[:, None]
+        min_relevance = np.array([r["min_relevance"] for r in schedule], dtype=float)[:, None]
+        emotion_ok = np.stack([np.isin(features["emotion"], r["valid_emotions"]) for r in schedule])
+        
+        return (
+            (features["origin_count"] >= min_sources)
+            & (features["explainability"] <= max_explain)
+            & emotion_ok
+            & (features["relevance"] >= min_relevance)
+            & features["accurate"]
+        )
     
-    def validate_single(self, candidate: Dict) -> Dict:
-        result = candidate.copy()
-        result["passed"] = True
-        result["validation_notes"] = []
+    def _outcome(self, candidate, features: Dict[str, np.ndarray], i: int) -> Tuple[bool, List[str]]:
+        """Pass/fail and notes for row i under the active rules."""
+        notes = []
         
         # 1. Source Count
         source_count = candidate.get("origin_count", 1)
         if source_count < self.active_rules["min_source_count"]:
-            result["passed"] = False
-            result["validation_notes"].append(f"Insufficient sources: {source_count}")
+            notes.append(f"Insufficient sources: {source_count}")
         
         # 2. Explainability
-        explainability = self._estimate_explainability(candidate)
-        result["explainability_seconds"] = explainability
+        explainability = int(features["explainability"][i])
         if explainability > self.active_rules["max_explainability_seconds"]:
-            result["passed"] = False
-            result["validation_notes"].append(f"Too complex: {explainability}s")
+            notes.append(f"Too complex: {explainability}s")
         
         # 3. Emotion
-        emotion = self._detect_emotion(candidate)
-        result["emotional_vector"] = emotion
+        emotion = features["emotion"][i]
         if emotion not in self.active_rules["valid_emotions"]:
-            # Check if we should fail or just note it. Ticket says "emotional_vector ∈ {set}"
-            # I'll make it a soft requirement or strict? "Multi-check validation" implies strict.
-            # But maybe relaxed?
-            # Let's keep it strict but allow "neutral" if relaxed? No, stay strict for now.
-            result["passed"] = False
-            result["validation_notes"].append(f"Weak emotion: {emotion}")
+            notes.append(f"Weak emotion: {emotion}")
         
         # 4. Relevance
-        relevance = self._calculate_relevance(candidate)
-        result["relevance"] = relevance
+        relevance = float(features["relevance"][i])
         if relevance < self.active_rules["min_relevance"]:
-            result["passed"] = False
-            result["validation_notes"].append(f"Low relevance: {relevance}")
+            notes.append(f"Low relevance: {relevance}")
             
         # 5. Financial Accuracy (Basic check)
-        if not self._check_financial_accuracy(candidate):
-            result["passed"] = False
-            result["validation_notes"].append("Financial accuracy check failed")
+        if not features["accurate"][i]:
+            notes.append("Financial accuracy check failed")
         
-        result["id"] = f"validated_{candidate.get('id', 'unknown')}"
-        result["trend_id"] = candidate.get("id")
+        return not notes, notes
+    
+    def _build_result(self, candidate: Dict, features: Dict[str, np.ndarray], i: int, in_place: bool = False) -> Dict:
+        # A re-validation of in-place results must still see the original trend id
+        trend_id = candidate["trend_id"] if "trend_id" in candidate else candidate.get("id")
+        passed, notes = self._outcome(candidate, features, i)
+        
+        result = candidate if in_place else candidate.copy()
+        result["passed"] = passed
+        result["validation_notes"] = notes
+        result["explainability_seconds"] = int(features["explainability"][i])
+        result["emotional_vector"] = features["emotion"][i]
+        result["relevance"] = float(features["relevance"][i])
+        result["id"] = f"validated_{trend_id or 'unknown'}"
+        result["trend_id"] = trend_id
         
         return result
     
+    def validate_single(self, candidate: Dict, in_place: bool = False) -> Dict:
+        return self._build_result(candidate, self._extract_features([candidate]), 0, in_place)
+    
     def _estimate_explainability(self, candidate: Dict) -> int:
         title = candidate.get("title", "")
         description = candidate.get("description", "")
@@ -111,18 +205,7 @@ class TrendValidator:
         else: return 90
     
     def _detect_emotion(self, candidate: Dict) -> str:
-        text = f"{candidate.get('title', '')} {candidate.get('description', '')}".lower()
-        
-        emotion_keywords = {
-            "surprise": ["unexpected", "shocking", "surprising", "sudden", "breakthrough", "unknown"],
-            "concern": ["warning", "crisis", "risk", "threat", "danger", "concern", "crash", "collapse", "recession"],
-            "curiosity": ["why", "how", "what", "secret", "hidden", "revealed", "myth", "truth"],
-            "opportunity": ["opportunity", "profit", "gain", "growth", "bull", "buy", "surge", "boom", "rally"],
-        }
-        
-        scores = {}
-        for emotion, keywords in emotion_keywords.items():
-            scores[emotion] = sum(1 for kw in keywords if kw in text)
+        scores = text_features.extract_candidate(candidate).counts("validation.emotion")
         
         if max(scores.values()) == 0:
             return "neutral"
@@ -130,15 +213,7 @@ class TrendValidator:
         return max(scores, key=scores.get)
     
     def _calculate_relevance(self, candidate: Dict) -> float:
-        # Finance specific keywords
-        keywords = [
-            "stock", "market", "economy", "finance", "money", "invest", "crypto", 
-            "bitcoin", "fed", "inflation", "rate", "tax", "wealth", "debt", 
-            "bank", "recession", "growth", "earning", "dividend", "portfolio"
-        ]
-        
-        text = f"{candidate.get('title', '')} {candidate.get('description', '')}".lower()
-        matches = sum(1 for kw in keywords if kw in text)
+        matches = text_features.extract_candidate(candidate).count("validation.relevance")
         
         relevance = min(matches / 2.0, 1.0) # 2 keywords = 100%
         
@@ -148,15 +223,4 @@ class TrendValidator:
         return round(relevance, 2)
 
     def _check_financial_accuracy(self, candidate: Dict) -> bool:
-        # Simple check for obvious red flags or fake claims
-        text = f"{candidate.get('title', '')} {candidate.get('description', '')}".lower()
-        
-        red_flags = [
-            "guaranteed return", "free money", "instant profit", 
-            "nigerian prince", "send me bitcoin", "1000x guaranteed"
-        ]
-        
-        for flag in red_flags:
-            if flag in text:
-                return False
-        return True
+        return not text_features.extract_candidate(candidate).any("validation.red_flags")
@@ -0,0 +1,101 @@
+"""Local stand-in for OpenRouter's chat completions endpoint, for tests and benchmarks.
+
+Serves a fixed completion either as one JSON response or, when the request
+asks for "stream": true, as server-sent events split into the given chunks
+(with an optional delay per chunk; the one-shot response waits for all of
+them). latency(model_id) injects a delay before the response starts, to
+stand in for per-model latency distributions. Point LLMClient.base_url at
+stub.url.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+class LLMStub:
+    def __init__(
+        self,
+        chunks: List[str],
+        delay: float = 0.0,
+        status: int = 200,
+        usage: Optional[Dict] = None,
+        latency: Optional[Callable[[str], float]] = None,
+    ):
+        self.chunks = chunks
+        self.delay = delay
+        self.latency = latency
+        self.status = status
+        self.usage = usage or {"prompt_tokens": 500, "completion_tokens": 800}
+        self.requests: List[Dict] = []
+        self.chunks_sent = 0
+        self.disconnected = False
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1/chat/completions"
+
+    def __enter__(self) -> "LLMStub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.0" # body ends when the connection closes
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                stub.requests.append(body)
+                if stub.latency is not None:
+                    time.sleep(stub.latency(body.get("model", "")))
+                if stub.status != 200:
+                    self._send(stub.status, "application/json", json.dumps({"error": {"message": "stub error"}}).encode())
+                elif body.get("stream"):
+                    self._stream()
+                else:
+                    time.sleep(stub.delay * len(stub.chunks)) # same generation time as the streamed path
+                    self._send(200, "application/json", json.dumps({
+                        "choices": [{"message": {"role": "assistant", "content": "".join(stub.chunks)}}],
+                        "usage": stub.usage,
+                    }).encode())
+
+            def _send(self, status: int, content_type: str, payload: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                try:
+                    self._event(": OPENROUTER PROCESSING\n\n")
+                    for chunk in stub.chunks:
+                        time.sleep(stub.delay)
+                        self._event("data: " + json.dumps({"choices": [{"delta": {"content": chunk}}]}) + "\n\n")
+                        stub.chunks_sent += 1
+                    self._event("data: " + json.dumps({"choices": [{"delta": {}}], "usage": stub.usage}) + "\n\n")
+                    self._event("data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    stub.disconnected = True
+
+            def _event(self, text: str):
+                self.wfile.write(text.encode())
+                self.wfile.flush()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+def split_chunks(text: str, size: int) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
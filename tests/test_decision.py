@@ -0,0 +1,156 @@
+import itertools
+import random
+import pytest
+from src.decision import NarrativeSelector
+
+WORDS = ["bitcoin", "crypto", "stocks", "market", "fed", "economy", "psychology", "mind", "rates", "why", "hidden", "tesla"]
+
+def make_pool(rng, n):
+    return [
+        {"id": str(i), "title": " ".join(rng.sample(WORDS, 3)), "final_score": round(rng.uniform(45, 120), 2)}
+        for i in range(n)
+    ]
+
+def test_lane_quotas_fit_the_day():
+    selector = NarrativeSelector()
+    for count in range(1, 12):
+        min_quota, max_quota = selector.lane_quotas(count)
+        assert sum(min_quota.values()) <= count
+        assert all(min_quota[lane] <= max_quota[lane] for lane in min_quota)
+    
+    # 5 lanes, 3 slots: the three biggest lanes get one pick each
+    min_quota, _ = selector.lane_quotas(3)
+    assert min_quota == {"stock_market": 1, "crypto_blockchain": 1, "macro_economics": 1, "investing_psychology": 0, "contrarian": 0}
+
+def test_selection_meets_quotas_without_mutating_input():
+    selector = NarrativeSelector()
+    pool = [
+        {"id": "1", "title": "Stocks rally on earnings", "final_score": 95.0},
+        {"id": "2", "title": "Stocks slide as market cools", "final_score": 90.0},
+        {"id": "3", "title": "Bitcoin breaks out", "final_score": 70.0},
+        {"id": "4", "title": "Fed holds rates", "final_score": 60.0},
+        {"id": "5", "title": "Stocks rally on earnings again", "final_score": 99.0},
+    ]
+    snapshot = [dict(c) for c in pool]
+    
+    plan = selector.select_daily_content(pool, count=3, long_count=1)
+    assert pool == snapshot
+    assert [c["id"] for c in plan["long"] + plan["shorts"]] == ["5", "3", "4"]
+    assert plan["long"][0]["format"] == "long" and all(c["format"] == "short" for c in plan["shorts"])
+    assert plan["lane_distribution"]["crypto_blockchain"] == 1 and plan["lane_distribution"]["macro_economics"] == 1
+
+def test_exact_solver_is_optimal_and_greedy_is_feasible():
+    selector = NarrativeSelector()
+    rng = random.Random(3)
+    
+    for _ in range(25):
+        count = rng.randint(2, 4)
+        pool = make_pool(rng, rng.randint(4, 10))
+        pool.sort(key=lambda c: c["final_score"], reverse=True)
+        scores = [c["final_score"] for c in pool]
+        lanes = [selector._assign_lane(c) for c in pool]
+        tokens = [selector._tokens(c["title"]) for c in pool]
+        min_quota, max_quota = selector.lane_quotas(count)
+        penalty = count * max(scores) + 1
+        
+        def feasible(subset):
+            if any(selector._similar_tokens(tokens[i], tokens[j]) for i, j in itertools.combinations(subset, 2)):
+                return False
+            usage = {}
+            for i in sorted(subset):
+                if not selector._allowed(scores[i], usage.get(lanes[i], 0), lanes[i], max_quota):
+                    return False
+                usage[lanes[i]] = usage.get(lanes[i], 0) + 1
+            return True
+        
+        def value(subset):
+            usage = {}
+            for i in subset:
+                usage[lanes[i]] = usage.get(lanes[i], 0) + 1
+            shortfall = sum(max(q - usage.get(lane, 0), 0) for lane, q in min_quota.items())
+            return sum(scores[i] for i in subset) - penalty * shortfall
+        
+        best = max(
+            value(subset)
+            for k in range(count + 1)
+            for subset in itertools.combinations(range(len(pool)), k)
+            if feasible(subset)
+        )
+        exact = selector._solve_exact(scores, lanes, tokens, count, min_quota, max_quota)
+        greedy = selector._solve_greedy(scores, lanes, tokens, count, min_quota, max_quota)
+        assert feasible(exact) and value(exact) == pytest.approx(best)
+        assert feasible(greedy) and value(greedy) <= value(exact) + 1e-9
+
+def test_calendar_planner_fills_week_and_replans_incrementally(tmp_path):
+    from datetime import datetime
+    from src.decision import CalendarPlanner
+    
+    schedule = {
+        "shorts": {"daily_count": 2, "publish_times_utc": [{"hour": 10, "minute": 0}], "days_active": ["monday", "wednesday"]},
+        "longform": {"daily_count": 1, "publish_times_utc": [{"hour": 10, "minute": 5}], "days_active": ["monday"]},
+    }
+    planner = CalendarPlanner(NarrativeSelector(), schedule, path=str(tmp_path / "calendar.json"))
+    monday = datetime(2026, 10, 19, 8, 0)
+    pool = [
+        {"candidate_id": "a", "title": "Bitcoin breaks record high", "final_score": 120.0},
+        {"candidate_id": "b", "title": "Fed signals rate cut", "final_score": 110.0},
+        {"candidate_id": "c", "title": "Stocks rally on earnings", "final_score": 100.0},
+        {"candidate_id": "d", "title": "Inflation cools in October", "final_score": 90.0},
+        {"candidate_id": "e", "title": "Ethereum upgrade goes live", "final_score": 80.0},
+        {"candidate_id": "f", "title": "Low scorer", "final_score": 40.0},
+    ]
+    
+    stats = planner.update(pool, now=monday)
+    assert stats["slots"] == 5 and stats["planned"] == 5 and stats["backlog"] == 5
+    
+    plan = planner.take_today(now=monday)
+    assert [c["slot_id"] for c in plan["long"] + plan["shorts"]] == ["2026-10-19:long:0", "2026-10-19:short:0", "2026-10-19:short:1"]
+    assert plan["long"][0]["title"] == "Bitcoin breaks record high"
+    # Nothing is consumed until the run commits: a failed day gets the same slots back
+    assert planner.take_today(now=monday) == plan
+    planner.commit([c["slot_id"] for c in plan["long"] + plan["shorts"]])
+    assert planner.take_today(now=monday)["total_selected"] == 0
+    
+    # Wednesday's slots survive a reload; only a clearly better newcomer displaces a planned topic
+    planner = CalendarPlanner(NarrativeSelector(), schedule, path=str(tmp_path / "calendar.json"))
+    before = {c["slot_id"]: c["title"] for c in planner.get_calendar(now=monday)}
+    stats = planner.update([{"candidate_id": "g", "title": "Crypto market shock explained", "final_score": 200.0}], now=monday)
+    after = {c["slot_id"]: c["title"] for c in planner.get_calendar(now=monday)}
+    assert stats["displaced"] == 1 and stats["replanned"] == 1
+    assert "Crypto market shock explained" in after.values()
+    assert sum(before[s] != after[s] for s in before) == 1
+
+def test_calendar_planner_keeps_slots_beyond_ttl_across_the_week(tmp_path):
+    from datetime import datetime, timedelta
+    from src.decision import CalendarPlanner
+    
+    schedule = {
+        "shorts": {"daily_count": 1, "publish_times_utc": [{"hour": 10, "minute": 0}], "days_active": ["monday", "wednesday", "friday"]},
+        "longform": {"daily_count": 0, "days_active": []},
+        "calendar": {"horizon_days": 7, "backlog_ttl_hours": 72},
+    }
+    path = str(tmp_path / "calendar.json")
+    monday = datetime(2026, 10, 19, 8, 0)
+    pool = [
+        {"candidate_id": "a", "title": "Bitcoin breaks record high", "final_score": 120.0},
+        {"candidate_id": "b", "title": "Fed signals rate cut", "final_score": 110.0},
+        {"candidate_id": "c", "title": "Inflation cools in October", "final_score": 100.0},
+    ]
+    CalendarPlanner(NarrativeSelector(), schedule, path=path).update(pool, now=monday)
+    
+    published = {}
+    for offset in range(5): # Monday to Friday, one run a day with nothing new
+        now = monday + timedelta(days=offset)
+        planner = CalendarPlanner(NarrativeSelector(), schedule, path=path)
+        planner.update([], now=now)
+        plan = planner.take_today(now=now)
+        planner.commit([c["slot_id"] for c in plan["shorts"]])
+        published.update({c["slot_id"][:10]: c["title"] for c in plan["shorts"]})
+    
+    # Friday's topic was planned 96 h ahead, past the 72 h TTL, and still made its slot
+    assert published == {
+        "2026-10-19": "Bitcoin breaks record high",
+        "2026-10-21": "Fed signals rate cut",
+        "2026-10-23": "Inflation cools in October",
+    }
+    assert not CalendarPlanner(NarrativeSelector(), schedule, path=path).update([], now=monday + timedelta(days=5))["backlog"]
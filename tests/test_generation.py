@@ -34,6 +34,16 @@ def test_generate_content():
     assert "metadata" in result
     assert len(result["hooks"]) >= 3
 
+def test_video_id_differs_per_channel_and_candidate():
+    generator = ContentGenerator()
+    topic = {"candidate_id": "c1", "title": "Fed hikes rates"}
+    ids = {
+        generator._generate_video_id(dict(topic, channel_id="finance")),
+        generator._generate_video_id(dict(topic, channel_id="crypto")),
+        generator._generate_video_id(dict(topic, channel_id="finance", candidate_id="c2")),
+    }
+    assert len(ids) == 3
+
 def test_generate_edg():
     generator = ContentGenerator()
     topic = {
@@ -47,3 +57,484 @@ def test_generate_edg():
     assert edg["format"] == "short"
     assert edg["aspect_ratio"] == "9:16"
     assert len(edg["scenes"]) > 0
+
+def test_edg_compiler_segments_markers_and_visual_changes():
+    from src.generation import EDGCompiler
+
+    script = (
+        "[0:00] The Fed cut rates by 0.5% today. [VISUAL CHANGE] Bond yields fell to 3.9 percent.\n"
+        "[0:15] Housing markets react first. [B-roll: construction site]\n"
+        "[0:30] Subscribe for more insights"
+    )
+    # 7 and 6 words share the 15 s up to the next marker
+    edg = EDGCompiler(words_per_second=2.5, min_scene_seconds=2.0).compile("vid_1", "long", script, ["Hook"], "Rate cuts")
+    scenes = edg["scenes"]
+    assert [(s["type"], s["start"], s["end"]) for s in scenes] == [
+        ("intro", 0.0, 8.08), ("data", 8.08, 15.0), ("main", 15.0, 30.0), ("conclusion", 30.0, 32.0),
+    ]
+    assert scenes[1]["text_overlay"] == "3.9 percent" and scenes[1]["source_hint"] == "chart:bond yields"
+    assert scenes[2]["tts_text"] == "Housing markets react first." # stage directions aren't spoken
+    assert scenes[0]["text_overlay"] == "Hook" and scenes[1]["cut_type"] == "hard"
+    assert edg["duration_seconds"] == 32 and edg["aspect_ratio"] == "16:9"
+
+def test_edg_compiler_hashes_ignore_timeline_position():
+    from src.generation import EDGCompiler
+
+    compiler = EDGCompiler()
+    first = compiler.compile("v", "short", "HOOK: Rates are falling.\n\nMAIN: Yields follow.\n\nCONCLUSION: Subscribe.", ["Hook"])
+    edited = compiler.compile("v", "short", "HOOK: Rates are falling fast, faster than expected.\n\nMAIN: Yields follow.\n\nCONCLUSION: Subscribe.", ["Hook"])
+    assert [s["tts_text"] for s in first["scenes"]] == ["Rates are falling.", "Yields follow.", "Subscribe."]
+    # Only the edited scene changes; the later ones move in time but keep their hashes
+    assert first["scenes"][0]["content_hash"] != edited["scenes"][0]["content_hash"]
+    assert edited["scenes"][1]["start"] > first["scenes"][1]["start"]
+    assert [s["content_hash"] for s in first["scenes"][1:]] == [s["content_hash"] for s in edited["scenes"][1:]]
+
+def test_generate_batch_keeps_order_and_runs_concurrently(monkeypatch):
+    import threading
+    import time
+
+    generator = ContentGenerator()
+    generator.max_workers = 4
+    generator.mode = "sequential"
+    generator.llm_client.stream = False
+    monkeypatch.setattr(generator.llm_client, "reserve", lambda calls: True)
+
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_generate(prompt, system_prompt=None, reserved=False, response_format=None, **limits):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.pop()
+        if "hooks" in prompt:
+            return '["Hook one", "Hook two", "Hook three"]'
+        return "Script body"
+
+    monkeypatch.setattr(generator.llm_client, "generate", fake_generate)
+    topics = [{"id": f"t{i}", "title": f"Topic {i}", "format": "short"} for i in range(8)]
+
+    start = time.time()
+    results = generator.generate_batch(topics)
+    elapsed = time.time() - start
+
+    assert [r["topic"]["id"] for r in results] == [t["id"] for t in topics]
+    assert all(r["script"] == "Script body" for r in results)
+    assert max(peak) <= 4
+    assert elapsed < 8 * 2 * 0.05
+
+def test_generate_batch_fallbacks_follow_input_order(monkeypatch):
+    generator = ContentGenerator()
+    generator.mode = "sequential"
+    generator.llm_client.stream = False
+    budget = {"calls": 4}
+
+    def fake_reserve(calls):
+        if budget["calls"] < calls:
+            return False
+        budget["calls"] -= calls
+        return True
+
+    monkeypatch.setattr(generator.llm_client, "reserve", fake_reserve)
+    monkeypatch.setattr(generator.llm_client, "generate", lambda prompt, system_prompt=None, reserved=False, response_format=None, **limits: (
+        '["LLM hook one", "LLM hook two", "LLM hook three"]' if "hooks" in prompt else "LLM script"
+    ))
+    topics = [{"id": f"t{i}", "title": f"Topic {i}", "format": "short"} for i in range(4)]
+
+    results = generator.generate_batch(topics)
+
+    assert [r["script"] == "LLM script" for r in results] == [True, True, False, False]
+    assert results[2]["hooks"] == generator.template_engine.generate_hooks(topics[2])
+    assert generator.last_batch_stats["template_only"] == 2
+
+def test_llm_cache_samples_ttl_and_eviction(tmp_path):
+    import time
+    from src.generation import LLMCache
+
+    cache = LLMCache(path=str(tmp_path / "llm.json"), samples_per_key=2, max_entries=2)
+    key = LLMCache.key("model", "system", "prompt", 0.7, 4000)
+    assert key == LLMCache.key("model", "system", "prompt", 0.7, 4000)
+    assert key != LLMCache.key("model", "system", "prompt", 0.2, 4000)
+
+    cache.store(key, "first", cost_usd=0.01)
+    assert cache.lookup(key) is None # Key not full yet: go to the API for variety
+    cache.store(key, "second", cost_usd=0.01)
+    assert [cache.lookup(key) for _ in range(3)] == ["first", "second", "first"]
+    assert cache.get_stats()["usd_saved"] == 0.03
+
+    cache.store("other", "x")
+    cache.store("newest", "y")
+    cache.entries["other"]["last_used"] = 0
+    cache.save()
+    reloaded = LLMCache(path=str(tmp_path / "llm.json"), samples_per_key=2, max_entries=2)
+    assert set(reloaded.entries) == {key, "newest"}
+
+    reloaded.entries[key]["created"] = time.time() - 31 * 86400
+    assert reloaded.lookup(key) is None
+
+def test_llm_cache_skips_samples_from_other_models(tmp_path):
+    from src.generation import LLMCache
+
+    cache = LLMCache(path=str(tmp_path / "llm.json"), samples_per_key=1)
+    key = LLMCache.key("primary", "system", "prompt", 0.7, 4000)
+    cache.store(key, "fallback answer", model="backup") # primary failed over
+    assert cache.lookup(key, model="primary") is None
+    cache.store(key, "primary answer", model="primary")
+    assert cache.lookup(key, model="primary") == "primary answer"
+
+    cache.entries["legacy"] = {"samples": ["old"], "created": cache.entries[key]["created"]}
+    assert cache.lookup("legacy", model="primary") is None
+
+def test_llm_client_cache_and_replay_only(tmp_path, monkeypatch):
+    from src.generation import LLMCache, LLMClient
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    cache = LLMCache(path=str(tmp_path / "llm.json"))
+    client = LLMClient(cache=cache)
+    calls = []
+
+    class FakeResponse:
+        status_code = 200
+        def json(self):
+            return {"choices": [{"message": {"content": "fresh"}}], "usage": {"prompt_tokens": 1000, "completion_tokens": 1000}}
+
+    def fake_post(url, **kwargs):
+        calls.append(kwargs["json"])
+        return FakeResponse()
+
+    from src.shared import http_client
+    monkeypatch.setattr(http_client, "post", fake_post)
+
+    assert client.generate("prompt", "system", reserved=True) == "fresh"
+    assert client.generate("prompt", "system", reserved=True) == "fresh"
+    assert len(calls) == 1
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["usd_saved"] > 0
+    cache.save()
+
+    monkeypatch.setenv("LLM_REPLAY_ONLY", "1")
+    replay = LLMClient(cache=LLMCache(path=str(tmp_path / "llm.json"), replay_only=True))
+    assert replay.reserve(2)
+    assert replay.generate("prompt", "system") == "fresh"
+    assert replay.generate("unseen prompt", "system") is None
+    assert len(calls) == 1
+
+def test_repair_json():
+    from src.generation.json_repair import repair_json
+
+    assert repair_json('```json\n{"a": [1, 2,], "b": "x"}\n```') == {"a": [1, 2], "b": "x"}
+    assert repair_json('Here you go: {"a": 1} Hope it helps') == {"a": 1}
+    assert repair_json('{"script": "line one\nline two"}') == {"script": "line one\nline two"}
+    # Truncated: complete fields survive, the half-written last value is dropped
+    assert repair_json('{"hooks": ["one", "two", "three"], "titles": ["t1", "t2"], "script": "[0:00] Hel') == {
+        "hooks": ["one", "two", "three"], "titles": ["t1", "t2"],
+    }
+    assert repair_json('{"a": {"b": [1, 2], "c": 3, "d') == {"a": {"b": [1, 2], "c": 3}}
+    assert repair_json("no json here") is None
+
+def test_generate_combined_single_call_with_field_fallbacks(monkeypatch):
+    generator = ContentGenerator()
+    generator.mode = "combined"
+    generator.llm_client.stream = False
+    requests = []
+
+    def fake_generate(prompt, system_prompt=None, reserved=False, response_format=None, **limits):
+        requests.append(response_format)
+        # Truncated mid-tags: hooks and titles complete, description/script missing
+        return '{"hooks": ["H1 hook", "H2 hook", "H3 hook"], "titles": ["T1", "T2"], "tags": ["a", "b'
+
+    monkeypatch.setattr(generator.llm_client, "generate", fake_generate)
+    monkeypatch.setattr(generator.llm_client, "reserve", lambda calls: calls == 1)
+    topic = {"id": "t1", "title": "Rate cuts", "format": "short", "narrative_lane": "hidden_data"}
+
+    result = generator.generate_batch([topic])[0]
+
+    assert len(requests) == 1
+    assert requests[0]["json_schema"]["schema"]["required"] == ["hooks", "titles", "description", "tags", "script"]
+    assert result["hooks"] == ["H1 hook", "H2 hook", "H3 hook"]
+    assert result["metadata"]["titles"] == ["T1", "T2"]
+    assert result["metadata"]["tags"] == ["a"]
+    assert result["script"] == generator.template_engine.generate_script(topic, "short")
+    assert result["metadata"]["description"].startswith("H1 hook")
+
+def test_script_sections_streamed_match_whole():
+    from src.generation.script_sections import ScriptSectionParser
+
+    script = "Hook first.\n[0:00] Intro [VISUAL CHANGE]\n[0:15] The data\n[0:40] Subscribe for more insights"
+    emitted = []
+    streamed = ScriptSectionParser(on_section=lambda section: emitted.append(section["index"]))
+    for end in range(1, len(script) + 1, 5):
+        streamed.feed(script[:end])
+    assert emitted == [0, 1] # the last section is only complete at the end
+    assert streamed.finish(script) == ScriptSectionParser().finish(script)
+    assert [(s["start"], s["text"]) for s in streamed.sections] == [
+        (0.0, "Hook first. Intro [VISUAL CHANGE]"), (15.0, "The data"), (40.0, "Subscribe for more insights"),
+    ]
+    # A replaced script is parsed from scratch
+    assert [s["text"] for s in streamed.finish("Template script")] == ["Template script"]
+
+def _stub_client(monkeypatch, tmp_path, url):
+    from src.generation import LLMCache, LLMClient
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    client = LLMClient(cache=LLMCache(path=str(tmp_path / "llm.json")))
+    client.base_url = url
+    return client
+
+def test_llm_client_stream_against_stub(monkeypatch, tmp_path):
+    from tests.llm_stub import LLMStub, split_chunks
+
+    text = '["Hook number one", "Hook number two", "Hook number three"]'
+    with LLMStub(split_chunks(text, 7)) as stub:
+        client = _stub_client(monkeypatch, tmp_path, stub.url)
+        seen = []
+        assert client.generate_stream("prompt", "system", reserved=True, on_text=lambda t: seen.append(t) or True) == text
+        assert stub.requests[0]["stream"] is True
+        assert len(seen) == len(stub.chunks) and seen[-1] == text
+        # Second call is served from the cache
+        assert client.generate_stream("prompt", "system", reserved=True) == text
+        assert len(stub.requests) == 1
+
+def test_llm_client_stream_aborts_malformed_and_over_length(monkeypatch, tmp_path):
+    from tests.llm_stub import LLMStub, split_chunks
+
+    chunks = split_chunks("I'm sorry, but I can't produce that JSON package for you right now. " * 4, 4)
+    with LLMStub(chunks, delay=0.005) as stub:
+        client = _stub_client(monkeypatch, tmp_path, stub.url)
+        assert client.generate_stream("p", reserved=True, on_text=ContentGenerator._stream_watcher("{")) is None
+        assert client.generate_stream("p2", reserved=True, max_chars=20) is None
+    assert stub.chunks_sent < 2 * len(chunks)
+    assert client.cache.entries == {}
+
+def test_streamed_combined_builds_scenes_while_arriving(monkeypatch, tmp_path):
+    import json
+    from tests.llm_stub import LLMStub, split_chunks
+
+    package = json.dumps({
+        "hooks": ["First hook here", "Second hook here", "Third hook here"],
+        "titles": ["Title A", "Title B"],
+        "description": "Description",
+        "tags": ["finance"],
+        "script": "[0:00] Intro line\n[0:15] The data section\n[0:40] Subscribe for more insights",
+    })
+    with LLMStub(split_chunks(package, 10), delay=0.002) as stub:
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        generator = ContentGenerator()
+        generator.mode = "combined"
+        generator.llm_client.stream = True
+        generator.llm_client.base_url = stub.url
+        from src.generation import LLMCache
+        generator.llm_client.cache = LLMCache(path=str(tmp_path / "llm.json"))
+        generator.llm_client.router.state_path = tmp_path / "latency.json"
+        generator.llm_client.ledger.path = tmp_path / "spend.json"
+        monkeypatch.setattr(generator.llm_client, "reserve", lambda calls: True)
+
+        progress = []
+        add_section = generator._add_section
+        monkeypatch.setattr(generator, "_add_section", lambda compiled, section: (progress.append(stub.chunks_sent), add_section(compiled, section)))
+
+        topic = {"id": "t1", "title": "Rate cuts", "format": "long", "narrative_lane": "hidden_data"}
+        result = generator.generate_batch([topic])[0]
+
+    assert progress[0] < len(stub.chunks) # the first scene was built mid-stream
+    scenes = result["edg"]["scenes"]
+    assert [(s["type"], s["start"], s["end"]) for s in scenes] == [
+        ("intro", 0.0, 15.0), ("main", 15.0, 40.0), ("conclusion", 40.0, 42.0),
+    ]
+    assert scenes[1]["tts_text"] == "The data section"
+    assert result["metadata"]["titles"] == ["Title A", "Title B"]
+
+def test_latency_histogram_percentiles_follow_recent_samples():
+    from src.generation import LatencyHistogram
+
+    histogram = LatencyHistogram(decay=0.98)
+    assert histogram.percentile(90) is None
+    for _ in range(100):
+        histogram.record(0.1)
+    assert 0.1 <= histogram.percentile(90) <= 0.125
+    for _ in range(200):
+        histogram.record(2.0)
+    assert 2.0 <= histogram.percentile(50) <= 2.5
+
+def _router(models, **hedging):
+    from src.generation import ModelRouter, ModelSpec
+
+    config = {"initial_delay_seconds": 0.1, "min_delay_seconds": 0.05, "min_samples": 5}
+    config.update(hedging)
+    return ModelRouter([ModelSpec(m, timeout_seconds=t) for m, t in models], hedging=config)
+
+def test_router_hedges_slow_primary(monkeypatch, tmp_path):
+    import random
+    import time
+    from src.generation import LLMCache, LLMClient
+    from tests.llm_stub import LLMStub
+
+    rng = random.Random(3)
+    latency = {"slow": lambda: 1.0 + rng.random() * 0.2, "fast": lambda: rng.random() * 0.02}
+    with LLMStub(['["a", "b", "c"]'], latency=lambda model: latency[model]()) as stub:
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        router = _router([("slow", 3), ("fast", 3)])
+        client = LLMClient(cache=LLMCache(path=str(tmp_path / "llm.json"), enabled=False), router=router)
+        client.base_url = stub.url
+
+        start = time.time()
+        assert client.generate("prompt", reserved=True) == '["a", "b", "c"]'
+        assert client.generate_stream("prompt 2", reserved=True) == '["a", "b", "c"]'
+        assert time.time() - start < 1.0
+    stats = router.get_stats()
+    assert stats["fast"]["hedge_wins"] == 2
+    assert stats["slow"]["wins"] == 0
+
+def test_router_does_not_hedge_a_stream_that_has_started(monkeypatch, tmp_path):
+    import time
+    from src.generation import LLMCache, LLMClient
+    from tests.llm_stub import LLMStub
+
+    # The primary's first chunk arrives well inside the hedge delay, the whole stream well after it
+    with LLMStub(["one ", "two ", "three ", "four ", "five"], delay=0.1) as stub:
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        router = _router([("a", 3), ("b", 3)], initial_delay_seconds=0.25)
+        client = LLMClient(cache=LLMCache(path=str(tmp_path / "llm.json"), enabled=False), router=router)
+        client.base_url = stub.url
+        admitted = []
+        monkeypatch.setattr(client, "_admit_extra", lambda *args: admitted.append(True) or True)
+
+        start = time.time()
+        assert client.generate_stream("prompt", reserved=True) == "one two three four five"
+        assert time.time() - start > 0.25
+    assert [r["model"] for r in stub.requests] == ["a"]
+    assert admitted == []
+    stats = router.get_stats()
+    assert stats["b"]["hedges"] == 0 and stats["a"]["wins"] == 1
+
+def test_router_fails_over_after_model_timeout(monkeypatch, tmp_path):
+    from src.generation import LLMCache, LLMClient
+    from tests.llm_stub import LLMStub
+
+    with LLMStub(["fallback answer"], latency=lambda model: 1.0 if model == "stalled" else 0.0) as stub:
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        router = _router([("stalled", 0.2), ("backup", 2)], enabled=False)
+        client = LLMClient(cache=LLMCache(path=str(tmp_path / "llm.json"), enabled=False), router=router)
+        client.base_url = stub.url
+        assert client.generate("prompt", reserved=True) == "fallback answer"
+    stats = router.get_stats()
+    assert stats["stalled"]["failures"] == 1
+    assert stats["backup"]["wins"] == 1 and stats["backup"]["hedges"] == 0
+
+def test_router_admits_extra_requests_only_when_a_model_is_left():
+    router = _router([("primary", 1), ("backup", 1)])
+    admitted = []
+    def admit_extra(model):
+        admitted.append(model.id)
+        return True
+
+    # Both models fail: one failover is admitted, the exhausted chain charges nothing more
+    assert router.run(lambda model, first_output: None, admit_extra=admit_extra) == (None, None)
+    assert len(admitted) == 1
+    assert router.run(lambda model, first_output: None, admit_extra=admit_extra, models=["backup"]) == (None, None)
+    assert len(admitted) == 1
+
+def test_router_hedge_delay_adapts_to_latency():
+    router = _router([("primary", 10), ("secondary", 10)], percentile=90, max_delay_seconds=8.0)
+    primary = router.models[0]
+    assert router.hedge_delay(primary) == 0.1 # too few samples: the configured initial delay
+    for _ in range(30):
+        router._record(primary, False, 0.3)
+    assert 0.3 <= router.hedge_delay(primary) <= 0.4
+    for _ in range(300):
+        router._record(primary, False, 3.0)
+    assert 3.0 <= router.hedge_delay(primary) <= 3.75
+    assert router.hedge_delay(primary, stream=True) == 0.1 # streamed latency is tracked separately
+
+def test_estimate_tokens():
+    from src.generation import estimate_tokens
+
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * 400) == 100
+    assert estimate_tokens("a b c d e f g h i j") == 13 # short words: ~1.3 tokens each
+
+def test_cost_ledger_caps_and_persistence(tmp_path):
+    from datetime import datetime
+    from src.generation import CostLedger
+
+    path = tmp_path / "spend.json"
+    ledger = CostLedger(path=str(path), max_daily_usd=1.0, max_monthly_usd=1.5)
+    ledger.record("m", 1000, 2000, 0.75, now=datetime(2026, 3, 1))
+    ledger.record("m", 1000, 0, 0.5, estimated=True, now=datetime(2026, 3, 2))
+    assert ledger.remaining_usd(now=datetime(2026, 3, 2)) == 0.25 # daily cap
+    ledger.record("n", 10, 10, 0.1, now=datetime(2026, 3, 3))
+    assert abs(ledger.remaining_usd(now=datetime(2026, 3, 3)) - 0.15) < 1e-9 # monthly cap
+    assert ledger.remaining_usd(now=datetime(2026, 4, 1)) == 1.0
+    ledger.retention_days = 100000
+    ledger.save()
+
+    reloaded = CostLedger(path=str(path), max_daily_usd=1.0, max_monthly_usd=1.5)
+    day = reloaded.days["2026-03-02"]
+    assert day["calls"] == 1 and day["estimated_calls"] == 1 and day["prompt_tokens"] == 1000
+    assert abs(reloaded.spent_month(now=datetime(2026, 3, 15)) - 1.35) < 1e-9
+
+def test_llm_client_records_spend_for_every_call(monkeypatch, tmp_path):
+    from tests.llm_stub import LLMStub
+    from src.generation import CostLedger
+
+    with LLMStub(["answer"], usage={"prompt_tokens": 1000, "completion_tokens": 2000}) as stub:
+        client = _stub_client(monkeypatch, tmp_path, stub.url)
+        client.ledger = CostLedger(path=str(tmp_path / "spend.json"), max_daily_usd=10.0)
+        primary = client.router.models[0]
+        assert client.generate("prompt", reserved=True) == "answer"
+        assert client.generate_stream("prompt 2", reserved=True) == "answer"
+        assert client.ledger.run_calls == 2
+        assert abs(client.ledger.run_usd - 2 * primary.cost({"prompt_tokens": 1000, "completion_tokens": 2000})) < 1e-9
+
+        client.ledger.max_daily_usd = client.ledger.run_usd # spent: no further requests
+        assert client.generate("prompt 3", reserved=True) is None
+        assert len(stub.requests) == 2
+
+def _planner(remaining, min_max_tokens=None):
+    from src.generation import BudgetPlanner, CostLedger, ModelSpec
+
+    ledger = CostLedger(path="unused.json", max_daily_usd=remaining)
+    models = [ModelSpec("big", 10, 0.001, 0.01), ModelSpec("small", 5, 0.0001, 0.001)]
+    return BudgetPlanner(ledger, models, 4000, min_max_tokens or {"short": 1000, "long": 2500})
+
+def test_budget_planner_fits_caps_downgrades_and_templates():
+    requests = [{"prompt_tokens": 1000, "calls": 1, "format": "short"} for _ in range(3)]
+
+    planner = _planner(1.0)
+    assert planner.plan(requests) == [{"models": ["big", "small"], "max_tokens": 4000}] * 3
+    assert not planner.last_plan["capped"] and not planner.last_plan["downgraded"]
+
+    # 3 x (0.001 + 2000 tokens x 0.01/1k) = 0.063: the completion cap drops to 2000
+    plan = _planner(0.063).plan(requests)
+    assert abs(plan[0]["max_tokens"] - 2000) <= 1 and plan[0]["models"] == ["big", "small"]
+
+    # Even the floor doesn't fit on the primary: the cheaper model, with no pricier failover
+    planner = _planner(0.01)
+    plan = planner.plan(requests)
+    assert plan[0]["models"] == ["small"] and planner.last_plan["downgraded"]
+
+    # Not even that for all three: the tail goes to templates, in input order
+    planner = _planner(0.0025)
+    plan = planner.plan(requests)
+    assert [p is not None for p in plan] == [True, True, False]
+    assert planner.last_plan["template_topics"] == 1
+
+    assert _planner(0.0).plan(requests) == [None, None, None]
+
+def test_budget_planner_and_client_keep_room_for_extra_requests(tmp_path):
+    from src.generation import BudgetPlanner, CostLedger, LLMCache, LLMClient, ModelRouter, ModelSpec
+
+    requests = [{"prompt_tokens": 1000, "calls": 1, "format": "short"} for _ in range(3)]
+    ledger = CostLedger(path=str(tmp_path / "spend.json"), max_daily_usd=0.063)
+    models = [ModelSpec("big", 10, 0.001, 0.01), ModelSpec("small", 5, 0.0001, 0.001)]
+    # Half a request of headroom per call: the completion cap drops from ~2000 to ~1300
+    plan = BudgetPlanner(ledger, models, 4000, extra_request_ratio=0.5).plan(requests)
+    assert abs(plan[0]["max_tokens"] - 1300) <= 1
+
+    client = LLMClient(cache=LLMCache(path=str(tmp_path / "llm.json"), enabled=False), router=ModelRouter(models), ledger=ledger)
+    messages = client._messages("x" * 4000, None) # ~1000 prompt tokens
+    assert client._admit_extra(models[1], messages, 4000) # ~0.0041 worst case
+    assert not client._admit_extra(models[0], messages, 8000) # ~0.081 worst case
@@ -0,0 +1,72 @@
+from src.generation import EDGCompiler
+from src.production import VideoAssembler
+
+def test_assembler_renders_each_scene_once_and_reuses_unchanged(monkeypatch, tmp_path):
+    assembler = VideoAssembler()
+    assembler.scene_dir = tmp_path
+    rendered = []
+
+    def fake_render(scene, width, height):
+        rendered.append(scene["content_hash"])
+        (tmp_path / f"{scene['content_hash']}.mp4").write_text("scene")
+        return True
+
+    monkeypatch.setattr(assembler, "_render_scene", fake_render)
+    monkeypatch.setattr(assembler, "_concat_scenes", lambda paths, output: all(p.exists() for p in paths))
+
+    compiler = EDGCompiler()
+    script = "[0:00] Rates are falling. [VISUAL CHANGE] Yields follow.\n[0:10] Yields follow.\n[0:20] Subscribe."
+    edg = compiler.compile("vid_1", "short", script, ["Hook"])
+    assert assembler._render_scenes(edg, tmp_path / "vid_1.mp4")
+    assert assembler.last_render_stats["rendered"] == len(set(rendered)) == len(rendered)
+
+    edited = compiler.compile("vid_1", "short", script.replace("Subscribe.", "Subscribe for more insights."), ["Hook"])
+    rendered.clear()
+    assert assembler._render_scenes(edited, tmp_path / "vid_1.mp4")
+    assert len(rendered) == 1 # only the changed conclusion
+    assert assembler.last_render_stats["reused"] == len(edited["scenes"]) - 1
+
+def test_scene_command_reads_overlay_from_file(tmp_path):
+    assembler = VideoAssembler()
+    assembler.scene_dir = tmp_path
+    scene = {"content_hash": "abc123", "text_overlay": "Yields: 0.5% (it's up)"}
+
+    cmd = assembler._scene_command(scene, 1080, 1920, 4.0, None, tmp_path / "abc123.tmp.mp4")
+    vf = cmd[cmd.index("-vf") + 1]
+    assert vf.startswith(f"drawtext=textfile='{(tmp_path / 'abc123.txt').as_posix()}':expansion=none:")
+    assert "%" not in vf and "0.5" not in vf # the text itself never reaches the filtergraph
+    assert (tmp_path / "abc123.txt").read_text() == "Yields: 0.5% (it's up)"
+
+def test_scenes_sharing_narration_get_their_own_audio(monkeypatch, tmp_path):
+    import subprocess
+
+    assembler = VideoAssembler()
+    assembler.scene_dir = tmp_path
+    audio = []
+    monkeypatch.setattr(assembler.tts, "generate_audio", lambda text, name="tts", duration=5.0: audio.append((name, duration)))
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 1, "", "no ffmpeg"))
+
+    edg = EDGCompiler().compile("vid_1", "short", "[0:00] Rates are falling. [VISUAL CHANGE] Yields follow.\n[0:10] Yields follow.\n[0:20] Subscribe.")
+    same = [s for s in edg["scenes"] if s["tts_text"] == "Yields follow."]
+    assert len(same) == 2 and same[0]["duration"] != same[1]["duration"]
+    for scene in same:
+        assembler._render_scene(scene, 1080, 1920)
+    assert [name for name, _ in audio] == [s["content_hash"] for s in same]
+    assert len({name for name, _ in audio}) == 2
+
+def test_upload_quota_persists_across_publisher_instances(tmp_path):
+    from src.publishing import YouTubePublisher
+    
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"x")
+    make = lambda: YouTubePublisher(
+        channel_id="finance", credentials={"client_id": "id"}, queue_dir=str(tmp_path / "queue"),
+        records_dir=str(tmp_path / "records"), daily_upload_quota=2,
+    )
+    
+    publisher = make()
+    statuses = [publisher.publish_video(str(video), {"video_id": f"v{i}"})["status"] for i in range(2)]
+    # A later run the same day (e.g. recovery) doesn't get a fresh quota
+    later = make().publish_video(str(video), {"video_id": "v2"})
+    assert statuses == ["published", "published"]
+    assert "status" not in later and (tmp_path / "queue" / "queue_v2.json").exists()
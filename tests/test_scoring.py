@@ -1,13 +1,17 @@
 import pytest
-from src.scoring import VPSScorer
+from src.scoring import VPSScorer, ScoreCache
 
-def test_scorer_init():
-    scorer = VPSScorer()
+def _scorer(tmp_path, **kwargs):
+    # Keep the score cache out of the working tree
+    return VPSScorer(score_cache=ScoreCache(path=str(tmp_path / "score_cache.json")), **kwargs)
+
+def test_scorer_init(tmp_path):
+    scorer = _scorer(tmp_path)
     assert scorer is not None
     assert sum(scorer.weights.values()) == pytest.approx(1.0, 0.01)
 
-def test_score_single():
-    scorer = VPSScorer()
+def test_score_single(tmp_path):
+    scorer = _scorer(tmp_path)
     candidate = {
         "id": "test_1",
         "title": "AI investment opportunities",
@@ -22,8 +26,8 @@ def test_score_single():
     assert "final_score" in result
     assert 0 <= result["base_vps"] <= 100
 
-def test_niche_detection():
-    scorer = VPSScorer()
+def test_niche_detection(tmp_path):
+    scorer = _scorer(tmp_path)
     candidate = {
         "id": "1",
         "title": "Cryptocurrency market analysis",
@@ -32,8 +36,8 @@ def test_niche_detection():
     result = scorer.score_single(candidate)
     assert result["niche"] == "crypto"
 
-def test_score_batch():
-    scorer = VPSScorer()
+def test_score_batch(tmp_path):
+    scorer = _scorer(tmp_path)
     candidates = [
         {"id": "1", "title": "AI news", "emotional_vector": "surprise"},
         {"id": "2", "title": "Finance update", "emotional_vector": "concern"},
@@ -41,3 +45,116 @@ def test_score_batch():
     results = scorer.score_batch(candidates)
     assert len(results) == 2
     assert results[0]["final_score"] >= results[1]["final_score"]  # Sorted
+
+def test_score_batch_matches_score_single(tmp_path):
+    import random
+    from datetime import datetime, timedelta, timezone
+    
+    scorer = _scorer(tmp_path)
+    rng = random.Random(11)
+    now = datetime.now(timezone.utc)
+    words = ["why", "bitcoin", "stocks", "ai", "data", "secret", "startup", "war", "chart", "hidden", "market"]
+    timestamps = [
+        "", "not a date", (now - timedelta(hours=2)).isoformat(),
+        (now - timedelta(hours=30)).isoformat().replace("+00:00", "Z"),
+        (now - timedelta(days=5)).replace(tzinfo=None).isoformat(),
+    ]
+    
+    candidates = []
+    for i in range(200):
+        candidate = {
+            "id": f"c{i}",
+            "title": " ".join(rng.choice(words) for _ in range(rng.randint(1, 6))),
+            "description": " ".join(rng.choice(words) for _ in range(rng.randint(0, 4))),
+            "emotional_vector": rng.choice(["surprise", "concern", "curiosity", "neutral", "awe", "other"]),
+            "explainability_seconds": rng.choice([30, 45, 60, 90]),
+            "timestamp": rng.choice(timestamps),
+            "origin_count": rng.randint(1, 80),
+        }
+        if rng.random() < 0.3:
+            candidate["competitor_count"] = rng.choice([0, 2, 5, 15, 50, 51])
+        candidates.append(candidate)
+    
+    expected = [scorer.score_single(c) for c in candidates]
+    expected = sorted((e for e in expected if e["final_score"] > 0), key=lambda e: e["final_score"], reverse=True)
+    assert scorer.score_batch(candidates) == expected
+
+def test_winners_index_drives_pattern_scores(tmp_path, monkeypatch):
+    import json
+    import zlib
+    import numpy as np
+    from src.memory import WinnersIndex
+    from src.scoring import ScoreCache
+    from src.shared import embedding_service
+    
+    def fake_encode_batch(texts, batch_size=32):
+        calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            v = np.zeros(32)
+            for word in text.lower().split():
+                v[zlib.crc32(word.encode()) % 32] += 1.0
+            vectors.append(v)
+        return vectors
+    calls = []
+    monkeypatch.setattr(embedding_service, "encode_batch", fake_encode_batch)
+    
+    lanes = tmp_path / "narrative_lanes.json"
+    lanes.write_text(json.dumps({"lanes": {
+        "crypto": {"examples": ["Bitcoin halving explained", "Crypto regulation update"]},
+        "macro": {"examples": ["Fed raises rates again", "Inflation data shock"]},
+    }}))
+    records = [
+        {"title": "Why bitcoin halving changes everything", "hook": "Bitcoin is about to halve", "early_signals": {"views_24h": 9000}},
+        {"title": "Quiet day for bonds", "hook": "", "early_signals": {"views_24h": 100}},
+    ]
+    
+    index = WinnersIndex(root=str(tmp_path / "index"))
+    assert index.rebuild(records, [lanes]) == {"winners": 2, "added": 2, "lanes": 2}
+    
+    # Reloaded memory-mapped; a second build with the same data embeds nothing
+    index = WinnersIndex(root=str(tmp_path / "index"))
+    assert isinstance(index.winners, np.memmap)
+    calls.clear()
+    assert index.rebuild(records, [lanes])["added"] == 0
+    assert calls == []
+    
+    scorer = VPSScorer(winners_index=index, score_cache=ScoreCache(path=str(tmp_path / "score_cache.json")))
+    candidates = [
+        {"id": "1", "title": "Bitcoin halving is about to change everything", "emotional_vector": "surprise"},
+        {"id": "2", "title": "Local bakery opens", "emotional_vector": "surprise"},
+    ]
+    results = {r["candidate_id"]: r for r in scorer.score_batch(candidates)}
+    assert results["1"]["components"]["historical_pattern"] > results["2"]["components"]["historical_pattern"]
+    assert results["1"]["components"]["narrative_fit"] > results["2"]["components"]["narrative_fit"]
+    for candidate in candidates:
+        assert scorer.score_single(candidate) == results[candidate["id"]]
+    
+    # Both pattern components come from one embedding of the title
+    calls.clear()
+    scorer.score_single(candidates[0])
+    assert calls == [[candidates[0]["title"]]]
+
+def test_score_cache_reuses_static_parts_and_invalidates_on_config_change(tmp_path):
+    from src.scoring import ScoreCache
+    
+    path = str(tmp_path / "score_cache.json")
+    candidates = [
+        {"id": "1", "title": "Why bitcoin is surging", "description": "Crypto data", "emotional_vector": "surprise", "origin_count": 2},
+        {"id": "2", "title": "Stocks slide", "description": "", "emotional_vector": "concern", "origin_count": 9},
+    ]
+    
+    scorer = VPSScorer(score_cache=ScoreCache(path=path))
+    first = scorer.score_batch(candidates)
+    assert scorer.score_cache.get_stats()["hit_rate"] == 0.0
+    
+    # Next run: same text (case aside) hits the cache; counts still feed saturation
+    rerun = VPSScorer(score_cache=ScoreCache(path=path, config_version=scorer.score_cache.config_version))
+    changed = [dict(candidates[0], title="WHY BITCOIN IS SURGING"), dict(candidates[1], origin_count=1)]
+    results = {r["candidate_id"]: r for r in rerun.score_batch(changed)}
+    assert rerun.score_cache.get_stats()["hits"] == 2
+    assert results["1"]["final_score"] == first[0]["final_score"]
+    assert results["2"] == rerun.score_single(changed[1])
+    
+    stale = ScoreCache(path=path, config_version="other")
+    assert stale.entries == {} and stale.get_stats()["invalidated"]
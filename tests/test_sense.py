@@ -36,3 +36,389 @@ def test_merge_origins():
     result = dedup.merge_origins(trends)
     assert len(result) == 1
     assert result[0]["origin_count"] == 2
+
+class _FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None, content=b""):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.payload
+
+def test_fetch_engine_partial_results(monkeypatch, tmp_path):
+    import time
+    from src.sense import fetch_engine
+    from src.sense.feed_state import FeedStateStore
+    
+    def fake_get(url, headers=None, timeout=None):
+        if "slow" in url:
+            time.sleep(1.0)
+        if "broken" in url:
+            raise IOError("connection reset")
+        return _FakeResponse({"url": url})
+    
+    monkeypatch.setattr(fetch_engine.http_client, "get", fake_get)
+    engine = fetch_engine.FetchEngine(feed_state=FeedStateStore(str(tmp_path / "state.json")))
+    engine.stage_timeout = 0.3
+    
+    jobs = [
+        fetch_engine.FetchJob(name, f"https://{name}.example.com/feed", lambda r: r.json()["url"])
+        for name in ["fast", "slow", "broken"]
+    ]
+    results = engine.fetch_all(jobs)
+    
+    assert results == {"fast": "https://fast.example.com/feed"}
+    assert engine.last_run_stats["timed_out"] == 1
+    assert engine.last_run_stats["failed"] == 1
+
+def test_host_politeness_spacing():
+    import time
+    from src.sense.fetch_engine import HostPoliteness
+    
+    politeness = HostPoliteness(max_concurrent=4, min_interval_seconds=0.05)
+    start = time.time()
+    for _ in range(3):
+        with politeness:
+            pass
+    assert time.time() - start >= 0.1
+
+def test_conditional_fetch_reuses_entries_on_304(monkeypatch, tmp_path):
+    from src.sense import fetch_engine
+    from src.sense.feed_state import FeedStateStore
+    
+    sent_headers = []
+    
+    def fake_get(url, headers=None, timeout=None):
+        sent_headers.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return _FakeResponse(None, status_code=304)
+        return _FakeResponse([{"guid": "a"}, {"guid": "b"}], headers={"ETag": '"v1"'}, content=b"x" * 500)
+    
+    monkeypatch.setattr(fetch_engine.http_client, "get", fake_get)
+    state_path = str(tmp_path / "state.json")
+    job = lambda: fetch_engine.FetchJob("feed", "https://feeds.example.com/rss", lambda r: r.json())
+    
+    first = fetch_engine.FetchEngine(feed_state=FeedStateStore(state_path)).fetch_all([job()])
+    
+    # A fresh engine picks the validators up from disk
+    engine = fetch_engine.FetchEngine(feed_state=FeedStateStore(state_path))
+    second = engine.fetch_all([job()])
+    
+    assert second == first
+    assert sent_headers[-1]["If-None-Match"] == '"v1"'
+    stats = engine.feed_state.summary()["feeds"]["https://feeds.example.com/rss"]
+    assert stats["not_modified_ratio"] == 1.0
+    assert stats["bytes_saved"] == 500
+
+def test_304_without_cached_entries_refetches_and_is_not_counted(monkeypatch, tmp_path):
+    from src.sense import fetch_engine
+    from src.sense.feed_state import FeedStateStore
+    
+    calls = []
+    def fake_get(url, headers=None, timeout=None):
+        calls.append(headers)
+        if len(calls) == 1:
+            return _FakeResponse(None, status_code=304)
+        return _FakeResponse([{"guid": "a"}], headers={"ETag": '"v1"'}, content=b"x" * 500)
+    
+    monkeypatch.setattr(fetch_engine.http_client, "get", fake_get)
+    engine = fetch_engine.FetchEngine(feed_state=FeedStateStore(str(tmp_path / "state.json")))
+    results = engine.fetch_all([fetch_engine.FetchJob("feed", "https://feeds.example.com/rss", lambda r: r.json())])
+    
+    assert results == {"feed": [{"guid": "a"}]}
+    assert len(calls) == 2
+    stats = engine.feed_state.summary()["feeds"]["https://feeds.example.com/rss"]
+    assert stats["not_modified"] == 0 and stats["bytes_saved"] == 0 and stats["requests"] == 1
+
+def test_trend_archive_dedup_and_recent(tmp_path):
+    from src.sense.trend_archive import TrendArchive
+    
+    archive = TrendArchive(root=str(tmp_path / "archive"), legacy_path=str(tmp_path / "none.json"))
+    assert archive.append([{"title": "A"}, {"title": "B"}, {"title": "A"}]) == 2
+    assert archive.append([{"title": "B"}, {"title": "C"}]) == 1
+    
+    # Index survives a reload
+    reloaded = TrendArchive(root=str(tmp_path / "archive"), legacy_path=str(tmp_path / "none.json"))
+    assert reloaded.contains("C")
+    assert [t["title"] for t in reloaded.recent(2, exclude_titles={"C"})] == ["B", "A"]
+
+def test_trend_archive_prunes_whole_segments(tmp_path):
+    from src.sense.trend_archive import TrendArchive
+    
+    root = tmp_path / "archive"
+    root.mkdir()
+    (root / "segment_20000101.jsonl").write_text('{"title": "Old"}\n')
+    
+    archive = TrendArchive(root=str(root), legacy_path=str(tmp_path / "none.json"))
+    assert archive.contains("Old")
+    assert archive.prune() == 1
+    assert not archive.contains("Old")
+    assert not (root / "segment_20000101.jsonl").exists()
+
+def test_seen_store_emits_only_new_entries(tmp_path):
+    from src.sense.seen_store import SeenIdStore
+    
+    store = SeenIdStore(root=str(tmp_path))
+    first = store.filter_new("rss", [{"guid": "a"}, {"guid": "b"}])
+    assert len(first) == 2
+    assert store.last_polled("rss") is not None
+    
+    # Nothing is persisted until the run commits
+    assert len(SeenIdStore(root=str(tmp_path)).filter_new("rss", [{"guid": "a"}])) == 1
+    store.commit()
+    
+    # A new process sees the same history
+    second = SeenIdStore(root=str(tmp_path)).filter_new("rss", [{"guid": "b"}, {"guid": "c"}])
+    assert [item["guid"] for item in second] == ["c"]
+
+def test_registered_sources_declare_budgets():
+    from src.sense import SOURCE_REGISTRY
+    
+    assert {"finance_rss", "reddit_finance"} <= set(SOURCE_REGISTRY)
+    for source_cls in SOURCE_REGISTRY.values():
+        budget = source_cls().describe()
+        assert budget["concurrency"] >= 1
+        assert budget["poll_interval_hours"] > 0
+
+def test_poll_source_passes_only_new_items(tmp_path):
+    from src.sense import TrendSource
+    from src.sense.seen_store import SeenIdStore
+    from src.sense.poll_scheduler import PollScheduler, SourceHealthTracker
+    
+    class FakeSource(TrendSource):
+        name = "fake"
+        poll_interval_hours = 1.0
+        
+        def fetch(self, engine):
+            return [{"guid": "x", "title": "X"}]
+    
+    aggregator = TrendAggregator()
+    aggregator.seen_store = SeenIdStore(root=str(tmp_path))
+    aggregator.health_tracker = SourceHealthTracker(path=str(tmp_path / "health.json"))
+    aggregator.poll_scheduler = PollScheduler(aggregator.health_tracker)
+    source = FakeSource()
+    
+    assert len(aggregator._poll_source(source)) == 1
+    # Within the poll interval the source isn't fetched at all
+    assert aggregator._poll_source(source) == []
+    assert aggregator.source_stats["fake"]["polled"] is False
+
+def test_poll_scheduler_follows_change_rate(tmp_path):
+    from src.sense import TrendSource
+    from src.sense.poll_scheduler import PollScheduler, SourceHealthTracker
+    
+    class Source(TrendSource):
+        name = "src"
+        poll_interval_hours = 1.0
+    
+    tracker = SourceHealthTracker(path=str(tmp_path / "health.json"))
+    scheduler = PollScheduler(tracker, {"daily_min_expected_new": 1.0, "recovery_min_expected_new": 3.0, "max_staleness_hours": 24})
+    source = Source()
+    
+    assert scheduler.should_poll(source) == (True, "no_history")
+    
+    # Two new items per hour: worth a daily poll after an hour, but recovery waits for ~3 expected items
+    tracker.record("src", 2, 0.5, error=False)
+    tracker.state["src"]["last_polled"] -= 3600 * 1.2
+    assert scheduler.should_poll(source, "daily") == (True, "expected_new")
+    assert scheduler.should_poll(source, "recovery") == (False, "low_change_rate")
+    
+    # A quiet source is still polled once it goes stale
+    tracker.state["src"]["ewma_new_per_hour"] = 0.0
+    assert scheduler.should_poll(source, "daily") == (False, "low_change_rate")
+    tracker.state["src"]["last_polled"] -= 3600 * 24
+    assert scheduler.should_poll(source, "daily") == (True, "stale")
+
+def test_poll_scheduler_backs_off_after_errors(tmp_path):
+    from src.sense import TrendSource
+    from src.sense.poll_scheduler import PollScheduler, SourceHealthTracker
+    
+    class Source(TrendSource):
+        name = "flaky"
+        poll_interval_hours = 2.0
+    
+    tracker = SourceHealthTracker(path=str(tmp_path / "health.json"))
+    scheduler = PollScheduler(tracker)
+    
+    tracker.record("flaky", 0, 5.0, error=True)
+    assert scheduler.should_poll(Source()) == (False, "error_backoff")
+    assert tracker.get("flaky")["ewma_error_rate"] == 1.0
+    
+    tracker.state["flaky"]["last_attempt"] -= 3600 * 2.5
+    assert scheduler.should_poll(Source()) == (True, "no_history")
+
+def test_vector_memory_batch_query_and_expiry(tmp_path):
+    import numpy as np
+    from src.memory import VectorMemory
+    
+    memory = VectorMemory(root=str(tmp_path), half_life_days=14, ttl_days=14)
+    memory.add(["a", "b"], [np.array([1.0, 0.0]), np.array([0.0, 1.0])], kind="seen")
+    memory.add(["b"], [np.array([0.0, 1.0])], kind="produced")
+    memory.save()
+    
+    reloaded = VectorMemory(root=str(tmp_path), half_life_days=14, ttl_days=14)
+    assert len(reloaded) == 2
+    assert set(reloaded.get_vectors(["a", "zzz"])) == {"a"}
+    
+    matches = reloaded.query_batch([np.array([0.0, 2.0]), np.array([1.0, 1.0]), None], threshold=0.9)
+    assert matches[0]["id"] == "b" and matches[0]["kind"] == "produced"
+    assert matches[1] is None and matches[2] is None
+    
+    # Aged entries score lower but still match until the TTL, then expire entirely
+    reloaded.timestamps = reloaded.timestamps - 86400 * 13.9
+    aged = reloaded.query_batch([np.array([0.0, 1.0])], threshold=0.8, kinds=["produced"])[0]
+    assert aged["id"] == "b" and aged["similarity"] == 1.0 and aged["score"] < 0.8
+    reloaded.timestamps = reloaded.timestamps - 86400 * 1.1
+    assert reloaded.query_batch([np.array([0.0, 1.0])], threshold=0.8) == [None]
+    reloaded.add(["c"], [np.array([1.0, 1.0])])
+    reloaded.save()
+    assert reloaded.ids == ["c"]
+
+def test_deduplicator_uses_vector_memory(tmp_path, monkeypatch):
+    import numpy as np
+    from src.memory import VectorMemory
+    from src.sense import deduplicator as dedup_module
+    
+    vectors = {
+        "Fed hikes rates ": np.array([1.0, 0.0, 0.0]),
+        "Fed raises rates ": np.array([0.99, 0.1, 0.0]),
+        "Bitcoin rallies ": np.array([0.0, 1.0, 0.0]),
+        "Oil slumps ": np.array([0.0, 0.0, 1.0]),
+    }
+    calls = []
+    def fake_encode_batch(texts, batch_size=32):
+        calls.append(list(texts))
+        return [vectors[t] for t in texts]
+    monkeypatch.setattr(dedup_module.embedding_service, "encode_batch", fake_encode_batch)
+    
+    dedup = SemanticDeduplicator(memory=VectorMemory(root=str(tmp_path)))
+    first = dedup.deduplicate([{"title": "Fed hikes rates"}, {"title": "Fed raises rates"}, {"title": "Bitcoin rallies"}])
+    assert [t["title"] for t in first] == ["Fed hikes rates", "Bitcoin rallies"]
+    assert first[0]["origin_count"] == 2
+    
+    dedup.remember_produced([first[1]])
+    
+    # Next day: stored vectors are reused and produced topics are dropped
+    second = dedup.deduplicate([{"title": "Bitcoin rallies"}, {"title": "Fed hikes rates"}, {"title": "Oil slumps"}])
+    assert [t["title"] for t in second] == ["Fed hikes rates", "Oil slumps"]
+    assert second[0]["seen_before"]["similarity"] > 0.99
+    assert calls[-1] == ["Oil slumps "]
+
+def test_produced_topics_stay_per_channel(tmp_path, monkeypatch):
+    import numpy as np
+    from src.memory import VectorMemory
+    from src.shared import CandidateBatch
+    from src.sense import deduplicator as dedup_module
+    
+    vectors = {"Fed hikes rates ": np.array([1.0, 0.0]), "Bitcoin rallies ": np.array([0.0, 1.0])}
+    monkeypatch.setattr(dedup_module.embedding_service, "encode_batch", lambda texts, batch_size=32: [vectors[t] for t in texts])
+    
+    dedup = SemanticDeduplicator(memory=VectorMemory(root=str(tmp_path / "shared")))
+    finance = VectorMemory(root=str(tmp_path / "finance"))
+    crypto = VectorMemory(root=str(tmp_path / "crypto"))
+    topics = dedup.deduplicate([{"title": "Fed hikes rates"}, {"title": "Bitcoin rallies"}])
+    dedup.remember_produced([topics[0]], finance)
+    
+    batch = CandidateBatch.from_records([{"title": t["title"]} for t in topics])
+    assert [r["title"] for r in dedup.drop_produced(batch, finance).to_records()] == ["Bitcoin rallies"]
+    assert len(dedup.drop_produced(batch, crypto)) == 2
+    # The shared memory only holds "seen" entries, so tomorrow's dedup keeps the topic for every channel
+    assert [t["title"] for t in dedup.deduplicate([{"title": "Fed hikes rates"}])] == ["Fed hikes rates"]
+
+def test_prefilter_merges_duplicates_and_drops_junk():
+    from src.sense.prefilter import TrendPrefilter, normalize_title
+    
+    assert normalize_title("  Fed’s RATE   hike — explained!! ") == "fed s rate hike explained"
+    
+    prefilter = TrendPrefilter()
+    trends = [
+        {"title": "Fed signals another rate hike this year", "source": "finance_rss", "description": "Markets react", "origin_count": 1},
+        {"title": "FED signals another rate hike this year!", "source": "reddit", "description": "", "origin_count": 2},
+        {"title": "Another rate hike this year, Fed signals", "source": "reddit", "description": "", "origin_count": 1},
+        {"title": "GME to the moon", "source": "reddit", "description": ""},
+        {"title": "🚀🚀🚀🚀🚀🚀 GME calls printing money 🚀🚀🚀🚀🚀🚀🚀🚀🚀🚀🚀🚀🚀🚀🚀🚀", "source": "reddit", "description": "yolo"},
+        {"title": "Рынок акций падает после решения ФРС", "source": "reddit", "description": "x"},
+        {"title": "Dividend stocks rally", "source": "reddit", "description": ""},
+        {"title": "Mercado de valores cae tras decisión", "source": "finance_rss", "description": "Los mercados bursátiles cayeron hoy después de que la Reserva Federal subiera tipos de interés nuevamente"},
+        {"title": "Passive income ideas", "source": "evergreen", "description": ""},
+    ]
+    
+    result = prefilter.filter(trends)
+    assert [t["title"] for t in result] == ["Fed signals another rate hike this year", "Passive income ideas"]
+    assert result[0]["origin_count"] == 4
+    assert result[0]["sources"] == ["finance_rss", "reddit"]
+    
+    report = prefilter.last_report
+    assert report["exact_duplicates"] == 1 and report["near_duplicates"] == 1
+    assert report["too_short"] == 1 and report["charset"] == 2 and report["empty_description"] == 1
+    assert report["language"] == 1
+    
+    # Short editorial headlines pass; the same length from Reddit is too short
+    headlines = [
+        {"title": "Fed holds rates", "source": "finance_rss", "description": "The central bank left rates unchanged"},
+        {"title": "Buy the dip", "source": "reddit", "description": "apes together"},
+    ]
+    assert [t["title"] for t in prefilter.filter(headlines)] == ["Fed holds rates"]
+    
+    # Stopword-only titles have no near-duplicate key; only exact repeats merge
+    stopword_titles = [{"title": "What is it"}, {"title": "How is it"}, {"title": "What is it?"}]
+    assert [t["title"] for t in prefilter.filter(stopword_titles)] == ["What is it", "How is it"]
+
+def test_incremental_clustering_matches_greedy_batch():
+    import numpy as np
+    from src.shared import embedding_service
+    
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(5, 16))
+    embeddings = [centers[i % 5] + rng.normal(scale=0.4, size=16) for i in range(60)]
+    embeddings[10] = None
+    
+    # Reference: the original pairwise greedy pass
+    expected, assigned = [], set()
+    for i, emb_i in enumerate(embeddings):
+        if i in assigned or emb_i is None:
+            continue
+        cluster = [i]
+        assigned.add(i)
+        for j in range(i + 1, len(embeddings)):
+            if j in assigned or embeddings[j] is None:
+                continue
+            if embedding_service.cosine_similarity(emb_i, embeddings[j]) >= 0.75:
+                cluster.append(j)
+                assigned.add(j)
+        expected.append(cluster)
+    
+    assert embedding_service.cluster_embeddings(embeddings, 0.75) == expected
+
+def test_streamed_dedup_matches_single_batch(tmp_path, monkeypatch):
+    import numpy as np
+    from src.memory import VectorMemory
+    from src.sense import deduplicator as dedup_module
+    
+    rng = np.random.default_rng(3)
+    centers = rng.normal(size=(6, 12))
+    vectors = {}
+    def fake_encode_batch(texts, batch_size=32):
+        for t in texts:
+            if t not in vectors:
+                k = int(t.split()[1])
+                vectors[t] = centers[k % 6] + rng.normal(scale=0.3, size=12)
+        return [vectors[t] for t in texts]
+    monkeypatch.setattr(dedup_module.embedding_service, "encode_batch", fake_encode_batch)
+    
+    trends = [{"title": f"Story {i} number {i * 7}", "source": "reddit" if i % 2 else "finance_rss",
+               "description": "Markets moved on the news today"} for i in range(40)]
+    trends += [dict(trends[3]), dict(trends[8])]
+    
+    results = []
+    for i, batch_size in enumerate([1000, 4, 1]):
+        dedup = SemanticDeduplicator(memory=VectorMemory(root=str(tmp_path / str(i))), batch_size=batch_size)
+        results.append(dedup.deduplicate_stream(iter([dict(t) for t in trends])))
+    
+    assert results[0] == results[1] == results[2]
+    assert sum(t["origin_count"] for t in results[0]) == len(trends)
@@ -0,0 +1,113 @@
+import json
+import pytest
+from src.shared import ChannelProfile, load_channel_profiles, DEFAULT_CHANNEL_ID
+
+def test_default_channel_when_config_missing(tmp_path):
+    profiles = load_channel_profiles(str(tmp_path / "missing.json"))
+    assert len(profiles) == 1
+    assert profiles[0].channel_id == DEFAULT_CHANNEL_ID
+    assert str(profiles[0].output_dir) == "data/metrics"
+
+def test_channel_isolation(tmp_path):
+    config = {
+        "channels": {
+            "finance": {"config_dir": str(tmp_path), "credentials_env_prefix": "YT_FINANCE"},
+            "crypto": {"config_dir": str(tmp_path), "enabled": False},
+        }
+    }
+    path = tmp_path / "channels.json"
+    path.write_text(json.dumps(config))
+    
+    profiles = load_channel_profiles(str(path))
+    assert [p.channel_id for p in profiles] == ["finance"]
+    
+    finance = profiles[0]
+    assert "finance" in str(finance.output_dir)
+    assert "finance" in str(finance.memory_dir)
+    assert "finance" in str(finance.history_path)
+    assert finance.produced_memory_dir.parent == finance.memory_dir
+    # Falls back to global config when the channel doesn't override a file
+    assert str(finance.narrative_lanes_path) == "config/narrative_lanes.json"
+
+def test_channel_credentials_from_env(monkeypatch):
+    monkeypatch.setenv("YT_FINANCE_CLIENT_ID", "abc")
+    profile = ChannelProfile("finance", credentials_env_prefix="YT_FINANCE")
+    assert profile.credentials()["client_id"] == "abc"
+
+def test_http_client_retries_and_metrics():
+    import httpx
+    from src.shared import HTTPClient
+    
+    calls = []
+    
+    def handler(request):
+        calls.append(request.url.host)
+        if len(calls) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+    
+    client = HTTPClient(backoff_seconds=0, transport=httpx.MockTransport(handler))
+    response = client.get("https://api.example.com/v1/thing")
+    
+    assert response.json() == {"ok": True}
+    metrics = client.get_host_metrics()["api.example.com"]
+    assert metrics["requests"] == 2
+    assert metrics["retries"] == 1
+    assert metrics["errors"] == 1
+
+def test_text_features_match_substring_semantics():
+    import random
+    from src.shared import TextFeatureExtractor
+    
+    keywords = ["ab", "abc", "bca", "c", "aab", "bb", "cab", "a", "ab"]
+    extractor = TextFeatureExtractor()
+    extractor.register_group("g", {"x": keywords})
+    
+    rng = random.Random(5)
+    for _ in range(500):
+        title = "".join(rng.choice("abcAB ") for _ in range(rng.randint(0, 12)))
+        description = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 12)))
+        record = extractor.extract(title, description)
+        
+        full = f"{title} {description}".lower()
+        assert record.hits("g", "x") == [kw for kw in keywords if kw in full]
+        assert record.hits("g", "x", title_only=True) == [kw for kw in keywords if kw in title.lower()]
+
+def test_text_features_memoize_records():
+    from src.shared import TextFeatureExtractor
+    
+    extractor = TextFeatureExtractor()
+    extractor.register_group("emotion", {"concern": ["crash", "risk"], "curiosity": ["why"]})
+    
+    record = extractor.extract("Why stocks crash", "Risk is rising")
+    assert record.counts("emotion") == {"concern": 2, "curiosity": 1}
+    assert record.counts("emotion", title_only=True) == {"concern": 1, "curiosity": 1}
+    
+    # Title-only lookups reuse the full record instead of scanning again
+    assert extractor.extract("Why stocks crash") is record
+    assert extractor.scans == 1 and extractor.reuses == 1
+    
+    extractor.register_group("extra", ["stocks"])
+    assert extractor.extract("Why stocks crash", "Risk is rising").any("extra")
+    assert extractor.scans == 2
+
+def test_candidate_batch_round_trip_and_ops():
+    from src.shared import CandidateBatch
+    
+    records = [
+        {"id": "a", "final_score": 70.0, "origin_count": 2, "sources": ["x"], "passed": True},
+        {"id": "b", "final_score": 90.0, "origin_count": 1, "passed": False},
+        {"id": "c", "final_score": 70.0, "origin_count": 3, "sources": [], "passed": True, "extra": None},
+    ]
+    batch = CandidateBatch.from_records(records)
+    assert batch.to_records() == records
+    assert batch["final_score"].dtype.kind == "f" and batch["passed"].dtype == bool
+    assert "sources" not in batch.row(1) and batch.row(1).get("sources", "-") == "-"
+    
+    # Stable descending sort, like list.sort(reverse=True)
+    assert [r["id"] for r in batch.sort_by("final_score").to_records()] == ["b", "a", "c"]
+    assert [r["id"] for r in batch.filter(batch["passed"]).to_records()] == ["a", "c"]
+    
+    tagged = batch.with_columns(lane=["x", "y", "z"])
+    assert tagged.take([2]).to_records() == [dict(records[2], lane="z")]
+    assert "lane" not in batch
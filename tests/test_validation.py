@@ -34,3 +34,58 @@ def test_emotion_detection():
     candidate = {"title": "Surprising breakthrough in AI", "description": ""}
     result = validator.validate_single(candidate)
     assert result["emotional_vector"] in ["surprise", "curiosity", "awe", "concern", "neutral"]
+
+
+def test_validate_batch_in_place_matches_copy():
+    candidates = [
+        {"id": "a", "title": "Why the Fed rate hike surprised stock investors", "origin_count": 2},
+        {"id": "b", "title": "Weather today", "origin_count": 1},
+    ]
+    copied = TrendValidator().validate_batch([dict(c) for c in candidates])
+    in_place_input = [dict(c) for c in candidates]
+    in_place = TrendValidator().validate_batch(in_place_input, in_place=True)
+    
+    assert copied == in_place
+    assert in_place[0] is in_place_input[0]
+    assert in_place[0]["trend_id"] == "a"
+
+def test_relaxation_schedule_picks_strictest_step_reaching_target():
+    validator = TrendValidator()
+    long_description = " ".join(["detail"] * 60)
+    candidates = [
+        # Only too complex under the base rules
+        {"id": "a", "title": "Why the stock market crash hit bank stocks", "description": long_description, "origin_count": 2},
+        {"id": "b", "title": "Why the stock market crash hit bitcoin", "description": long_description, "origin_count": 2},
+        # Single source with low relevance: needs the fully relaxed step
+        {"id": "c", "title": "Hidden truth about the market", "origin_count": 1},
+        {"id": "d", "title": "Weather today", "origin_count": 1},
+    ]
+    
+    features = validator._extract_features(candidates)
+    passed = validator._evaluate_schedule(features, validator._rule_schedule())
+    assert passed.sum(axis=1).tolist() == [0, 2, 3]
+    
+    results = validator.validate_batch(candidates)
+    assert [r["passed"] for r in results] == [True, True, False, False]
+    assert validator.active_rules["max_explainability_seconds"] == 90
+    assert validator.active_rules["min_source_count"] == 2
+    assert results[2]["validation_notes"] == ["Insufficient sources: 1"]
+
+def test_validate_and_score_batch_match_list_path(tmp_path):
+    from src.shared import CandidateBatch
+    from src.scoring import VPSScorer, ScoreCache
+    
+    validator = TrendValidator()
+    scorer = VPSScorer(score_cache=ScoreCache(path=str(tmp_path / "score_cache.json")))
+    candidates = [
+        {"id": "t1", "title": "Why the stock market crash is a hidden risk", "description": "Inflation and debt", "origin_count": 3},
+        {"id": "t2", "title": "Bitcoin surge", "description": "Crypto boom", "origin_count": 1},
+        {"id": "t3", "title": "Weather today", "description": "", "origin_count": 2},
+    ]
+    
+    validated = validator.validate_batch(CandidateBatch.from_records(candidates))
+    assert validated.to_records() == validator.validate_batch(candidates)
+    
+    passed = validated.filter(validated["passed"])
+    expected = scorer.score_batch([c for c in validator.validate_batch(candidates) if c["passed"]])
+    assert scorer.score_batch(passed).to_records() == expected